@@ -102,14 +102,23 @@ def get(profile, autoscaling_group=None):
             If omitted, all autoscaling groups are returned.
 
     Returns:
-        The JSON response returned by boto3.
+        The JSON response returned by boto3. If all autoscaling
+        groups are fetched, every page of them is included.
 
     """
     client = boto3client.get("autoscaling", profile)
     params = {}
     if autoscaling_group:
         params["AutoScalingGroupNames"] = [autoscaling_group]
-    return client.describe_auto_scaling_groups(**params)
+        return client.describe_auto_scaling_groups(**params)
+    paginator = client.get_paginator("describe_auto_scaling_groups")
+    result = None
+    for response in paginator.paginate():
+        if result is None:
+            result = response
+        else:
+            result["AutoScalingGroups"].extend(response["AutoScalingGroups"])
+    return result
 
 
 def tag(profile, autoscaling_group, key, value):
@@ -198,3 +207,77 @@ def detach_load_balancer(profile, autoscaling_group, load_balancer):
     params["AutoScalingGroupName"] = autoscaling_group
     params["LoadBalancerNames"] = [load_balancer]
     return client.detach_load_balancers(**params)
+
+
+def update(
+        profile,
+        autoscaling_group,
+        launch_configuration=None,
+        min_size=None,
+        max_size=None,
+        desired_size=None):
+    """Update an autoscaling group.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        autoscaling_group
+            The name of the autoscaling group to update.
+
+        launch_configuration
+            The name of a launch configuration to launch new
+            EC2 instances with.
+
+        min_size
+            The min number of EC2 instances to keep in the group.
+
+        max_size
+            The max number of EC2 instances to keep in the group.
+
+        desired_size
+            The ideal number of EC2 instances to keep in the group.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("autoscaling", profile)
+    params = {}
+    params["AutoScalingGroupName"] = autoscaling_group
+    if launch_configuration:
+        params["LaunchConfigurationName"] = launch_configuration
+    if min_size is not None:
+        params["MinSize"] = min_size
+    if max_size is not None:
+        params["MaxSize"] = max_size
+    if desired_size is not None:
+        params["DesiredCapacity"] = desired_size
+    return client.update_auto_scaling_group(**params)
+
+
+def terminate_instance(profile, instance, decrement=True):
+    """Terminate an EC2 instance in an autoscaling group.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        instance
+            The ID of the EC2 instance.
+
+        decrement
+            Lower the group's desired size, rather than
+            launching a replacement?
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("autoscaling", profile)
+    params = {}
+    params["InstanceId"] = instance
+    params["ShouldDecrementDesiredCapacity"] = decrement
+    return client.terminate_instance_in_auto_scaling_group(**params)
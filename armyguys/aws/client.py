@@ -2,12 +2,51 @@
 
 """Utilities for getting boto3 clients for AWS services."""
 
+import threading
+import weakref
+
 import boto3
 
 
+_lock = threading.Lock()
+"""A lock to guard client creation (boto3 sessions aren't thread-safe)."""
+
+
+_clients = weakref.WeakKeyDictionary()
+"""Clients already created, stored as {session: {service: client}}."""
+
+
+_configs = weakref.WeakKeyDictionary()
+"""Settings for a session's clients, stored as {session: config}."""
+
+
+def configure(session, config):
+    """Set how the clients for a session are configured.
+
+    Note:
+        Only clients created afterwards are affected.
+
+    Args:
+
+        session
+            A boto3 session.
+
+        config
+            A ``botocore.config.Config``.
+
+    """
+    with _lock:
+        _configs[session] = config
+
+
 def get(service, session=None):
     """Get a boto3 client for an AWS service.
 
+    Note:
+        Clients are cached per session and service, and created under
+        a lock, so worker threads can share a session. The clients
+        themselves are thread-safe.
+
     Args:
 
         service
@@ -22,6 +61,12 @@ def get(service, session=None):
         An instance of a boto3 client for the requested service.
 
     """
-    if not session:
-        session = boto3.Session()
-    return session.client(service)
+    with _lock:
+        if not session:
+            return boto3.Session().client(service)
+        clients = _clients.setdefault(session, {})
+        if service not in clients:
+            clients[service] = session.client(
+                service,
+                config=_configs.get(session))
+        return clients[service]
@@ -6,7 +6,10 @@ from .. import client as boto3client
 
 
 def get(profile, cluster):
-    """Get a list of all ECS tasks in a cluster.
+    """Get all of the container instances in a cluster.
+
+    The container instances are listed a page at a time, and
+    described 100 at a time (the most ECS allows).
 
     Args:
 
@@ -17,18 +20,56 @@ def get(profile, cluster):
             The name of a cluster.
 
     Returns:
-        The JSON response returned by boto3.
+        A response like boto3's, with all of the container instances
+        under "containerInstances" and any "failures".
 
     """
     client = boto3client.get("ecs", profile)
-    params = {}
-    params["cluster"] = cluster
-    response = client.list_container_instances(**params)
-    instance_arns = response["containerInstanceArns"]
-    result = None
-    if instance_arns:
+    instance_arns = []
+    paginator = client.get_paginator("list_container_instances")
+    response = None
+    for response in paginator.paginate(cluster=cluster):
+        instance_arns.extend(response["containerInstanceArns"])
+    result = {
+        "containerInstances": [],
+        "failures": [],
+        "ResponseMetadata": response["ResponseMetadata"],
+        }
+    for i in range(0, len(instance_arns), 100):
         params = {}
         params["cluster"] = cluster
-        params["containerInstances"] = instance_arns
-        result = client.describe_container_instances(**params)
+        params["containerInstances"] = instance_arns[i:i + 100]
+        response = client.describe_container_instances(**params)
+        result["containerInstances"].extend(response["containerInstances"])
+        result["failures"].extend(response.get("failures", []))
+        result["ResponseMetadata"] = response["ResponseMetadata"]
     return result
+
+
+def update_state(profile, cluster, container_instances, status):
+    """Change the state of some ECS container instances.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        cluster
+            The name of a cluster.
+
+        container_instances
+            A list of container instance ARNs (up to 10).
+
+        status
+            "DRAINING" to move tasks off them, or "ACTIVE".
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ecs", profile)
+    params = {}
+    params["cluster"] = cluster
+    params["containerInstances"] = container_instances
+    params["status"] = status
+    return client.update_container_instances_state(**params)
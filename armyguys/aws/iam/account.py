@@ -19,3 +19,35 @@ def get(profile):
     """
     client = boto3client.get("iam", profile)
     return client.get_user()
+
+
+def get_authorization_details(profile, filters=None):
+    """Get the account's IAM roles, policies, users and groups in one go.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        filters
+            A list of the kinds of entities to get (e.g., "Role",
+            "LocalManagedPolicy"). Defaults to all of them.
+
+    Returns:
+        The data returned by boto3, with every page of each list.
+
+    """
+    client = boto3client.get("iam", profile)
+    params = {}
+    if filters:
+        params["Filter"] = filters
+    keys = ["UserDetailList", "GroupDetailList", "RoleDetailList", "Policies"]
+    paginator = client.get_paginator("get_account_authorization_details")
+    result = None
+    for response in paginator.paginate(**params):
+        if result is None:
+            result = response
+        else:
+            for key in keys:
+                result.setdefault(key, []).extend(response.get(key, []))
+    return result
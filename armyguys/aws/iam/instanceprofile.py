@@ -53,11 +53,19 @@ def get(profile):
             A profile to connect to AWS with.
 
     Returns:
-        The JSON response returned by boto3.
+        The JSON response returned by boto3, with every page
+        of instance profiles.
 
     """
     client = boto3client.get("iam", profile)
-    return client.list_instance_profiles()
+    paginator = client.get_paginator("list_instance_profiles")
+    result = None
+    for response in paginator.paginate():
+        if result is None:
+            result = response
+        else:
+            result["InstanceProfiles"].extend(response["InstanceProfiles"])
+    return result
 
 
 def details(profile, instance_profile):
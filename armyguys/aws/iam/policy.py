@@ -19,8 +19,8 @@ def create(profile, name, contents=None, filepath=None):
             A name to give to the policy.
 
         contents
-            The contents of the policy (as a Python dict or list).
-            You must specify this OR a filepath.
+            The contents of the policy (as a Python dict or list,
+            or a JSON string). You must specify this OR a filepath.
 
         filepath
             The path to the policy you want to upload.
@@ -35,6 +35,8 @@ def create(profile, name, contents=None, filepath=None):
         norm_path = norm_path.rstrip(path.sep)
         with open(norm_path, "rb") as f:
             data = f.read().decode("utf-8")
+    elif isinstance(contents, str):
+        data = contents
     elif contents:
         data = json.dumps(contents)
     client = boto3client.get("iam", profile)
@@ -71,11 +73,19 @@ def get(profile):
             A profile to connect to AWS with.
 
     Returns:
-        The response returned by boto3.
+        The response returned by boto3, with every page
+        of policies.
 
     """
     client = boto3client.get("iam", profile)
-    return client.list_policies()
+    paginator = client.get_paginator("list_policies")
+    result = None
+    for response in paginator.paginate():
+        if result is None:
+            result = response
+        else:
+            result["Policies"].extend(response["Policies"])
+    return result
 
 
 def details(profile, policy):
@@ -98,3 +108,121 @@ def details(profile, policy):
     params["PolicyArn"] = policy
     return client.get_policy(**params)
 
+
+def get_version(profile, policy, version):
+    """Get one version of an IAM policy, with its document.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        policy
+            The ARN of the policy.
+
+        version
+            The ID of the version you want to fetch (e.g., "v1").
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    client = boto3client.get("iam", profile)
+    params = {}
+    params["PolicyArn"] = policy
+    params["VersionId"] = version
+    return client.get_policy_version(**params)
+
+
+def create_version(
+        profile,
+        policy,
+        contents=None,
+        filepath=None,
+        set_as_default=True):
+    """Create a new version of an IAM policy.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        policy
+            The ARN of the policy.
+
+        contents
+            The contents of the policy (as a Python dict or list,
+            or a JSON string). You must specify this OR a filepath.
+
+        filepath
+            The path to the policy you want to upload.
+            You must specify this OR the contents.
+
+        set_as_default
+            Whether to make the new version the one that's in effect.
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    if filepath:
+        norm_path = path.normpath(filepath)
+        norm_path = norm_path.rstrip(path.sep)
+        with open(norm_path, "rb") as f:
+            data = f.read().decode("utf-8")
+    elif isinstance(contents, str):
+        data = contents
+    else:
+        data = json.dumps(contents)
+    client = boto3client.get("iam", profile)
+    params = {}
+    params["PolicyArn"] = policy
+    params["PolicyDocument"] = data
+    params["SetAsDefault"] = set_as_default
+    return client.create_policy_version(**params)
+
+
+def delete_version(profile, policy, version):
+    """Delete a (non-default) version of an IAM policy.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        policy
+            The ARN of the policy.
+
+        version
+            The ID of the version you want to delete (e.g., "v1").
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    client = boto3client.get("iam", profile)
+    params = {}
+    params["PolicyArn"] = policy
+    params["VersionId"] = version
+    return client.delete_policy_version(**params)
+
+
+def get_versions(profile, policy):
+    """Get a list of the versions of an IAM policy (without documents).
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        policy
+            The ARN of the policy.
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    client = boto3client.get("iam", profile)
+    params = {}
+    params["PolicyArn"] = policy
+    return client.list_policy_versions(**params)
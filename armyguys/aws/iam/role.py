@@ -19,8 +19,8 @@ def create(profile, name, contents=None, filepath=None):
             A name to give to the policy.
 
         contents
-            The policy contents (as a Python dict or list).
-            You must specify this OR a filepath.
+            The policy contents (as a Python dict or list,
+            or a JSON string). You must specify this OR a filepath.
 
         filepath
             The path to the trust policy you want to upload.
@@ -35,6 +35,8 @@ def create(profile, name, contents=None, filepath=None):
         norm_path = norm_path.rstrip(path.sep)
         with open(norm_path, "rb") as f:
             data = f.read().decode("utf-8")
+    elif isinstance(contents, str):
+        data = contents
     elif contents:
         data = json.dumps(contents)
     client = boto3client.get("iam", profile)
@@ -71,11 +73,18 @@ def get(profile):
             A profile to connect to AWS with.
 
     Returns:
-        The data returned by boto3
+        The data returned by boto3, with every page of roles.
 
     """
     client = boto3client.get("iam", profile)
-    return client.list_roles()
+    paginator = client.get_paginator("list_roles")
+    result = None
+    for response in paginator.paginate():
+        if result is None:
+            result = response
+        else:
+            result["Roles"].extend(response["Roles"])
+    return result
 
 
 def details(profile, role):
@@ -162,4 +171,42 @@ def get_attached_policies(profile, role):
     params = {}
     params["RoleName"] = role
     return client.list_attached_role_policies(**params)
-                                                                   
+
+
+def update_trust_policy(profile, role, contents=None, filepath=None):
+    """Replace the policy that says who can assume an IAM role.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        role
+            The name of the role.
+
+        contents
+            The policy contents (as a Python dict or list,
+            or a JSON string). You must specify this OR a filepath.
+
+        filepath
+            The path to the trust policy you want to upload.
+            You must specify this OR the contents.
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    if filepath:
+        norm_path = path.normpath(filepath)
+        norm_path = norm_path.rstrip(path.sep)
+        with open(norm_path, "rb") as f:
+            data = f.read().decode("utf-8")
+    elif isinstance(contents, str):
+        data = contents
+    else:
+        data = json.dumps(contents)
+    client = boto3client.get("iam", profile)
+    params = {}
+    params["RoleName"] = role
+    params["PolicyDocument"] = data
+    return client.update_assume_role_policy(**params)
@@ -21,7 +21,7 @@ def create(profile):
     return client.create_internet_gateway()
 
 
-def delete(profile):
+def delete(profile, internet_gateway):
     """Delete an internet gateway.
 
     Args:
@@ -29,14 +29,20 @@ def delete(profile):
         profile
             A profile to connect to AWS with.
 
+        internet_gateway
+            The ID of the internet gateway to delete.
+
+    Returns:
+        The response returned by boto3.
+
     """
     client = boto3client.get("ec2", profile)
     params = {}
-    params["InternetGatewayId"] = vpc
+    params["InternetGatewayId"] = internet_gateway
     return client.delete_internet_gateway(**params)
 
 
-def get(profile):
+def get(profile, filters=None):
     """Get a list of all internet gateways.
 
     Args:
@@ -44,12 +50,19 @@ def get(profile):
         profile
             A profile to connect to AWS with.
 
+        filters
+            Filters to apply to the request.
+
     Returns:
         The JSON response returned by boto3.
 
     """
     client = boto3client.get("ec2", profile)
-    return client.describe_internet_gateways()
+    params = {}
+    if filters:
+        params["Filters"] = filters
+    return client.describe_internet_gateways(**params)
+
 
 def tag(profile, internet_gateway, key, value):
     """Add a tag to an internet gateway.
@@ -117,7 +117,8 @@ def get(profile, load_balancer=None):
             If none is specified, all load balancers are returned.
 
     Returns:
-        The JSON response returned by boto3.
+        The JSON response returned by boto3. If all load balancers
+        are fetched, every page of them is included.
 
     """
     response = None
@@ -125,6 +126,15 @@ def get(profile, load_balancer=None):
     params = {}
     if load_balancer:
         params["LoadBalancerNames"] = [load_balancer]
+    else:
+        paginator = client.get_paginator("describe_load_balancers")
+        for page in paginator.paginate():
+            if response is None:
+                response = page
+            else:
+                response["LoadBalancerDescriptions"].extend(
+                    page["LoadBalancerDescriptions"])
+        return response
     try:
         response = client.describe_load_balancers(**params)
     except ClientError as error:
@@ -242,3 +252,75 @@ def remove_listener(profile, load_balancer, port):
     params["LoadBalancerName"] = load_balancer
     params["LoadBalancerPorts"] = [port]
     return client.delete_load_balancer_listeners(**params)
+
+
+def add_listeners(profile, load_balancer, listeners):
+    """Add many listeners to a load balancer at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        load_balancer
+            The name of the load balancer you want to add listeners to.
+
+        listeners
+            A list of listener dicts (see ``create()``).
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("elb", profile)
+    params = {}
+    params["LoadBalancerName"] = load_balancer
+    params["Listeners"] = listeners
+    return client.create_load_balancer_listeners(**params)
+
+
+def remove_listeners(profile, load_balancer, ports):
+    """Remove many listeners from a load balancer at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        load_balancer
+            The name of the load balancer you want to remove listeners from.
+
+        ports
+            A list of the ports you want the load balancer to stop
+            listening on.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("elb", profile)
+    params = {}
+    params["LoadBalancerName"] = load_balancer
+    params["LoadBalancerPorts"] = ports
+    return client.delete_load_balancer_listeners(**params)
+
+
+def get_instance_health(profile, load_balancer):
+    """Get the health of the EC2 instances behind a load balancer.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        load_balancer
+            The name of a load balancer.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("elb", profile)
+    params = {}
+    params["LoadBalancerName"] = load_balancer
+    return client.describe_instance_health(**params)
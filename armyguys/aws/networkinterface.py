@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for working with network interfaces (ENIs)."""
+
+from . import client as boto3client
+
+
+def delete(profile, network_interface):
+    """Delete a network interface.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        network_interface
+            The ID of the network interface to delete.
+            It must not be attached to anything.
+
+    Returns:
+        The response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["NetworkInterfaceId"] = network_interface
+    return client.delete_network_interface(**params)
+
+
+def get(profile, filters=None):
+    """Get a list of network interfaces.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        filters
+            Filters to apply to the request.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    if filters:
+        params["Filters"] = filters
+    return client.describe_network_interfaces(**params)
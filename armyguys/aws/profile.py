@@ -9,6 +9,9 @@ Every boto3 request requires credentials and a region.
 
 from os import path
 from boto3.session import Session
+from botocore.config import Config
+
+from . import client as boto3client
 
 try:
     import configparser
@@ -16,6 +19,11 @@ except ImportError:
     import ConfigParser as configparser
 
 
+# How many times a regional client tries a request. Its retries
+# adapt to throttling, so many regions at once don't get throttled.
+REGIONAL_MAX_ATTEMPTS = 10
+
+
 def ephemeral(access_key_id, secret_access_key, region_name="us-east-1"):
     """Create a profile in memory (don't save it on disk).
 
@@ -40,6 +48,45 @@ def ephemeral(access_key_id, secret_access_key, region_name="us-east-1"):
     return session
 
 
+def regional(profile, region_name):
+    """Create a profile for another region, with the same credentials.
+
+    Note:
+        The credentials are resolved once, from the original profile,
+        rather than looked up again (from disk, or the instance
+        metadata service) for every region. The profile's clients
+        use botocore's "adaptive" retry mode, which backs off and
+        slows down when the region throttles requests.
+
+    Args:
+
+        profile
+            A boto3 session to take the credentials from.
+
+        region_name
+            An AWS region.
+
+    Returns:
+        An instance of a boto3 session, configured for the region.
+
+    """
+    credentials = profile.get_credentials()
+    if credentials is None:
+        # Nothing to share, so let the new session look for itself
+        # (its requests raise NoCredentialsError if it finds none).
+        session = Session(profile_name=profile.profile_name,
+                          region_name=region_name)
+    else:
+        credentials = credentials.get_frozen_credentials()
+        session = Session(aws_access_key_id=credentials.access_key,
+                          aws_secret_access_key=credentials.secret_key,
+                          aws_session_token=credentials.token,
+                          region_name=region_name)
+    retries = {"mode": "adaptive", "max_attempts": REGIONAL_MAX_ATTEMPTS}
+    boto3client.configure(session, Config(retries=retries))
+    return session
+
+
 def configured(profile_name="default"):
     """Load a pre-configured profile (stored at ~/.aws/{credentials,config}).
 
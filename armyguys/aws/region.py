@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for working with AWS regions."""
+
+from . import client as boto3client
+
+
+def get(profile):
+    """Get a list of the regions that are enabled for the account.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    return client.describe_regions()
@@ -40,7 +40,7 @@ def delete(profile, route_table):
     """
     client = boto3client.get("ec2", profile)
     params = {}
-    params["RouteTableId"] = vpc
+    params["RouteTableId"] = route_table
     return client.delete_route_table(**params)
 
 
@@ -85,3 +85,29 @@ def get(profile):
     """
     client = boto3client.get("s3", profile)
     return client.list_buckets()
+
+
+def details(profile, bucket):
+    """Check that an S3 bucket exists and that you can get at it.
+
+    Note:
+        This is a ``HEAD`` request, so it's cheap no matter how
+        many buckets there are or how many files are in them.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket.
+
+    Returns:
+        The JSON response returned by boto3. The bucket's region
+        is in the ``x-amz-bucket-region`` HTTP header.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    return client.head_bucket(**params)
@@ -6,7 +6,14 @@ from os import path
 from .. import client as boto3client
 
 
-def create(profile, bucket, key, contents=None, filepath=None):
+def create(
+        profile,
+        bucket,
+        key,
+        contents=None,
+        filepath=None,
+        content_encoding=None,
+        metadata=None):
     """Upload a file to an S3 bucket.
 
     Args:
@@ -28,22 +35,32 @@ def create(profile, bucket, key, contents=None, filepath=None):
             The path to the file you want to upload.
             You must specify this OR a filepath.
 
+        content_encoding
+            How the file is compressed, e.g., "gzip".
+
+        metadata
+            A dict of metadata to store with the file.
+
     Returns:
         The JSON response returned by boto3.
 
     """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    if content_encoding:
+        params["ContentEncoding"] = content_encoding
+    if metadata:
+        params["Metadata"] = metadata
     if filepath:
         norm_path = path.normpath(filepath)
         norm_path = norm_path.rstrip(path.sep)
         with open(norm_path, "rb") as f:
-            data = f.read()
+            params["Body"] = f
+            return client.put_object(**params)
     elif contents:
-        data = contents
-    client = boto3client.get("s3", profile)
-    params = {}
-    params["Body"] = data
-    params["Bucket"] = bucket
-    params["Key"] = key
+        params["Body"] = contents
     return client.put_object(**params)
 
 
@@ -72,6 +89,37 @@ def delete(profile, key, bucket):
     return client.delete_object(**params)
 
 
+def delete_many(profile, bucket, keys, quiet=True):
+    """Delete up to 1000 files from an S3 bucket in one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The bucket to delete the files from.
+
+        keys
+            A list of the names of the files you want to delete.
+
+        quiet
+            Only report the files that couldn't be deleted?
+
+    Returns:
+        The JSON response returned by boto3, including any ``Errors``.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Delete"] = {
+        "Objects": [{"Key": x} for x in keys],
+        "Quiet": quiet,
+        }
+    return client.delete_objects(**params)
+
+
 def get(profile, bucket, prefix=None):
     """Get all files in an S3 bucket.
 
@@ -96,3 +144,269 @@ def get(profile, bucket, prefix=None):
     if prefix:
         params["Prefix"] = prefix
     return client.list_objects(**params)
+
+
+def get_page(
+        profile,
+        bucket,
+        prefix=None,
+        delimiter=None,
+        start_after=None,
+        continuation_token=None,
+        max_keys=None):
+    """Get one page of files in an S3 bucket (up to 1000 of them).
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket to fetch files from.
+
+        prefix
+            Limit the search to files that begin with this.
+
+        delimiter
+            Group keys that contain this (after the prefix) into
+            common prefixes, e.g., "/" to list one "directory".
+
+        start_after
+            Only list keys that come after this one.
+
+        continuation_token
+            The ``NextContinuationToken`` from the previous page.
+
+        max_keys
+            The max number of keys to return.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    if prefix:
+        params["Prefix"] = prefix
+    if delimiter:
+        params["Delimiter"] = delimiter
+    if start_after:
+        params["StartAfter"] = start_after
+    if continuation_token:
+        params["ContinuationToken"] = continuation_token
+    if max_keys:
+        params["MaxKeys"] = max_keys
+    return client.list_objects_v2(**params)
+
+
+def details(profile, bucket, key, part_number=None):
+    """Get the metadata for one file in an S3 bucket.
+
+    Note:
+        This is a ``HEAD`` request, so it doesn't download the file.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        key
+            The name of the file.
+
+        part_number
+            For files uploaded in parts, the number of a part.
+            If given, the ContentLength is the size of that part.
+
+    Returns:
+        The JSON response returned by boto3, including the ETag.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    if part_number:
+        params["PartNumber"] = part_number
+    return client.head_object(**params)
+
+
+def download(profile, bucket, key, byte_range=None, etag=None):
+    """Download a file (or a range of bytes from it) from S3.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        key
+            The name of the file.
+
+        byte_range
+            A (first, last) tuple of the byte offsets to get,
+            inclusive. Leave it blank to get the whole file.
+
+        etag
+            Only download the file if it still has this ETag.
+
+    Returns:
+        The JSON response returned by boto3. The ``Body``
+        is a stream you can read the bytes from.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    if byte_range:
+        first, last = byte_range
+        params["Range"] = "bytes=" + str(first) + "-" + str(last)
+    if etag:
+        params["IfMatch"] = etag
+    return client.get_object(**params)
+
+
+def start_multipart_upload(
+        profile,
+        bucket,
+        key,
+        content_encoding=None,
+        metadata=None):
+    """Start a multipart upload.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket to upload the file to.
+
+        key
+            The key/name to give to the file in S3.
+
+        content_encoding
+            How the file is compressed, e.g., "gzip".
+
+        metadata
+            A dict of metadata to store with the file.
+
+    Returns:
+        The JSON response returned by boto3, including the UploadId.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    if content_encoding:
+        params["ContentEncoding"] = content_encoding
+    if metadata:
+        params["Metadata"] = metadata
+    return client.create_multipart_upload(**params)
+
+
+def upload_part(profile, bucket, key, upload_id, part_number, body):
+    """Upload one part of a multipart upload.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is being uploaded to.
+
+        key
+            The key/name of the file in S3.
+
+        upload_id
+            The ID of the multipart upload.
+
+        part_number
+            The number of the part, from 1 to 10000.
+
+        body
+            The bytes of the part.
+
+    Returns:
+        The JSON response returned by boto3, including the part's ETag.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    params["UploadId"] = upload_id
+    params["PartNumber"] = part_number
+    params["Body"] = body
+    return client.upload_part(**params)
+
+
+def complete_multipart_upload(profile, bucket, key, upload_id, parts):
+    """Finish a multipart upload.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is being uploaded to.
+
+        key
+            The key/name of the file in S3.
+
+        upload_id
+            The ID of the multipart upload.
+
+        parts
+            A list of {"PartNumber": number, "ETag": etag} entries,
+            sorted by part number.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    params["UploadId"] = upload_id
+    params["MultipartUpload"] = {"Parts": parts}
+    return client.complete_multipart_upload(**params)
+
+
+def abort_multipart_upload(profile, bucket, key, upload_id):
+    """Abort a multipart upload, and discard any uploaded parts.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file was being uploaded to.
+
+        key
+            The key/name of the file in S3.
+
+        upload_id
+            The ID of the multipart upload.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("s3", profile)
+    params = {}
+    params["Bucket"] = bucket
+    params["Key"] = key
+    params["UploadId"] = upload_id
+    return client.abort_multipart_upload(**params)
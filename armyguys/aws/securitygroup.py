@@ -325,3 +325,102 @@ def remove_outbound_rule(profile,
     params["IpPermissions"] = [rule]
     return client.revoke_security_group_egress(**params)
 
+
+def authorize_ingress(profile, security_group, permissions):
+    """Add many inbound rules to a security group in one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        security_group
+            The ID of the security group to add the rules to.
+
+        permissions
+            A list of IpPermissions, in the form boto3 expects.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["GroupId"] = security_group
+    params["IpPermissions"] = permissions
+    return client.authorize_security_group_ingress(**params)
+
+
+def revoke_ingress(profile, security_group, permissions):
+    """Remove many inbound rules from a security group in one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        security_group
+            The ID of the security group to remove the rules from.
+
+        permissions
+            A list of IpPermissions, in the form boto3 expects.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["GroupId"] = security_group
+    params["IpPermissions"] = permissions
+    return client.revoke_security_group_ingress(**params)
+
+
+def authorize_egress(profile, security_group, permissions):
+    """Add many outbound rules to a security group in one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        security_group
+            The ID of the security group to add the rules to.
+
+        permissions
+            A list of IpPermissions, in the form boto3 expects.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["GroupId"] = security_group
+    params["IpPermissions"] = permissions
+    return client.authorize_security_group_egress(**params)
+
+
+def revoke_egress(profile, security_group, permissions):
+    """Remove many outbound rules from a security group in one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        security_group
+            The ID of the security group to remove the rules from.
+
+        permissions
+            A list of IpPermissions, in the form boto3 expects.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["GroupId"] = security_group
+    params["IpPermissions"] = permissions
+    return client.revoke_security_group_egress(**params)
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for working with STS (who the caller is)."""
+
+from . import client as boto3client
+
+
+def get_caller_identity(profile):
+    """Get the account, ARN and user ID of the caller.
+
+    This works with any credentials (a user's, a role's,
+    or an assumed role's), and needs no permissions.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("sts", profile)
+    return client.get_caller_identity()
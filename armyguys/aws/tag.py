@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+"""Utilities for tagging many AWS resources at once."""
+
+from . import client as boto3client
+
+
+def create_ec2_tags(profile, resources, tags):
+    """Add tags to many EC2 resources (VPCs, subnets, etc.) at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        resources
+            A list of the IDs of the resources to tag.
+
+        tags
+            A list of {"Key": key, "Value": value} tags.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("ec2", profile)
+    params = {}
+    params["Resources"] = resources
+    params["Tags"] = tags
+    return client.create_tags(**params)
+
+
+def create_autoscaling_tags(profile, tags):
+    """Add (or update) tags on autoscaling groups.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        tags
+            A list of {"ResourceId": group, "ResourceType":
+            "auto-scaling-group", "Key": key, "Value": value,
+            "PropagateAtLaunch": bool} tags. They can be
+            for different groups.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("autoscaling", profile)
+    params = {}
+    params["Tags"] = tags
+    return client.create_or_update_tags(**params)
+
+
+def add_load_balancer_tags(profile, load_balancer, tags):
+    """Add tags to a load balancer.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        load_balancer
+            The name of the load balancer to tag.
+
+        tags
+            A list of {"Key": key, "Value": value} tags.
+
+    Returns:
+        The JSON response returned by boto3.
+
+    """
+    client = boto3client.get("elb", profile)
+    params = {}
+    params["LoadBalancerNames"] = [load_balancer]
+    params["Tags"] = tags
+    return client.add_tags(**params)
@@ -6,6 +6,7 @@ import click
 
 from ...jobs import clusters as cluster_jobs
 from ...jobs import instanceprofiles as instanceprofile_jobs
+from ...jobs import fanout as fanout_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import ImproperlyConfigured
@@ -29,6 +30,13 @@ def clusters():
 
 
 @clusters.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -39,14 +47,23 @@ def clusters():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_clusters(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List ECS clusters."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        records = cluster_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            records, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                cluster_jobs.fetch_all,
+                regions=regions)
+        else:
+            records = cluster_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view clusters."
         raise click.ClickException(msg)
@@ -55,7 +72,9 @@ def list_clusters(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if records:
+    if regions is not None:
+        utils.echo_by_region(records, errors, cluster_jobs.get_display_name)
+    elif records:
         for record in records:
             display_name = cluster_jobs.get_display_name(record)
             click.echo(display_name)
@@ -180,8 +199,8 @@ def create_cluster(
             dockerhub_email,
             dockerhub_username,
             dockerhub_password)
-    except PermissionDenied:
-        msg = "You don't have permission to create clusters."
+    except PermissionDenied as error:
+        msg = "You don't have permission to create clusters. " + str(error)
         raise click.ClickException(msg)
     except (MissingKey, Non200Response) as error:
         raise click.ClickException(str(error))
@@ -234,6 +253,81 @@ def delete_cluster(
         raise click.ClickException(str(error))
 
 
+@clusters.command(name="roll")
+@click.argument("name")
+@click.option(
+    "--instance-type",
+    help="A new EC2 instance type.")
+@click.option(
+    "--ami",
+    help="A new AMI ID.")
+@click.option(
+    "--key-pair",
+    help="A new key pair.")
+@click.option(
+    "--batch-size",
+    type=int,
+    default=1,
+    help="How many instances to replace at a time.")
+@click.option(
+    "--max-wait",
+    type=int,
+    default=600,
+    help="The most seconds to wait for each step of each batch.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def roll_cluster(
+        name,
+        instance_type=None,
+        ami=None,
+        key_pair=None,
+        batch_size=None,
+        max_wait=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Replace a cluster's instances with new ones."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    if batch_size < 1:
+        msg = "The batch size must be at least 1."
+        raise click.ClickException(msg)
+
+    try:
+        record = cluster_jobs.roll(
+            aws_profile,
+            name,
+            instance_type=instance_type,
+            ami=ami,
+            key_pair=key_pair,
+            batch_size=batch_size,
+            max_wait=max_wait)
+    except PermissionDenied:
+        msg = "You don't have permission to roll clusters."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ResourceAlreadyExists, ResourceNotCreated) as error:
+        raise click.ClickException(str(error))
+    except WaitTimedOut as error:
+        raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
+
+    click.echo(
+        "Replaced " + str(record["Replaced"]) + " instances with "
+        + record["LaunchConfigurationName"] + ".")
+
+
 @clusters.command(name="serve")
 @click.argument("cluster")
 @click.argument("loadbalancer")
@@ -4,9 +4,12 @@
 
 import click
 
+from ...jobs import fanout as fanout_jobs
 from ...jobs import launchconfigurations as launchconfig_jobs
 
 from ...jobs.exceptions import AwsError
+from ...jobs.exceptions import FileDoesNotExist
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
@@ -25,6 +28,13 @@ def launchconfigs():
 
 
 @launchconfigs.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -35,14 +45,23 @@ def launchconfigs():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_launch_configs(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List launch configurations."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        records = launchconfig_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            records, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                launchconfig_jobs.fetch_all,
+                regions=regions)
+        else:
+            records = launchconfig_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view launch configurations."
         raise click.ClickException(msg)
@@ -51,7 +70,12 @@ def list_launch_configs(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if records:
+    if regions is not None:
+        utils.echo_by_region(
+            records,
+            errors,
+            launchconfig_jobs.get_display_name)
+    elif records:
         for record in records:
             display_name = launchconfig_jobs.get_display_name(record)
             click.echo(display_name)
@@ -88,6 +112,11 @@ def list_launch_configs(
     "--user-data",
     multiple=True,
     help="TYPE:CONTENTS, e.g., 'text/x-shellscript:#/bin/bash \n touch logs'")
+@click.option(
+    "--compress-user-data/--no-compress-user-data",
+    default=None,
+    help="Gzip the user data. By default, it's only gzipped "
+         + "if it's too big otherwise.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -107,6 +136,7 @@ def create_launch_config(
         instance_profile=None,
         user_data_file=None,
         user_data=None,
+        compress_user_data=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
@@ -127,7 +157,8 @@ def create_launch_config(
             public_ip=public_ip,
             instance_profile=instance_profile,
             user_data_files=user_data_files,
-            user_data=user_data)
+            user_data=user_data,
+            compress_user_data=compress_user_data)
     except PermissionDenied:
         msg = "You don't have permission to create launch configurations."
         raise click.ClickException(msg)
@@ -137,6 +168,8 @@ def create_launch_config(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceAlreadyExists, ResourceNotCreated) as error:
         raise click.ClickException(str(error))
+    except (FileDoesNotExist, ImproperlyConfigured) as error:
+        raise click.ClickException(str(error))
 
     if records:
         for record in records:
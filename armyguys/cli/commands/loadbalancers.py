@@ -2,8 +2,13 @@
 
 """Commands for managing load balancers."""
 
+import time
+
 import click
 
+from ...jobs import fanout as fanout_jobs
+from ...jobs import listeners as listener_jobs
+from ...jobs import loadbalancerhealth as health_jobs
 from ...jobs import loadbalancers as loadbalancer_jobs
 
 from ...jobs.exceptions import AwsError
@@ -27,6 +32,13 @@ def loadbalancers():
 
 
 @loadbalancers.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -37,14 +49,23 @@ def loadbalancers():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_load_balancers(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List load balancers."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        records = loadbalancer_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            records, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                loadbalancer_jobs.fetch_all,
+                regions=regions)
+        else:
+            records = loadbalancer_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view load balancers."
         raise click.ClickException(msg)
@@ -53,7 +74,12 @@ def list_load_balancers(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if records:
+    if regions is not None:
+        utils.echo_by_region(
+            records,
+            errors,
+            loadbalancer_jobs.get_display_name)
+    elif records:
         for record in records:
             display_name = loadbalancer_jobs.get_display_name(record)
             click.echo(display_name)
@@ -64,7 +90,7 @@ def list_load_balancers(
 @click.option(
     "--listen",
     multiple=True,
-    help="PROTOCOL:PORT")
+    help="PROTOCOL:PORT[[:INSTANCE_PROTOCOL]:INSTANCE_PORT]")
 @click.option(
     "--security-group",
     multiple=True,
@@ -167,3 +193,170 @@ def delete_load_balancer(
         raise click.ClickException(str(error))
     except WaitTimedOut as error:
         raise click.ClickException(str(error))
+
+
+@loadbalancers.command(name="listeners")
+@click.argument("names", nargs=-1, required=True)
+@click.option(
+    "--listen",
+    multiple=True,
+    required=True,
+    help="PROTOCOL:PORT[[:INSTANCE_PROTOCOL]:INSTANCE_PORT]")
+@click.option(
+    "--dry-run",
+    is_flag=True,
+    help="Show the changes, but don't make them.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many load balancers to change at once.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def set_load_balancer_listeners(
+        names,
+        listen=None,
+        dry_run=None,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Make load balancers have exactly the given listeners."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    listeners = utils.parse_listeners(listen)
+
+    try:
+        changes = listener_jobs.reconcile(
+            aws_profile,
+            list(names),
+            listeners,
+            dry_run=dry_run,
+            max_workers=workers)
+    except PermissionDenied:
+        msg = "You don't have permission to change listeners."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ImproperlyConfigured) as error:
+        raise click.ClickException(str(error))
+
+    for name, record in changes.items():
+        if not record["Add"] and not record["Remove"]:
+            click.echo(name + ": no changes")
+            continue
+        for port in record["Remove"]:
+            click.echo(name + ": - " + str(port))
+        for listener in record["Add"]:
+            click.echo(
+                name + ": + "
+                + listener["Protocol"] + ":"
+                + str(listener["LoadBalancerPort"]) + " -> "
+                + listener["InstanceProtocol"] + ":"
+                + str(listener["InstancePort"]))
+
+
+def format_health(row):
+    """Describe one instance's health on one line."""
+    parts = [row["InstanceId"]]
+    parts.append(row["AutoScalingGroup"] or "-")
+    if row["Cluster"]:
+        status = row["ContainerStatus"] or "?"
+        if not row["AgentConnected"]:
+            status += ", agent down"
+        parts.append(row["Cluster"] + " (" + status + ")")
+    else:
+        parts.append("-")
+    states = row["LoadBalancers"]
+    in_service = [
+        x for x, state in states.items()
+        if state["State"] == health_jobs.IN_SERVICE]
+    parts.append(str(len(in_service)) + "/" + str(len(states)) + " in service")
+    for name, state in states.items():
+        if state["State"] != health_jobs.IN_SERVICE:
+            parts.append(name + ": " + state["State"]
+                         + " (" + state.get("ReasonCode", "") + ")")
+    return "  ".join(parts)
+
+
+@loadbalancers.command(name="health")
+@click.argument("names", nargs=-1)
+@click.option(
+    "--unhealthy",
+    is_flag=True,
+    help="Only show unhealthy instances.")
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep checking, more often while anything is unhealthy.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many requests to run at once.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def load_balancer_health(
+        names,
+        unhealthy=None,
+        watch=None,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Show the health of the instances behind load balancers.
+
+    Checks every load balancer, unless some NAMES are given.
+
+    """
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    interval = None
+    previous = None
+    while True:
+        try:
+            matrix = health_jobs.check(
+                aws_profile,
+                list(names),
+                max_workers=workers)
+        except PermissionDenied:
+            msg = "You don't have permission to view instance health."
+            raise click.ClickException(msg)
+        except (MissingKey, Non200Response) as error:
+            raise click.ClickException(str(error))
+        except AwsError as error:
+            raise click.ClickException(str(error))
+        except ResourceDoesNotExist as error:
+            raise click.ClickException(str(error))
+
+        bad = [x for x in matrix if not x["Healthy"]]
+        if watch:
+            click.echo("--- " + time.strftime("%H:%M:%S") + " ---")
+        for row in (bad if unhealthy else matrix):
+            click.echo(format_health(row))
+        click.echo(
+            str(len(bad)) + " of " + str(len(matrix))
+            + " instances unhealthy.")
+
+        if not watch:
+            break
+        interval = health_jobs.get_next_interval(interval, previous, matrix)
+        previous = matrix
+        try:
+            time.sleep(interval)
+        except KeyboardInterrupt:
+            break
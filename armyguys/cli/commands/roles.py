@@ -8,6 +8,7 @@ from ...jobs import roles as role_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import FileDoesNotExist
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
@@ -113,6 +114,59 @@ def create_role(
             click.echo(display_name)
 
 
+@roles.command(name="apply")
+@click.argument("name")
+@click.option(
+    "--filepath",
+    type=click.Path(exists=True),
+    help="A file containing the role's trust policy.")
+@click.option(
+    "--contents",
+    help="A JSON string of the role's trust policy.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def apply_role(
+        name,
+        filepath=None,
+        contents=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Create or update IAM roles, if they've changed."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    required_params = [filepath, contents]
+    if not any(required_params):
+        msg = "Which filepath or contents? Use --filepath or --contents."
+        raise click.ClickException(msg)
+    elif any(required_params) and all(required_params):
+        msg = "Specify a filepath or contents, but not both."
+        raise click.ClickException(msg)
+
+    try:
+        result = role_jobs.apply(aws_profile, name, filepath, contents)
+    except PermissionDenied:
+        msg = "You don't have permission to change IAM roles."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceAlreadyExists, ResourceNotCreated) as error:
+        raise click.ClickException(str(error))
+    except (FileDoesNotExist, ImproperlyConfigured) as error:
+        raise click.ClickException(str(error))
+
+    click.echo(name + ": " + result)
+
+
 @roles.command(name="delete")
 @click.argument("name")
 @click.option(
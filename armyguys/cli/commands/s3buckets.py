@@ -5,6 +5,7 @@
 import click
 
 from ...jobs import s3buckets as s3_jobs
+from ...jobs import s3files as s3file_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import MissingKey
@@ -56,6 +57,13 @@ def list_elasticbeanstalk_s3_buckets(
 
 
 @s3buckets.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list buckets in, instead of just listing.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List buckets in every region, with their regions.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -66,14 +74,20 @@ def list_elasticbeanstalk_s3_buckets(
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_s3_buckets(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List S3 buckets."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        buckets = s3_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            buckets, errors = s3_jobs.fetch_by_region(aws_profile, regions)
+        else:
+            buckets = s3_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view S3 buckets."
         raise click.ClickException(msg)
@@ -82,7 +96,14 @@ def list_s3_buckets(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if buckets:
+    if regions is not None:
+        utils.echo_by_region(buckets, {}, s3_jobs.get_display_name)
+        for name, error in errors.items():
+            click.echo(
+                "Could not find the region of " + name + ": "
+                + (str(error) or type(error).__name__),
+                err=True)
+    elif buckets:
         for bucket in buckets:
             display_name = s3_jobs.get_display_name(bucket)
             click.echo(display_name)
@@ -131,6 +152,10 @@ def create_s3_bucket(
 
 @s3buckets.command(name="delete")
 @click.argument("name")
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Delete all files in the bucket first.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -142,6 +167,7 @@ def create_s3_bucket(
     help="An AWS access key secret.")
 def delete_s3_bucket(
         name,
+        force=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
@@ -149,6 +175,10 @@ def delete_s3_bucket(
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
 
     try:
+        if force:
+            result = s3file_jobs.delete_all(aws_profile, name)
+            click.echo("Deleted " + str(result["Deleted"]) + " files.")
+            utils.echo_s3_errors(result["Errors"])
         buckets = s3_jobs.delete(aws_profile, name)
     except PermissionDenied:
         msg = "You don't have permission to delete S3 buckets."
@@ -159,4 +189,3 @@ def delete_s3_bucket(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceNotDeleted) as error:
         raise click.ClickException(str(error))
-
@@ -2,12 +2,16 @@
 
 """Commands for managing S3 files."""
 
+import os
+
 import click
 
 from ...jobs import s3files as s3_jobs
+from ...jobs import s3sync as sync_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import FileDoesNotExist
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
@@ -27,6 +31,19 @@ def s3files():
 
 @s3files.command(name="list")
 @click.argument("bucket")
+@click.option(
+    "--prefix",
+    help="Only list files whose names begin with this.")
+@click.option(
+    "--delimiter",
+    help="Roll names up to the next occurrence of this, e.g., '/'.")
+@click.option(
+    "--start-after",
+    help="Only list files whose names come after this.")
+@click.option(
+    "--dirs",
+    is_flag=True,
+    help="List one 'directory' level (same as --delimiter /).")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -38,14 +55,29 @@ def s3files():
     help="An AWS access key secret.")
 def list_s3_files(
         bucket,
+        prefix=None,
+        delimiter=None,
+        start_after=None,
+        dirs=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List S3 files."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
 
+    if dirs and not delimiter:
+        delimiter = "/"
+
     try:
-        files = s3_jobs.fetch_all(aws_profile, bucket)
+        files = s3_jobs.stream(
+            aws_profile,
+            bucket,
+            prefix=prefix,
+            delimiter=delimiter,
+            start_after=start_after)
+        for record in files:
+            display_name = s3_jobs.get_display_name(record)
+            click.echo(display_name)
     except PermissionDenied:
         msg = "You don't have permission to view S3 files."
         raise click.ClickException(msg)
@@ -56,15 +88,23 @@ def list_s3_files(
     except ResourceDoesNotExist as error:
         raise click.ClickException(str(error))
 
-    if files:
-        for record in files:
-            display_name = s3_jobs.get_display_name(record)
-            click.echo(display_name)
 
 @s3files.command(name="create")
 @click.argument("bucket")
 @click.argument("name")
 @click.argument("filepath", type=click.Path(exists=True))
+@click.option(
+    "--part-size",
+    type=int,
+    help="Part size (in MB) for large, multipart uploads.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many parts to upload at the same time.")
+@click.option(
+    "--compress",
+    type=click.Choice(["gzip", "zstd"]),
+    help="Compress the file before uploading it.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -78,14 +118,30 @@ def create_s3_file(
         bucket,
         name,
         filepath,
+        part_size=None,
+        workers=None,
+        compress=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """Create s3 files."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
 
+    if part_size:
+        part_size = part_size * 1024 * 1024
+
     try:
-        files = s3_jobs.create(aws_profile, bucket, name, filepath)
+        size = os.path.getsize(filepath)
+        with click.progressbar(length=size, label="Uploading") as bar:
+            files = s3_jobs.create(
+                aws_profile,
+                bucket,
+                name,
+                filepath,
+                part_size=part_size,
+                max_workers=workers,
+                callback=bar.update,
+                compress=compress)
     except PermissionDenied:
         msg = "You don't have permission to create S3 files."
         raise click.ClickException(msg)
@@ -95,6 +151,8 @@ def create_s3_file(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceAlreadyExists, ResourceNotCreated, FileDoesNotExist) as error:
         raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
 
     if files:
         for record in files:
@@ -102,9 +160,18 @@ def create_s3_file(
             click.echo(display_name)
 
 
-@s3files.command(name="delete")
+@s3files.command(name="get")
 @click.argument("bucket")
 @click.argument("name")
+@click.argument("destination", required=False)
+@click.option(
+    "--part-size",
+    type=int,
+    help="Range size (in MB) for large, parallel downloads.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many ranges to download at the same time.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -114,17 +181,158 @@ def create_s3_file(
 @click.option(
     "--access-key-secret",
     help="An AWS access key secret.")
-def delete_s3_file(
+def get_s3_file(
         bucket,
         name,
+        destination=None,
+        part_size=None,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Download s3 files (to stdout if there's no DESTINATION or it's -)."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    if part_size:
+        part_size = part_size * 1024 * 1024
+
+    try:
+        if not destination or destination == "-":
+            stdout = click.get_binary_stream("stdout")
+            s3_jobs.copy_to(aws_profile, bucket, name, stdout)
+            stdout.flush()
+            return
+
+        if os.path.isdir(destination):
+            destination = os.path.join(destination, name.split("/")[-1])
+        record = s3_jobs.fetch_details(aws_profile, bucket, name)
+        size = record["ContentLength"]
+        with click.progressbar(length=size, label="Downloading") as bar:
+            s3_jobs.download(
+                aws_profile,
+                bucket,
+                name,
+                destination,
+                part_size=part_size,
+                max_workers=workers,
+                callback=bar.update,
+                record=record)
+    except PermissionDenied:
+        msg = "You don't have permission to get S3 files."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ResourceNotCreated) as error:
+        raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
+
+    click.echo(destination)
+
+
+@s3files.command(name="sync")
+@click.argument("local_dir", type=click.Path(exists=True, file_okay=False))
+@click.argument("destination")
+@click.option(
+    "--delete",
+    is_flag=True,
+    help="Delete files in S3 that aren't in LOCAL_DIR.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many files to upload at the same time.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def sync_s3_files(
+        local_dir,
+        destination,
+        delete=None,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Sync a directory to BUCKET/PREFIX."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    bucket, prefix = utils.parse_s3_path(destination)
+
+    def echo_upload(record):
+        click.echo("upload: " + str(record["Key"]))
+
+    try:
+        summary = sync_jobs.sync(
+            aws_profile,
+            local_dir,
+            bucket,
+            prefix=prefix,
+            delete=delete,
+            max_workers=workers,
+            callback=echo_upload)
+    except PermissionDenied:
+        msg = "You don't have permission to sync S3 files."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ResourceNotCreated, FileDoesNotExist) as error:
+        raise click.ClickException(str(error))
+
+    click.echo(
+        "Uploaded " + str(summary["Uploaded"]) + " files ("
+        + str(summary["UploadedBytes"]) + " bytes).")
+    click.echo(
+        "Skipped " + str(summary["Skipped"]) + " files ("
+        + str(summary["SkippedBytes"]) + " bytes).")
+    if delete:
+        click.echo("Deleted " + str(summary["Deleted"]) + " files.")
+        utils.echo_s3_errors(summary["Errors"])
+
+
+@s3files.command(name="delete")
+@click.argument("bucket")
+@click.argument("name", required=False)
+@click.option(
+    "--prefix",
+    help="Delete every file whose name begins with this.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def delete_s3_file(
+        bucket,
+        name=None,
+        prefix=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """Delete s3 files."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
 
+    if not any([name, prefix]) or all([name, prefix]):
+        msg = "Specify a file NAME or a --prefix, but not both."
+        raise click.ClickException(msg)
+
+    result = None
     try:
-        s3_jobs.delete(aws_profile, bucket, name)
+        if prefix:
+            result = s3_jobs.delete_all(aws_profile, bucket, prefix)
+        else:
+            s3_jobs.delete(aws_profile, bucket, name)
     except PermissionDenied:
         msg = "You don't have permission to delete S3 files."
         raise click.ClickException(msg)
@@ -134,3 +342,7 @@ def delete_s3_file(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceNotDeleted) as error:
         raise click.ClickException(str(error))
+
+    if result:
+        click.echo("Deleted " + str(result["Deleted"]) + " files.")
+        utils.echo_s3_errors(result["Errors"])
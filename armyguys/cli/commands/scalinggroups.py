@@ -5,6 +5,7 @@
 import click
 
 from ...jobs import autoscalinggroups as scalinggroup_jobs
+from ...jobs import fanout as fanout_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import ImproperlyConfigured
@@ -27,6 +28,13 @@ def scalinggroups():
 
 
 @scalinggroups.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -37,14 +45,23 @@ def scalinggroups():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_auto_scaling_groups(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List auto scaling groups."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        records = scalinggroup_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            records, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                scalinggroup_jobs.fetch_all,
+                regions=regions)
+        else:
+            records = scalinggroup_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view auto scaling groups."
         raise click.ClickException(msg)
@@ -53,7 +70,12 @@ def list_auto_scaling_groups(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if records:
+    if regions is not None:
+        utils.echo_by_region(
+            records,
+            errors,
+            scalinggroup_jobs.get_display_name)
+    elif records:
         for record in records:
             display_name = scalinggroup_jobs.get_display_name(record)
             click.echo(display_name)
@@ -2,11 +2,16 @@
 
 """Commands for managing security groups."""
 
+import json
+
 import click
 
+from ...jobs import fanout as fanout_jobs
 from ...jobs import securitygroups as sg_jobs
+from ...jobs import utils as job_utils
 
 from ...jobs.exceptions import AwsError
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
@@ -25,6 +30,13 @@ def securitygroups():
 
 
 @securitygroups.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -35,14 +47,23 @@ def securitygroups():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_security_groups(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List security groups."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        security_groups = sg_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            security_groups, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                sg_jobs.fetch_all,
+                regions=regions)
+        else:
+            security_groups = sg_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view security groups."
         raise click.ClickException(msg)
@@ -51,7 +72,9 @@ def list_security_groups(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if security_groups:
+    if regions is not None:
+        utils.echo_by_region(security_groups, errors, sg_jobs.get_display_name)
+    elif security_groups:
         for security_group in security_groups:
             display_name = sg_jobs.get_display_name(security_group)
             click.echo(display_name)
@@ -137,3 +160,82 @@ def delete_security_group(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceNotDeleted) as error:
         raise click.ClickException(str(error))
+
+
+@securitygroups.command(name="apply")
+@click.argument("rules_file", type=click.File("r"))
+@click.argument("names", nargs=-1, required=True)
+@click.option(
+    "--prune",
+    is_flag=True,
+    help="Remove rules that aren't in RULES_FILE.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def apply_security_group_rules(
+        rules_file,
+        names,
+        prune=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Apply a JSON rule set to security groups.
+
+    RULES_FILE holds {"Inbound": [rules], "Outbound": [rules]}, where
+    each rule is like {"Protocol": "tcp", "Port": 22, "Cidr": "10.0.0.0/8"}.
+    A direction that's left out is left alone.
+
+    """
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    try:
+        rule_set = json.load(rules_file)
+    except ValueError as error:
+        msg = "Bad rules file: " + str(error)
+        raise click.ClickException(msg)
+
+    try:
+        records = sg_jobs.resolve(aws_profile, names)
+    except PermissionDenied:
+        msg = "You don't have permission to view security groups."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+
+    missing = job_utils.get_missing(records)
+    if missing:
+        msg = "No security groups: " + ", ".join(missing) + "."
+        raise click.ClickException(msg)
+
+    for name, record in records.items():
+        try:
+            result = sg_jobs.apply_rules(
+                aws_profile,
+                name,
+                inbound=rule_set.get("Inbound"),
+                outbound=rule_set.get("Outbound"),
+                prune=prune,
+                record=record)
+        except PermissionDenied:
+            msg = "You don't have permission to change security groups."
+            raise click.ClickException(msg)
+        except (MissingKey, Non200Response) as error:
+            raise click.ClickException(str(error))
+        except AwsError as error:
+            raise click.ClickException(str(error))
+        except (ResourceDoesNotExist, ImproperlyConfigured) as error:
+            raise click.ClickException(str(error))
+
+        for direction in ["Inbound", "Outbound"]:
+            click.echo(
+                name + " " + direction.lower() + ": "
+                + str(result[direction]["Added"]) + " added, "
+                + str(result[direction]["Removed"]) + " removed.")
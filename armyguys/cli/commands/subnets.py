@@ -7,6 +7,7 @@ import click
 from ...jobs import subnets as subnet_jobs
 
 from ...jobs.exceptions import AwsError
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
@@ -74,12 +75,23 @@ def list_subnets(
 @click.option(
     "--cidr",
     help="The network range, e.g., 10.0.0.0/24.")
+@click.option(
+    "--auto-cidr",
+    is_flag=True,
+    help="Use the first free network range in the VPC.")
+@click.option(
+    "--prefix-length",
+    type=int,
+    default=24,
+    help="The size of the range to use with --auto-cidr, e.g., 24.")
 @click.option(
     "--vpc",
     help="The name or ID of a VPC.")
 @click.option(
     "--zone",
-    help="An availability zone.")
+    multiple=True,
+    help="An availability zone. Repeat it (with --auto-cidr) "
+         + "to create one subnet per zone.")
 @click.option(
     "--tag",
     multiple=True,
@@ -96,6 +108,8 @@ def list_subnets(
 def create_subnet(
         name,
         cidr=None,
+        auto_cidr=None,
+        prefix_length=None,
         vpc=None,
         zone=None,
         tag=None,
@@ -105,20 +119,40 @@ def create_subnet(
     """Create subnets."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
 
-    if not cidr:
-        msg = "Which CIDR? Use --cidr."
+    if not cidr and not auto_cidr:
+        msg = "Which CIDR? Use --cidr or --auto-cidr."
         raise click.ClickException(msg)
 
     if not vpc:
         msg = "Which VPC? Use --vpc."
         raise click.ClickException(msg)
 
+    if len(zone) > 1 and not auto_cidr:
+        msg = "Use --auto-cidr to create subnets in many zones."
+        raise click.ClickException(msg)
+
     tags = None
     if tag:
         tags = utils.parse_tags(tag)
-    
+
     try:
-        records = subnet_jobs.create(aws_profile, name, vpc, cidr, zone, tags)
+        if len(zone) > 1:
+            records = subnet_jobs.create_many(
+                aws_profile,
+                name,
+                vpc,
+                prefix_length,
+                list(zone),
+                tags)
+        else:
+            records = subnet_jobs.create(
+                aws_profile,
+                name,
+                vpc,
+                cidr_block=cidr,
+                zone=zone[0] if zone else None,
+                tags=tags,
+                prefix_length=prefix_length)
     except PermissionDenied:
         msg = "You don't have permission to create subnets."
         raise click.ClickException(msg)
@@ -128,6 +162,8 @@ def create_subnet(
         raise click.ClickException(str(error))
     except (ResourceDoesNotExist, ResourceAlreadyExists, ResourceNotCreated) as error:
         raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
 
     if records:
         for record in records:
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Commands for tagging resources."""
+
+import click
+
+from ...jobs import securitygroups as sg_jobs
+from ...jobs import subnets as subnet_jobs
+from ...jobs import tags as tag_jobs
+from ...jobs import utils as job_utils
+from ...jobs import vpcs as vpc_jobs
+
+from ...jobs.exceptions import AwsError
+from ...jobs.exceptions import ImproperlyConfigured
+from ...jobs.exceptions import MissingKey
+from ...jobs.exceptions import Non200Response
+from ...jobs.exceptions import PermissionDenied
+
+from .. import utils
+
+
+# Resources that can be given by name, and the jobs that resolve them.
+RESOLVERS = {
+    "sg": sg_jobs,
+    "subnet": subnet_jobs,
+    "vpc": vpc_jobs,
+    }
+
+
+def parse_resources(aws_profile, resources):
+    """Turn RESOURCE arguments into (kind, ref) tuples for the tag jobs.
+
+    Security groups, subnets and VPCs given by name are looked up
+    in batches, one kind at a time.
+
+    """
+    result = []
+    lookups = {}
+    for resource in resources:
+        kind, sep, ref = resource.partition(":")
+        if not sep:
+            result.append((tag_jobs.EC2, resource))
+        elif kind == "asg":
+            result.append((tag_jobs.AUTOSCALING_GROUP, ref))
+        elif kind == "elb":
+            result.append((tag_jobs.LOAD_BALANCER, ref))
+        elif kind in RESOLVERS:
+            lookups.setdefault(kind, []).append(ref)
+        else:
+            msg = "Bad resource: '" + str(resource) + "'."
+            raise click.ClickException(msg)
+
+    for kind, refs in lookups.items():
+        jobs = RESOLVERS[kind]
+        records = jobs.resolve(aws_profile, refs)
+        missing = job_utils.get_missing(records)
+        if missing:
+            msg = "No " + kind + ": " + ", ".join(missing) + "."
+            raise click.ClickException(msg)
+        for record in records.values():
+            result.append((tag_jobs.EC2, jobs.get_id(record)))
+
+    return result
+
+
+@click.group()
+def tags():
+    """Manage tags."""
+    pass
+
+
+@tags.command(name="apply")
+@click.argument("resources", nargs=-1, required=True)
+@click.option(
+    "--tag",
+    multiple=True,
+    help="KEY:VALUE tag to add.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def apply_tags(
+        resources,
+        tag=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Tag many resources at once.
+
+    Each RESOURCE is an EC2 ID (e.g., sg-1234), or one of asg:NAME,
+    elb:NAME, sg:NAME, subnet:NAME, or vpc:NAME.
+
+    """
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    if not tag:
+        msg = "Which tags? Use --tag."
+        raise click.ClickException(msg)
+    tag_list = utils.parse_tags(tag)
+
+    try:
+        resource_list = parse_resources(aws_profile, resources)
+        count = tag_jobs.apply(aws_profile, resource_list, tag_list)
+    except PermissionDenied:
+        msg = "You don't have permission to tag resources."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
+
+    click.echo(
+        "Tagged " + str(len(resource_list)) + " resources in "
+        + str(count) + " requests.")
@@ -4,6 +4,7 @@
 
 import click
 
+from ...jobs import fanout as fanout_jobs
 from ...jobs import taskdefinitions as taskdef_jobs
 
 from ...jobs.exceptions import AwsError
@@ -26,6 +27,13 @@ def taskdefinitions():
 
 
 @taskdefinitions.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -36,14 +44,23 @@ def taskdefinitions():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_task_definitions(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List ECS task definitions."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        records = taskdef_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            records, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                taskdef_jobs.fetch_all,
+                regions=regions)
+        else:
+            records = taskdef_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view task definitions."
         raise click.ClickException(msg)
@@ -54,7 +71,12 @@ def list_task_definitions(
     except ResourceDoesNotExist as error:
         raise click.ClickException(str(error))
 
-    if records:
+    if regions is not None:
+        utils.echo_by_region(
+            records,
+            errors,
+            taskdef_jobs.get_display_name_from_arn)
+    elif records:
         for record in records:
             display_name = taskdef_jobs.get_display_name_from_arn(record)
             click.echo(display_name)
@@ -1,15 +1,23 @@
 # -*- coding: utf-8 -*-
 
-"""Commands for managing availability zones."""
+"""Commands for managing VPCs."""
 
 import click
 
+from ...jobs import fanout as fanout_jobs
+from ...jobs import topologies as topology_jobs
 from ...jobs import vpcs as vpc_jobs
 
 from ...jobs.exceptions import AwsError
+from ...jobs.exceptions import ImproperlyConfigured
 from ...jobs.exceptions import MissingKey
 from ...jobs.exceptions import Non200Response
 from ...jobs.exceptions import PermissionDenied
+from ...jobs.exceptions import ResourceAlreadyExists
+from ...jobs.exceptions import ResourceDoesNotExist
+from ...jobs.exceptions import ResourceHasDependency
+from ...jobs.exceptions import ResourceNotCreated
+from ...jobs.exceptions import ResourceNotDeleted
 
 from .. import utils
 
@@ -21,6 +29,13 @@ def vpcs():
 
 
 @vpcs.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -31,14 +46,23 @@ def vpcs():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_vpcs(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List VPCs."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        vpcs = vpc_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            vpcs, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                vpc_jobs.fetch_all,
+                regions=regions)
+        else:
+            vpcs = vpc_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view VPCs."
         raise click.ClickException(msg)
@@ -47,7 +71,140 @@ def list_vpcs(
     except AwsError as error:
         raise click.ClickException(str(error))
 
-    if vpcs:
+    if regions is not None:
+        utils.echo_by_region(vpcs, errors, vpc_jobs.get_display_name)
+    elif vpcs:
         for vpc in vpcs:
             display_name = vpc_jobs.get_display_name(vpc)
             click.echo(display_name)
+
+
+@vpcs.command(name="build")
+@click.argument("name")
+@click.option(
+    "--cidr",
+    default="10.0.0.0/16",
+    help="The VPC's network range, e.g., 10.0.0.0/16.")
+@click.option(
+    "--zone",
+    multiple=True,
+    help="An availability zone to put a subnet in. Repeat it "
+         + "for more zones. Defaults to every zone.")
+@click.option(
+    "--prefix-length",
+    type=int,
+    default=24,
+    help="The size of each subnet's range, e.g., 24.")
+@click.option(
+    "--private",
+    is_flag=True,
+    help="Don't route the subnets to the internet.")
+@click.option(
+    "--tag",
+    multiple=True,
+    help="KEY:VALUE tag for everything in the VPC.")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many requests to run at once.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def build_vpc(
+        name,
+        cidr=None,
+        zone=None,
+        prefix_length=None,
+        private=None,
+        tag=None,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Build a VPC with subnets, a gateway and routes."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    tags = None
+    if tag:
+        tags = utils.parse_tags(tag)
+
+    try:
+        record = topology_jobs.build(
+            aws_profile,
+            name,
+            cidr,
+            zones=list(zone),
+            prefix_length=prefix_length,
+            public=not private,
+            tags=tags,
+            max_workers=workers)
+    except PermissionDenied:
+        msg = "You don't have permission to build VPCs."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ResourceAlreadyExists, ResourceNotCreated) as error:
+        raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
+
+    click.echo(record["VpcId"] + " (" + name + ")")
+    if record["InternetGatewayId"]:
+        click.echo("Gateway: " + record["InternetGatewayId"])
+        click.echo("Route table: " + record["RouteTableId"])
+    for subnet in record["Subnets"]:
+        click.echo(
+            "Subnet: " + subnet["SubnetId"] + " (" + subnet["Name"] + ") "
+            + subnet["CidrBlock"])
+
+
+@vpcs.command(name="teardown")
+@click.argument("name")
+@click.option(
+    "--workers",
+    type=int,
+    help="How many requests to run at once.")
+@click.option(
+    "--profile",
+    help="An AWS profile to connect with.")
+@click.option(
+    "--access-key-id",
+    help="An AWS access key ID.")
+@click.option(
+    "--access-key-secret",
+    help="An AWS access key secret.")
+def teardown_vpc(
+        name,
+        workers=None,
+        profile=None,
+        access_key_id=None,
+        access_key_secret=None):
+    """Delete a VPC and everything in it."""
+    aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+
+    try:
+        count = topology_jobs.teardown(
+            aws_profile,
+            name,
+            max_workers=workers)
+    except PermissionDenied:
+        msg = "You don't have permission to delete VPCs."
+        raise click.ClickException(msg)
+    except (MissingKey, Non200Response) as error:
+        raise click.ClickException(str(error))
+    except AwsError as error:
+        raise click.ClickException(str(error))
+    except (ResourceDoesNotExist, ResourceHasDependency, ResourceNotDeleted) as error:
+        raise click.ClickException(str(error))
+    except ImproperlyConfigured as error:
+        raise click.ClickException(str(error))
+
+    click.echo("Deleted " + name + " in " + str(count) + " steps.")
@@ -5,6 +5,7 @@
 import click
 
 from ...jobs import availabilityzones as zone_jobs
+from ...jobs import fanout as fanout_jobs
 
 from ...jobs.exceptions import AwsError
 from ...jobs.exceptions import MissingKey
@@ -21,6 +22,13 @@ def zones():
 
 
 @zones.command(name="list")
+@click.option(
+    "--regions",
+    help="REGION,REGION,... to list in, instead of the profile's region.")
+@click.option(
+    "--all-regions",
+    is_flag=True,
+    help="List in every enabled region.")
 @click.option(
     "--profile",
     help="An AWS profile to connect with.")
@@ -31,14 +39,23 @@ def zones():
     "--access-key-secret",
     help="An AWS access key secret.")
 def list_availability_zones(
+        regions=None,
+        all_regions=None,
         profile=None,
         access_key_id=None,
         access_key_secret=None):
     """List availability zones."""
     aws_profile = utils.get_profile(profile, access_key_id, access_key_secret)
+    regions = utils.parse_regions(regions, all_regions)
 
     try:
-        zones = zone_jobs.fetch_all(aws_profile)
+        if regions is not None:
+            zones, errors = fanout_jobs.fetch_all(
+                aws_profile,
+                zone_jobs.fetch_all,
+                regions=regions)
+        else:
+            zones = zone_jobs.fetch_all(aws_profile)
     except PermissionDenied:
         msg = "You don't have permission to view availability zones."
         raise click.ClickException(msg)
@@ -47,6 +64,8 @@ def list_availability_zones(
     except AwsError as error:
         raise click.ClickException(str(error))
     
-    if zones:
+    if regions is not None:
+        utils.echo_by_region(zones, errors, lambda x: x["ZoneName"])
+    elif zones:
         for zone in zones:
             click.echo(zone["ZoneName"])
@@ -23,6 +23,7 @@ from .commands import scalinggroups
 from .commands import securitygroups
 from .commands import services
 from .commands import subnets
+from .commands import tags
 from .commands import taskdefinitions
 from .commands import tasks
 from .commands import vpcs
@@ -42,6 +43,7 @@ plugins = {
     "securitygroups": securitygroups,
     "services": services,
     "subnets": subnets,
+    "tags": tags,
     "taskdefinitions": taskdefinitions,
     "tasks": tasks,
     "vpcs": vpcs,
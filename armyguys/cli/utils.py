@@ -134,40 +134,107 @@ def parse_user_data(user_data):
     return result
 
 
+def parse_listener_port(record, port):
+    port = port.strip()
+    if not port:
+        msg = "Empty port value: " + str(record)
+        raise click.ClickException(msg)
+    try:
+        return int(port)
+    except (TypeError, ValueError):
+        msg = "Port must be an integer, not: " + str(port)
+        raise click.ClickException(msg)
+
+
+def parse_listener_protocol(record, protocol):
+    allowed_protocols = ["HTTP", "TCP"]
+    protocol = protocol.strip().upper()
+    if not protocol:
+        msg = "Empty protocol value: " + str(record)
+        raise click.ClickException(msg)
+    if protocol not in allowed_protocols:
+        click.echo("Protocol must be one of:")
+        click.echo("- HTTP")
+        click.echo("- TCP")
+        msg = "Unrecognized protocol."
+        raise click.ClickException(msg)
+    return protocol
+
+
 def parse_listeners(listeners):
     result = []
-    allowed_protocols = ["HTTP", "TCP"]
     if listeners:
         for record in listeners:
             listener_parts = record.split(":")
-            if len(listener_parts) != 2:
+            if len(listener_parts) not in [2, 3, 4]:
                 msg = "Bad listener: '" + str(record) + "'. " \
-                      + "Must be PROTOCOL:PORT."
-                raise click.ClickException(msg)
-            protocol = listener_parts[0].strip().upper()
-            port = listener_parts[1].strip()
-            if not protocol:
-                msg = "Empty protocol value: " + str(record)
-                raise click.ClickException(msg)
-            elif not port:
-                msg = "Empty port value: " + str(record)
-                raise click.ClickException(msg)
-            if protocol not in allowed_protocols:
-                click.echo("Protocol must be one of:")
-                click.echo("- HTTP")
-                click.echo("- TCP")
-                msg = "Unrecognized protocol."
-                raise click.ClickException(msg)
-            try:
-                port = int(port)
-            except (TypeError, ValueError):
-                msg = "Port must be an integer, not: " + str(port)
-                raise click.ClickException(msg)
-            if all([protocol, port]):
-                result.append({
-                    "Protocol": protocol,
-                    "LoadBalancerPort": port,
-                    "InstanceProtocol": protocol,
-                    "InstancePort": port,
-                })
+                      + "Must be PROTOCOL:PORT, " \
+                      + "PROTOCOL:PORT:INSTANCE_PORT, or " \
+                      + "PROTOCOL:PORT:INSTANCE_PROTOCOL:INSTANCE_PORT."
+                raise click.ClickException(msg)
+            protocol = parse_listener_protocol(record, listener_parts[0])
+            port = parse_listener_port(record, listener_parts[1])
+            instance_protocol = protocol
+            instance_port = port
+            if len(listener_parts) == 3:
+                instance_port = parse_listener_port(record, listener_parts[2])
+            elif len(listener_parts) == 4:
+                instance_protocol = parse_listener_protocol(
+                    record,
+                    listener_parts[2])
+                instance_port = parse_listener_port(record, listener_parts[3])
+            result.append({
+                "Protocol": protocol,
+                "LoadBalancerPort": port,
+                "InstanceProtocol": instance_protocol,
+                "InstancePort": instance_port,
+            })
+    return result
+
+
+def parse_s3_path(s3_path):
+    s3_path = s3_path.strip()
+    if s3_path.startswith("s3://"):
+        s3_path = s3_path[len("s3://"):]
+    parts = s3_path.split("/", 1)
+    bucket = parts[0]
+    prefix = parts[1] if len(parts) > 1 else None
+    if not bucket:
+        msg = "Bad S3 path: '" + str(s3_path) + "'. Must be BUCKET/PREFIX."
+        raise click.ClickException(msg)
+    return bucket, prefix
+
+
+def echo_s3_errors(errors):
+    if errors:
+        for error in errors:
+            click.echo(
+                "Could not delete '" + str(error.get("Key")) + "': "
+                + str(error.get("Code")) + " " + str(error.get("Message")))
+        msg = str(len(errors)) + " files could not be deleted."
+        raise click.ClickException(msg)
+
+
+def parse_regions(regions=None, all_regions=False):
+    if regions and all_regions:
+        msg = "Use --regions or --all-regions, but not both."
+        raise click.ClickException(msg)
+    if all_regions:
+        return []
+    if not regions:
+        return None
+    result = [x.strip() for x in regions.split(",") if x.strip()]
+    if not result:
+        msg = "Bad regions: '" + str(regions) + "'. Must be REGION,REGION."
+        raise click.ClickException(msg)
     return result
+
+
+def echo_by_region(records, errors, get_display_name):
+    for region, record in records:
+        click.echo(region + "  " + get_display_name(record))
+    for region, error in errors.items():
+        click.echo(
+            "Could not list in " + region + ": "
+            + (str(error) or type(error).__name__),
+            err=True)
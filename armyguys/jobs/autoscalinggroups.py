@@ -12,6 +12,7 @@ from . import availabilityzones as zone_jobs
 from . import launchconfigurations as launchconfig_jobs
 from . import loadbalancers as loadbalancer_jobs
 from . import regions as region_jobs
+from . import tags as tag_jobs
 
 from .exceptions import ResourceAlreadyExists
 from .exceptions import ResourceDoesNotExist
@@ -261,14 +262,7 @@ def create(
         raise ResourceNotCreated(msg)
 
     # Now tag the auto scaling group.
-    if tags:
-        for tag in tags:
-            params = {}
-            params["profile"] = profile
-            params["autoscaling_group"] = name
-            params["key"] = tag["Key"]
-            params["value"] = tag["Value"]
-            utils.do_request(autoscalinggroup, "tag", params)
+    tag_jobs.apply(profile, [(tag_jobs.AUTOSCALING_GROUP, name)], tags)
 
     # Send back the auto scaling group's info.
     return auto_scaling_group_data
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for planning the CIDR blocks of subnets."""
+
+import bisect
+import ipaddress
+
+from ..aws import subnet
+
+from .exceptions import ImproperlyConfigured
+from .exceptions import ResourceNotCreated
+
+from . import utils
+
+
+# AWS only allows subnets between these sizes.
+MIN_PREFIX_LENGTH = 16
+MAX_PREFIX_LENGTH = 28
+
+
+def check_prefix_length(prefix_length):
+    """Make sure AWS allows subnets of a given size.
+
+    Args:
+
+        prefix_length
+            The prefix length, e.g., 24 for a /24.
+
+    Raises:
+        ``ImproperlyConfigured`` if it doesn't.
+
+    """
+    if not MIN_PREFIX_LENGTH <= prefix_length <= MAX_PREFIX_LENGTH:
+        msg = "Subnets must be between /" + str(MIN_PREFIX_LENGTH) \
+              + " and /" + str(MAX_PREFIX_LENGTH) + "."
+        raise ImproperlyConfigured(msg)
+
+
+def get_networks(vpc_record):
+    """Get the (IPv4) networks a VPC covers.
+
+    Args:
+
+        vpc_record
+            A VPC record returned by AWS.
+
+    Returns:
+        A list of ``ipaddress.IPv4Network`` objects, one for the
+        VPC's primary CIDR block and one for each secondary block.
+
+    """
+    blocks = []
+    for association in vpc_record.get("CidrBlockAssociationSet", []):
+        state = association.get("CidrBlockState", {}).get("State")
+        if state == "associated":
+            blocks.append(association["CidrBlock"])
+    if not blocks:
+        blocks.append(vpc_record["CidrBlock"])
+    return [ipaddress.IPv4Network(x) for x in blocks]
+
+
+def get_interval(cidr_block):
+    """Get the first and last address of a CIDR block, as integers.
+
+    Args:
+
+        cidr_block
+            A CIDR block, e.g., "10.0.1.0/24", or an
+            ``ipaddress.IPv4Network`` object.
+
+    Returns:
+        A (first, last) tuple.
+
+    """
+    network = ipaddress.IPv4Network(str(cidr_block))
+    return (int(network.network_address), int(network.broadcast_address))
+
+
+def get_intervals(subnet_records):
+    """Get the address ranges some subnets take up.
+
+    Args:
+
+        subnet_records
+            A list of subnet records returned by AWS.
+
+    Returns:
+        A sorted list of (first, last) tuples. Subnets in a VPC
+        never overlap, so neither do these.
+
+    """
+    return sorted(get_interval(x["CidrBlock"]) for x in subnet_records)
+
+
+def find_free(network, intervals, prefix_length):
+    """Find the first free block of a given size in a network.
+
+    Args:
+
+        network
+            The ``ipaddress.IPv4Network`` to look in.
+
+        intervals
+            A sorted list of (first, last) tuples of the
+            address ranges already taken.
+
+        prefix_length
+            The prefix length of the block, e.g., 24 for a /24.
+
+    Returns:
+        The free block as an ``ipaddress.IPv4Network``,
+        or None if there's no room.
+
+    """
+    if prefix_length < network.prefixlen:
+        return None
+    size = 2 ** (32 - prefix_length)
+    first, last = get_interval(network)
+
+    # Start at the last taken range that begins at or before the
+    # network, and step past each range that gets in the way.
+    index = max(bisect.bisect_right(intervals, (first, last)) - 1, 0)
+    candidate = first
+    while candidate + size - 1 <= last:
+        while index < len(intervals) and intervals[index][1] < candidate:
+            index += 1
+        if index == len(intervals) or intervals[index][0] >= candidate + size:
+            address = ipaddress.IPv4Address(candidate)
+            return ipaddress.IPv4Network(
+                str(address) + "/" + str(prefix_length))
+        end = intervals[index][1] + 1
+        candidate = ((end + size - 1) // size) * size
+    return None
+
+
+def allocate(networks, intervals, prefix_length):
+    """Allocate the first free block of a given size.
+
+    Args:
+
+        networks
+            A list of ``ipaddress.IPv4Network`` objects to allocate
+            from, e.g., from ``get_networks()``.
+
+        intervals
+            A sorted list of (first, last) tuples of the address
+            ranges already taken. The new block is added to it.
+
+        prefix_length
+            The prefix length of the block, e.g., 24 for a /24.
+
+    Raises:
+        ``ResourceNotCreated`` if there's no room left.
+
+    Returns:
+        The new block, in CIDR notation, e.g., "10.0.3.0/24".
+
+    """
+    for network in networks:
+        block = find_free(network, intervals, prefix_length)
+        if block:
+            bisect.insort(intervals, get_interval(block))
+            return str(block)
+    msg = "No room for a /" + str(prefix_length) + " subnet."
+    raise ResourceNotCreated(msg)
+
+
+def plan(profile, vpc_record, prefix_length, zones=None, count=None):
+    """Plan the CIDR blocks for one or more new subnets in a VPC.
+
+    The VPC's existing subnets are fetched with one request, and
+    each new block is carved out of the first gap big enough for it.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        vpc_record
+            The VPC's record, as returned by AWS.
+
+        prefix_length
+            The prefix length of each block, e.g., 24 for a /24.
+
+        zones
+            A list of availability zones. The blocks are handed out
+            to them in turn.
+
+        count
+            How many blocks to plan. Defaults to one per zone
+            (or just one, if there are no zones).
+
+    Raises:
+        ``ImproperlyConfigured`` if the prefix length won't do.
+
+    Returns:
+        A list of {"CidrBlock": block, "AvailabilityZone": zone}
+        entries. The zone is None if no zones were given.
+
+    """
+    check_prefix_length(prefix_length)
+    if not zones:
+        zones = [None]
+    if not count:
+        count = len(zones)
+
+    # Find out what's already taken.
+    params = {}
+    params["profile"] = profile
+    params["filters"] = [
+        {"Name": "vpc-id", "Values": [vpc_record["VpcId"]]},
+        ]
+    response = utils.do_request(subnet, "get", params)
+    data = utils.get_data("Subnets", response)
+    intervals = get_intervals(data)
+
+    # Carve out the new blocks.
+    networks = get_networks(vpc_record)
+    result = []
+    for i in range(count):
+        result.append({
+            "CidrBlock": allocate(networks, intervals, prefix_length),
+            "AvailabilityZone": zones[i % len(zones)],
+            })
+    return result
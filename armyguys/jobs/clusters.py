@@ -2,6 +2,7 @@
 
 """Jobs for ECS clusters."""
 
+from base64 import b64decode
 from base64 import b64encode
 from time import sleep
 
@@ -9,17 +10,24 @@ import json
 
 from botocore.exceptions import ClientError
 
-from ..aws.iam import account
+from ..aws.iam import instanceprofile
+from ..aws.iam import policy as policy_lib
+from ..aws.iam import role as role_lib
 from ..aws import profile as profile_tools
 
+from ..aws.autoscaling import autoscalinggroup
 from ..aws.ecs import cluster
+from ..aws.ecs import containerinstance
 
 from . import autoscalinggroups as scalinggroup_jobs
 from . import availabilityzones as zone_jobs
-from . import instanceprofiles as instanceprofile_jobs
+from . import iaminventory
+from . import identity
 from . import launchconfigurations as launchconfig_jobs
 from . import loadbalancers as loadbalancer_jobs
+from . import permissions
 from . import policies as policy_jobs
+from . import propagation
 from . import regions as region_jobs
 from . import roles as role_jobs
 from . import s3buckets as s3bucket_jobs
@@ -37,6 +45,99 @@ from .exceptions import WaitTimedOut
 from . import utils
 
 
+# The trust policy that lets EC2 instances assume a cluster's role.
+ECS_TRUST_POLICY = {
+    "Version": "2012-10-17",
+    "Statement": {
+        "Effect": "Allow",
+        "Principal": {
+            "Service": "ec2.amazonaws.com",
+        },
+        "Action": "sts:AssumeRole",
+    }
+}
+
+# The policy that lets the ECS agent on a cluster's instances work.
+ECS_INSTANCE_POLICY = {
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Effect": "Allow",
+            "Action": [
+                "ec2:Describe*",
+                "elasticloadbalancing:*",
+                "ecs:*",
+                "iam:ListInstanceProfiles",
+                "iam:ListRoles",
+                "iam:PassRole",
+                "s3:ListBucket",
+                "s3:GetObject",
+            ],
+            "Resource": "*"
+        }
+    ]
+}
+
+# The actions the ECS agent needs (and so the policy above must allow).
+ECS_AGENT_ACTIONS = [
+    "ecs:CreateCluster",
+    "ecs:DeregisterContainerInstance",
+    "ecs:DiscoverPollEndpoint",
+    "ecs:Poll",
+    "ecs:RegisterContainerInstance",
+    "ecs:StartTelemetrySession",
+    "ecs:SubmitContainerStateChange",
+    "ecs:SubmitTaskStateChange",
+    "s3:GetObject",
+    ]
+
+# The actions creating a cluster takes, whatever the instance profile.
+CREATE_ACTIONS = [
+    # Checking names are free, then creating the launch config
+    # (which passes the instance profile's role to EC2) and the
+    # auto scaling group.
+    "autoscaling:CreateAutoScalingGroup",
+    "autoscaling:CreateLaunchConfiguration",
+    "autoscaling:CreateOrUpdateTags",
+    "autoscaling:DescribeAutoScalingGroups",
+    "autoscaling:DescribeLaunchConfigurations",
+    "iam:PassRole",
+
+    # Finding the zones or subnets to launch into.
+    "ec2:DescribeAvailabilityZones",
+    "ec2:DescribeSubnets",
+    "ec2:DescribeVpcs",
+
+    # Checking the instance profile is there (and has its role).
+    "iam:GetInstanceProfile",
+    "iam:ListInstanceProfiles",
+
+    # Creating the cluster.
+    "ecs:CreateCluster",
+    "ecs:DescribeClusters",
+
+    # Creating the bucket (a private one) and uploading ecs.config,
+    # once both have been checked with HEAD requests.
+    "s3:CreateBucket",
+    "s3:GetObject",
+    "s3:ListBucket",
+    "s3:PutBucketAcl",
+    "s3:PutObject",
+    ]
+
+# The extra actions creating a cluster's own instance profile takes
+# (see ``create_instance_profile()``).
+INSTANCE_PROFILE_ACTIONS = \
+    iaminventory.FETCH_ACTIONS \
+    + role_jobs.APPLY_ACTIONS \
+    + policy_jobs.APPLY_ACTIONS \
+    + [
+        "iam:AddRoleToInstanceProfile",
+        "iam:AttachRolePolicy",
+        "iam:CreateInstanceProfile",
+        ]
+
+
 def get_account_id(profile):
     """Get the account ID for a profile.
 
@@ -49,11 +150,7 @@ def get_account_id(profile):
         The account ID.
 
     """
-    params = {}
-    params["profile"] = profile
-    response = utils.do_request(account, "get", params)
-    data = utils.get_data("User", response)
-    return data['Arn'].split(':')[4]
+    return identity.get_account_id(profile)
 
 
 def get_s3_bucket_name(profile):
@@ -119,6 +216,33 @@ def get_launch_config_name(cluster):
     return str(cluster) + "--ecs-cluster-launch-configuration"
 
 
+def get_next_launch_config_name(cluster, current):
+    """Get the name for the next version of a cluster's launch config.
+
+    Args:
+
+        cluster
+            The name of a cluster.
+
+        current
+            The name of the launch config the cluster uses now.
+
+    Returns:
+        The name for the next version, e.g.,
+        "foo--ecs-cluster-launch-configuration--v2".
+
+    """
+    base = get_launch_config_name(cluster)
+    version = 1
+    prefix = base + "--v"
+    if current and current.startswith(prefix):
+        try:
+            version = int(current[len(prefix):])
+        except ValueError:
+            pass
+    return prefix + str(version + 1)
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -279,21 +403,18 @@ def create_error_handler(error):
             An AWS ``ClientError`` exception.
 
     Raises:
-        ...
+        ``ResourceNotReady`` if an instance profile is not ready.
 
     Returns:
         None, if the error is not worth handling.
 
     """
-    code = error.response["Error"]["Code"]
     message = error.response["Error"]["Message"]
-    print(code)
-    print(message)
-    if message.starts_with("Invalid IamInstanceProfile"):
+    if message.startswith("Invalid IamInstanceProfile"):
         raise ResourceNotReady()
     else:
         raise error
-    
+
 
 def create(
         profile,
@@ -380,6 +501,20 @@ def create(
     s3_bucket_name = get_s3_bucket_name(profile)
     ecs_config_in_s3 = get_ecs_config_in_s3(name)
 
+    # Make sure every step is allowed, before taking any of them.
+    actions = list(CREATE_ACTIONS)
+    if not instance_profile:
+        actions.extend(INSTANCE_PROFILE_ACTIONS)
+        instance_policy = permissions.compile_policies([ECS_INSTANCE_POLICY])
+        denied = permissions.get_denied(instance_policy, ECS_AGENT_ACTIONS)
+        if denied:
+            msg = "The ECS instance policy doesn't allow: " \
+                  + ", ".join(denied) + "."
+            raise ImproperlyConfigured(msg)
+    if security_groups:
+        actions.append("ec2:DescribeSecurityGroups")
+    permissions.check(profile, actions)
+
     # Make sure the cluster doesn't already exist.
     if exists(profile, name):
         msg = "The cluster '" + str(name) + "' already exists."
@@ -440,18 +575,8 @@ def create(
         "contents": ecs_config_download_script
         })
 
-    # Create an S3 bucket for this cluster, if it doesn't already exist.
-    if not s3bucket_jobs.exists(profile, s3_bucket_name):
-        s3bucket_jobs.create(profile, s3_bucket_name, private=True)
-
-    # Upload the ecs.config file to S3.
-    s3file_jobs.create(
-        profile,
-        bucket=s3_bucket_name,
-        name=ecs_config_in_s3,
-        contents=ecs_config)
-
-    # Create an instance profile, if one hasn't been specified.
+    # Create an instance profile, if one hasn't been specified. It's
+    # done first, so IAM has time to spread it while S3 is set up.
     if not instance_profile:
         instance_profile_data = create_instance_profile(profile, name)
 
@@ -464,6 +589,17 @@ def create(
                 "InstanceProfileName",
                 instance_profile_data[0])
 
+    # Create an S3 bucket for this cluster, if it doesn't already exist.
+    if not s3bucket_jobs.exists(profile, s3_bucket_name):
+        s3bucket_jobs.create(profile, s3_bucket_name, private=True)
+
+    # Upload the ecs.config file to S3 (unless it's unchanged).
+    s3file_jobs.upload(
+        profile,
+        bucket=s3_bucket_name,
+        name=ecs_config_in_s3,
+        contents=ecs_config)
+
     # We need an instance profile.
     if not instance_profile:
         msg = "No instance profile."
@@ -552,13 +688,22 @@ def delete(profile, name):
     if s3file_jobs.exists(profile, s3_bucket_name, ecs_config_in_s3):
         s3file_jobs.delete(profile, s3_bucket_name, ecs_config_in_s3)
     
-    # If there's an auto scaling group, delete it.
-    if scalinggroup_jobs.exists(profile, auto_scaling_group_name):
+    # If there's an auto scaling group, delete it. If it's been
+    # rolled, its launch config has a versioned name.
+    launch_config_names = [launch_config_name]
+    scalinggroup_data = scalinggroup_jobs.fetch_by_name(
+        profile,
+        auto_scaling_group_name)
+    if scalinggroup_data:
+        current = scalinggroup_data[0].get("LaunchConfigurationName")
+        if current and current not in launch_config_names:
+            launch_config_names.append(current)
         scalinggroup_jobs.delete(profile, auto_scaling_group_name)
-    
+
     # If there's a launch config, delete it.
-    if launchconfig_jobs.exists(profile, launch_config_name):
-        launchconfig_jobs.delete(profile, launch_config_name)
+    for launch_config in launch_config_names:
+        if launchconfig_jobs.exists(profile, launch_config):
+            launchconfig_jobs.delete(profile, launch_config)
 
     # If there's an instance profile, delete it.
     delete_instance_profile(profile, name)
@@ -595,7 +740,7 @@ def attach_load_balancer(profile, cluster, load_balancer):
     auto_scaling_group_name = get_auto_scaling_group_name(cluster)
 
     # Make sure the auto scaling group exists.
-    if not exists(profile, auto_scaling_group_name):
+    if not scalinggroup_jobs.exists(profile, auto_scaling_group_name):
         msg = "No auto scaling group '" + str(auto_scaling_group_name) + "'."
         raise ResourceDoesNotExist(msg)
 
@@ -629,7 +774,7 @@ def detach_load_balancer(profile, cluster, load_balancer):
     auto_scaling_group_name = get_auto_scaling_group_name(cluster)
 
     # Make sure the auto scaling group exists.
-    if not exists(profile, name):
+    if not scalinggroup_jobs.exists(profile, auto_scaling_group_name):
         msg = "No auto scaling group '" + str(auto_scaling_group_name) + "'."
         raise ResourceDoesNotExist(msg)
 
@@ -646,7 +791,14 @@ def detach_load_balancer(profile, cluster, load_balancer):
 
 
 def create_instance_profile(profile, cluster):
-    """Create an instance profile for the cluster.
+    """Create (or bring up to date) an instance profile for the cluster.
+
+    One IAM inventory answers what exists and what's attached. Only
+    what's missing or changed is created or updated, and the cached
+    inventory is patched with AWS's responses as it goes, so there's
+    no refetching (or waiting on IAM's eventually consistent reads).
+    Re-running this on a cluster that's set up costs one inventory
+    read, and no waiting for IAM to spread changes.
 
     Args:
 
@@ -656,63 +808,73 @@ def create_instance_profile(profile, cluster):
         cluster
             The name of a cluster.
 
+    Returns:
+        A list with the instance profile's info.
+
     """
     role_name = str(cluster) + "--ecs-role"
     policy_name = str(cluster) + "--ecs-policy"
     instance_profile_name = str(cluster) + "--ecs-instance-profile"
 
-    # Create a role that EC2 instances can assume:
-    contents = {
-        "Version": "2012-10-17",
-        "Statement": {
-            "Effect": "Allow",
-            "Principal": {
-                "Service": "ec2.amazonaws.com",
-            },
-            "Action": "sts:AssumeRole",
-        }
-    }
-    role_jobs.create(profile, role_name, contents=contents)
-
-    # Create a policy that lets the ECS agent do what it needs.
-    contents = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Effect": "Allow",
-                "Action": [
-                    "ec2:Describe*",
-                    "elasticloadbalancing:*",
-                    "ecs:*",
-                    "iam:ListInstanceProfiles",
-                    "iam:ListRoles",
-                    "iam:PassRole",
-                    "s3:ListBucket",
-                    "s3:GetObject",
-                ],
-                "Resource": "*"
-            }
-        ]
-    }
-    policy_jobs.create(profile, policy_name, contents=contents)
+    # Create a role that EC2 instances can assume, and a policy that
+    # lets the ECS agent do what it needs.
+    inventory = iaminventory.get(profile)
+    role_jobs.apply(profile, role_name, contents=ECS_TRUST_POLICY)
+    policy_jobs.apply(profile, policy_name, contents=ECS_INSTANCE_POLICY)
 
     # Attach the policy to the role.
-    role_jobs.attach(profile, role_name, policy_name)
+    if not iaminventory.is_policy_attached(inventory, role_name, policy_name):
+        policy = iaminventory.find(
+            inventory,
+            iaminventory.POLICY,
+            policy_name)
+        params = {}
+        params["profile"] = profile
+        params["role"] = role_name
+        params["policy"] = policy["Arn"]
+        utils.do_request(role_lib, "attach_policy", params)
+        iaminventory.add_policy_attachment(profile, role_name, policy)
+        propagation.mark(propagation.ROLE, role_name)
 
     # Create an instance profile.
-    instanceprofile_jobs.create(profile, instance_profile_name)
+    record = iaminventory.find(
+        inventory,
+        iaminventory.INSTANCE_PROFILE,
+        instance_profile_name)
+    if not record:
+        params = {}
+        params["profile"] = profile
+        params["name"] = instance_profile_name
+        response = utils.do_request(instanceprofile, "create", params)
+        record = utils.get_data("InstanceProfile", response)
+        iaminventory.add(profile, iaminventory.INSTANCE_PROFILE, record)
+        propagation.mark(propagation.INSTANCE_PROFILE, instance_profile_name)
 
     # Attach the role to the instance profile.
-    instanceprofile_jobs.attach(profile, instance_profile_name, role_name)
+    if not iaminventory.is_attached(
+            inventory,
+            instance_profile_name,
+            role_name):
+        params = {}
+        params["profile"] = profile
+        params["instance_profile"] = instance_profile_name
+        params["role"] = role_name
+        utils.do_request(instanceprofile, "add_role", params)
+        role = iaminventory.find(inventory, iaminventory.ROLE, role_name)
+        iaminventory.add_role_attachment(
+            profile,
+            instance_profile_name,
+            role)
+        propagation.mark(propagation.INSTANCE_PROFILE, instance_profile_name)
 
-    # Return the instance profile.
-    return instanceprofile_jobs.fetch_by_name(
-        profile,
-        instance_profile_name)
+    return [record]
 
 
 def delete_instance_profile(profile, cluster):
-    """Create an instance profile for the cluster.
+    """Delete the cluster's instance profile, role and policy.
+
+    One IAM inventory answers what exists and what's attached,
+    and a second confirms it's all gone.
 
     Args:
 
@@ -722,69 +884,351 @@ def delete_instance_profile(profile, cluster):
         cluster
             The name of a cluster.
 
+    Raises:
+        ``ResourceNotDeleted`` if anything is left over.
+
     """
     role_name = str(cluster) + "--ecs-role"
     policy_name = str(cluster) + "--ecs-policy"
     instance_profile_name = str(cluster) + "--ecs-instance-profile"
 
     # Do these resources exist?
-    is_role = role_jobs.exists(profile, role_name)
-    is_policy = policy_jobs.exists(profile, policy_name)
-    is_instance_profile = instanceprofile_jobs.exists(
-        profile,
+    inventory = iaminventory.get(profile, refresh=True)
+    role = iaminventory.find(inventory, iaminventory.ROLE, role_name)
+    policy = iaminventory.find(inventory, iaminventory.POLICY, policy_name)
+    instance_profile = iaminventory.find(
+        inventory,
+        iaminventory.INSTANCE_PROFILE,
         instance_profile_name)
 
     # Detach the role from the instance profile if needed.
-    if is_role and is_instance_profile:
+    if iaminventory.is_attached(inventory, instance_profile_name, role_name):
+        params = {}
+        params["profile"] = profile
+        params["instance_profile"] = instance_profile_name
+        params["role"] = role_name
+        utils.do_request(instanceprofile, "remove_role", params)
 
-        # Is the role attached?
-        is_role_attached = instanceprofile_jobs.is_attached(
-            profile,
-            instance_profile_name,
-            role_name)
+    # Delete the instance profile, if needed.
+    if instance_profile:
+        params = {}
+        params["profile"] = profile
+        params["name"] = instance_profile_name
+        utils.do_request(instanceprofile, "delete", params)
 
-        # Detach it.
-        if is_role_attached:
-            instanceprofile_jobs.detach(profile, instance_profile_name, role_name)
+    # Detach the policy from the role if needed.
+    if policy and iaminventory.is_policy_attached(
+            inventory,
+            role_name,
+            policy["Arn"]):
+        params = {}
+        params["profile"] = profile
+        params["role"] = role_name
+        params["policy"] = policy["Arn"]
+        utils.do_request(role_lib, "detach_policy", params)
 
-        # Make sure it got detached.
-        is_role_detached = instanceprofile_jobs.is_detached(
+    # Delete the role, if needed.
+    if role:
+        params = {}
+        params["profile"] = profile
+        params["role"] = role_name
+        utils.do_request(role_lib, "delete", params)
+
+    # Delete the policy (and its other versions), if needed.
+    if policy:
+        policy_jobs.prune_versions(
             profile,
-            instance_profile_name,
-            role_name)
-        if not is_role_detached:
-            msg = "Could not detach '" + str(role_name) \
-                  + "' from '" + str(instance_profile_name) + "'."
-            raise ResourceNotDetached(msg)
+            policy["Arn"],
+            policy.get("PolicyVersionList", []),
+            1)
+        params = {}
+        params["profile"] = profile
+        params["policy"] = policy["Arn"]
+        utils.do_request(policy_lib, "delete", params)
+
+    # Make sure they all got deleted.
+    inventory = iaminventory.get(profile, refresh=True)
+    leftovers = [
+        (iaminventory.INSTANCE_PROFILE, instance_profile_name),
+        (iaminventory.ROLE, role_name),
+        (iaminventory.POLICY, policy_name),
+        ]
+    leftovers = [x for x in leftovers if iaminventory.find(inventory, *x)]
+    if leftovers:
+        names = ["'" + x[1] + "'" for x in leftovers]
+        msg = "Not deleted: " + ", ".join(names) + "."
+        raise ResourceNotDeleted(msg)
 
-    # Delete the instance profile, if needed.
-    if is_instance_profile:
-        instanceprofile_jobs.delete(profile, instance_profile_name)
 
-        # Make sure it got deleted.
-        if instanceprofile_jobs.exists(profile, instance_profile_name):
-            msg = "Instance profile '" + str(instance_profile_name) \
-                  + "' not deleted."
-            raise ResourceNotDeleted(msg)
+def fetch_roll_state(profile, cluster):
+    """Fetch a cluster's auto scaling group and container instances.
 
-    # Detach the policy from the role if needed.
-    if is_role and is_policy:
-        role_jobs.detach(profile, role_name, policy_name)
+    It takes two requests (more for big clusters), no matter how
+    many instances there are.
 
-    # Delete the role, if needed.
-    if is_role:
-        role_jobs.delete(profile, role_name)
-
-        # Make sure it got deleted.
-        if role_jobs.exists(profile, role_name):
-            msg = "Role '" + str(role_name) + "' not deleted."
-            raise ResourceNotDeleted(msg)
-
-    # Delete the policy, if needed.
-    if is_policy:
-        policy_jobs.delete(profile, policy_name)
-
-        # Make sure it got deleted.
-        if policy_jobs.exists(profile, policy_name):
-            msg = "Policy '" + str(policy_name) + "' not deleted."
-            raise ResourceNotDeleted(msg)
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        cluster
+            The name of a cluster.
+
+    Returns:
+        A (group, containers) tuple: the auto scaling group's record
+        (or None), and a dict of {EC2 instance ID: container instance}.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["autoscaling_group"] = get_auto_scaling_group_name(cluster)
+    response = utils.do_request(autoscalinggroup, "get", params)
+    groups = utils.get_data("AutoScalingGroups", response)
+
+    params = {}
+    params["profile"] = profile
+    params["cluster"] = cluster
+    response = utils.do_request(containerinstance, "get", params)
+    records = utils.get_data("containerInstances", response)
+
+    group = groups[0] if groups else None
+    containers = {x["ec2InstanceId"]: x for x in records}
+    return group, containers
+
+
+def wait_for_roll(profile, cluster, check, msg, max_wait, wait_interval):
+    """Watch a cluster until a check on it passes.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        cluster
+            The name of a cluster.
+
+        check
+            A function that takes the (group, containers) from
+            ``fetch_roll_state()`` and returns True when it's done.
+
+        msg
+            The message to time out with.
+
+        max_wait
+            The most seconds to wait.
+
+        wait_interval
+            How many seconds to wait between each look.
+
+    Raises:
+        ``WaitTimedOut`` if the check never passes.
+
+    """
+    max_attempts = max(int(max_wait // wait_interval), 1)
+    utils.poll(
+        lambda: check(*fetch_roll_state(profile, cluster)),
+        max_attempts=max_attempts,
+        wait_interval=wait_interval,
+        msg=msg)
+
+
+def roll(
+        profile,
+        name,
+        instance_type=None,
+        ami=None,
+        key_pair=None,
+        batch_size=1,
+        max_wait=600,
+        wait_interval=10):
+    """Replace a cluster's EC2 instances with ones from a new launch config.
+
+    The new launch config copies the current one, with any changes
+    given here, and gets the next version name. The auto scaling group
+    is switched to it, then the old instances are replaced a batch at
+    a time: the group is scaled up, the new instances are waited on
+    until they've joined the ECS cluster, the old ones are drained
+    of tasks, and then they're terminated (which scales the group
+    back down). There's always at least the original capacity.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of a cluster.
+
+        instance_type
+            A new EC2 instance type, e.g., "m3.medium".
+
+        ami
+            A new AMI ID.
+
+        key_pair
+            A new key pair name.
+
+        batch_size
+            How many instances to replace at a time.
+
+        max_wait
+            The most seconds to wait for each step of each batch.
+
+        wait_interval
+            How many seconds to wait between each look at the cluster.
+
+    Raises:
+        ``WaitTimedOut`` if a step doesn't finish in time. The group
+        is left on the new launch config, with any extra capacity.
+
+    Returns:
+        A {"LaunchConfigurationName", "Replaced"} dict, with the new
+        launch config's name and the number of instances replaced.
+
+    """
+    auto_scaling_group_name = get_auto_scaling_group_name(name)
+
+    # Make sure the cluster and its auto scaling group exist.
+    if not exists(profile, name):
+        msg = "No cluster '" + str(name) + "'."
+        raise ResourceDoesNotExist(msg)
+    group, containers = fetch_roll_state(profile, name)
+    if not group:
+        msg = "No auto scaling group '" + str(auto_scaling_group_name) + "'."
+        raise ResourceDoesNotExist(msg)
+
+    # Copy the current launch config, with the changes.
+    old_launch_config_name = group["LaunchConfigurationName"]
+    launch_config_data = launchconfig_jobs.fetch_by_name(
+        profile,
+        old_launch_config_name)
+    if not launch_config_data:
+        msg = "No launch config '" + str(old_launch_config_name) + "'."
+        raise ResourceDoesNotExist(msg)
+    old_launch_config = launch_config_data[0]
+    launch_config_name = get_next_launch_config_name(
+        name,
+        old_launch_config_name)
+
+    # AWS sends the user data back base64 encoded, and the
+    # instance profile may come back as an ARN.
+    archive = None
+    if old_launch_config.get("UserData"):
+        archive = {"UserData": b64decode(old_launch_config["UserData"])}
+    instance_profile = old_launch_config.get("IamInstanceProfile")
+    if instance_profile:
+        instance_profile = instance_profile.split("/")[-1]
+
+    params = {}
+    params["profile"] = profile
+    params["name"] = launch_config_name
+    params["ami"] = ami or old_launch_config["ImageId"]
+    params["instance_type"] = instance_type \
+        or old_launch_config["InstanceType"]
+    params["key_pair"] = key_pair or old_launch_config.get("KeyName") or None
+    params["security_groups"] = old_launch_config.get("SecurityGroups") \
+        or None
+    params["public_ip"] = old_launch_config.get("AssociatePublicIpAddress")
+    params["instance_profile"] = instance_profile
+    params["user_data_archive"] = archive
+    launchconfig_jobs.create(**params)
+
+    # Switch the group over, with room for a batch of new instances.
+    desired_size = group["DesiredCapacity"]
+    max_size = group["MaxSize"]
+    params = {}
+    params["profile"] = profile
+    params["autoscaling_group"] = auto_scaling_group_name
+    params["launch_configuration"] = launch_config_name
+    params["max_size"] = max(max_size, desired_size + batch_size)
+    utils.do_request(autoscalinggroup, "update", params)
+
+    # Replace the old instances, a batch at a time.
+    old_instances = [
+        x["InstanceId"] for x in group["Instances"]
+        if x.get("LaunchConfigurationName") != launch_config_name
+        ]
+    replaced = 0
+    for batch in utils.chunks(old_instances, batch_size):
+
+        # Scale up, and wait for the new instances to join ECS.
+        params = {}
+        params["profile"] = profile
+        params["autoscaling_group"] = auto_scaling_group_name
+        params["desired_size"] = desired_size + len(batch)
+        utils.do_request(autoscalinggroup, "update", params)
+
+        needed = replaced + len(batch)
+
+        def has_new_instances(group, containers):
+            ready = [
+                x for x in group["Instances"]
+                if x.get("LaunchConfigurationName") == launch_config_name
+                and x["LifecycleState"] == "InService"
+                and containers.get(x["InstanceId"], {}).get("status")
+                == "ACTIVE"
+                and containers[x["InstanceId"]].get("agentConnected")
+                ]
+            return len(ready) >= needed
+
+        msg = "Timed out waiting for new instances to join '" \
+              + str(name) + "'."
+        wait_for_roll(
+            profile, name, has_new_instances, msg, max_wait, wait_interval)
+
+        # Drain the old instances' tasks.
+        group, containers = fetch_roll_state(profile, name)
+        arns = [
+            containers[x]["containerInstanceArn"]
+            for x in batch if x in containers
+            ]
+        for chunk in utils.chunks(arns, 10):
+            params = {}
+            params["profile"] = profile
+            params["cluster"] = name
+            params["container_instances"] = chunk
+            params["status"] = "DRAINING"
+            utils.do_request(containerinstance, "update_state", params)
+
+        def is_drained(group, containers):
+            return all(
+                containers[x].get("runningTasksCount", 0) == 0
+                for x in batch if x in containers)
+
+        msg = "Timed out waiting for tasks to drain from " \
+              + ", ".join(batch) + "."
+        wait_for_roll(
+            profile, name, is_drained, msg, max_wait, wait_interval)
+
+        # Terminate them, and scale back down.
+        for instance in batch:
+            params = {}
+            params["profile"] = profile
+            params["instance"] = instance
+            params["decrement"] = True
+            utils.do_request(autoscalinggroup, "terminate_instance", params)
+
+        def is_gone(group, containers):
+            remaining = [x["InstanceId"] for x in group["Instances"]]
+            return not any(x in remaining for x in batch)
+
+        msg = "Timed out waiting for " + ", ".join(batch) \
+              + " to be terminated."
+        wait_for_roll(profile, name, is_gone, msg, max_wait, wait_interval)
+
+        replaced += len(batch)
+
+    # Put the group's max size back, and clean up.
+    params = {}
+    params["profile"] = profile
+    params["autoscaling_group"] = auto_scaling_group_name
+    params["max_size"] = max_size
+    params["desired_size"] = desired_size
+    utils.do_request(autoscalinggroup, "update", params)
+    if launchconfig_jobs.exists(profile, old_launch_config_name):
+        launchconfig_jobs.delete(profile, old_launch_config_name)
+
+    return {
+        "LaunchConfigurationName": launch_config_name,
+        "Replaced": replaced,
+        }
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for compressing files on their way to (and from) S3."""
+
+import hashlib
+import os
+import tempfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .exceptions import ImproperlyConfigured
+
+
+# How many bytes to read at a time when (de)compressing.
+CHUNK_SIZE = 1024 * 1024
+
+# The gzip compression level (1 is fastest, 9 is smallest).
+GZIP_LEVEL = 6
+
+# The zstd compression level (1 is fastest, 22 is smallest).
+ZSTD_LEVEL = 3
+
+# The errors decompressing a bad stream can raise.
+ERRORS = (ValueError, zlib.error)
+if zstandard:
+    ERRORS += (zstandard.ZstdError,)
+
+
+def get_encodings():
+    """Get the encodings that can be used here.
+
+    Returns:
+        A list of encodings, e.g., ["gzip", "zstd"]. "zstd" is only
+        available if the ``zstandard`` package is installed.
+
+    """
+    result = ["gzip"]
+    if zstandard:
+        result.append("zstd")
+    return result
+
+
+def check_encoding(encoding):
+    """Make sure an encoding can be used here.
+
+    Args:
+
+        encoding
+            An encoding, e.g., "gzip".
+
+    Raises:
+        ``ImproperlyConfigured`` if it can't.
+
+    """
+    if encoding not in get_encodings():
+        msg = "Can't use the encoding '" + str(encoding) + "'."
+        if encoding == "zstd":
+            msg += " Install the 'zstandard' package."
+        raise ImproperlyConfigured(msg)
+
+
+def is_encoded(record):
+    """Check if a file in S3 is compressed with an encoding known here.
+
+    Args:
+
+        record
+            The file's metadata, from ``s3files.fetch_details()``.
+
+    Returns:
+        True if it is, False if not.
+
+    """
+    return record.get("ContentEncoding") in ["gzip", "zstd"]
+
+
+def get_compressor(encoding):
+    """Get an object that compresses a stream a chunk at a time.
+
+    Note:
+        The gzip header's timestamp is left blank, so the same
+        contents always compress to the same bytes (and ETag).
+
+    Args:
+
+        encoding
+            The encoding to use, "gzip" or "zstd".
+
+    Returns:
+        An object with ``compress(chunk)`` and ``flush()`` methods.
+
+    """
+    check_encoding(encoding)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress(contents, encoding):
+    """Compress some contents in memory.
+
+    Args:
+
+        contents
+            The bytes (or string) to compress.
+
+        encoding
+            The encoding to use, "gzip" or "zstd".
+
+    Returns:
+        The compressed bytes.
+
+    """
+    if not isinstance(contents, bytes):
+        contents = str(contents).encode("utf-8")
+    compressor = get_compressor(encoding)
+    return compressor.compress(contents) + compressor.flush()
+
+
+def compress_file(filepath, encoding):
+    """Compress a file into a temporary file, a chunk at a time.
+
+    The file is only read once: its MD5 is worked out on the way
+    through, so it can be stored alongside the compressed copy.
+
+    Args:
+
+        filepath
+            The path to the file to compress.
+
+        encoding
+            The encoding to use, "gzip" or "zstd".
+
+    Returns:
+        A (path, md5) tuple, with the path to the compressed file
+        and the MD5 hex digest of the original. Remove the
+        compressed file when you're done with it.
+
+    """
+    compressor = get_compressor(encoding)
+    digest = hashlib.md5()
+    fd, tmp_filepath = tempfile.mkstemp(suffix="." + encoding)
+    try:
+        with open(filepath, "rb") as src, os.fdopen(fd, "wb") as dest:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                dest.write(compressor.compress(chunk))
+            dest.write(compressor.flush())
+    except Exception:
+        os.remove(tmp_filepath)
+        raise
+    return tmp_filepath, digest.hexdigest()
+
+
+def get_decompressor(encoding):
+    """Get an object that decompresses a stream a chunk at a time.
+
+    Args:
+
+        encoding
+            The encoding the stream is compressed with.
+
+    Returns:
+        An object with ``decompress(chunk)`` and ``flush()`` methods.
+        Pass it to ``finish()`` once the stream runs out.
+
+    """
+    check_encoding(encoding)
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def finish(decompressor):
+    """Get the last of a decompressed stream, and check it wasn't cut short.
+
+    Args:
+
+        decompressor
+            A decompressor, from ``get_decompressor()``.
+
+    Raises:
+        ``ValueError`` if the stream ended before the compressed
+        data did (e.g., it's truncated).
+
+    Returns:
+        Any bytes the decompressor was still holding.
+
+    """
+    data = decompressor.flush()
+    if not decompressor.eof:
+        raise ValueError("The compressed stream ended early.")
+    return data
+
+
+def decompress_file(src_filepath, dest_filepath, encoding):
+    """Decompress a file into another file, a chunk at a time.
+
+    Args:
+
+        src_filepath
+            The path to the compressed file.
+
+        dest_filepath
+            The path to write the decompressed file to.
+
+        encoding
+            The encoding the file is compressed with.
+
+    Raises:
+        One of ``ERRORS`` if the file is corrupt or truncated.
+
+    """
+    decompressor = get_decompressor(encoding)
+    with open(src_filepath, "rb") as src, open(dest_filepath, "wb") as dest:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+            dest.write(decompressor.decompress(chunk))
+        dest.write(finish(decompressor))
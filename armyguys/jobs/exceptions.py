@@ -76,3 +76,8 @@ class TooManyRecords(Exception):
 class WaitTimedOut(Exception):
     """Raise when a poll/wait timed out."""
     pass
+
+
+class WrongRegion(Exception):
+    """Raise when a resource lives in a different AWS region."""
+    pass
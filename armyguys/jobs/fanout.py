@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for running other jobs in many regions at once.
+
+Each region gets its own session (sharing the original profile's
+credentials), and the regions' jobs run at the same time on a
+thread pool, so listing every region takes about as long as listing
+the slowest one. The regional sessions' clients retry in botocore's
+adaptive mode, so a region that throttles is backed off from.
+
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import BotoCoreError
+from botocore.exceptions import ClientError
+
+from ..aws import profile as profile_tools
+from ..aws import region
+
+from .exceptions import AwsError
+from .exceptions import MissingKey
+from .exceptions import Non200Response
+from .exceptions import PermissionDenied
+
+from . import utils
+
+
+# How many jobs to run at once, in all.
+MAX_WORKERS = 16
+
+# The errors that mean a job failed in a region (rather than a bug).
+REGION_ERRORS = (
+    AwsError,
+    MissingKey,
+    Non200Response,
+    PermissionDenied,
+    BotoCoreError,
+    ClientError,
+    )
+
+
+def get_regions(profile):
+    """Get the names of the regions that are enabled for the account.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A sorted list of region names.
+
+    """
+    params = {}
+    params["profile"] = profile
+    response = utils.do_request(region, "get", params)
+    data = utils.get_data("Regions", response)
+    return sorted(x["RegionName"] for x in data)
+
+
+def get_sessions(profile, regions):
+    """Create a session for each region, with the same credentials.
+
+    Args:
+
+        profile
+            A profile to take the credentials from.
+
+        regions
+            A list of region names.
+
+    Returns:
+        An OrderedDict of {region: session}.
+
+    """
+    result = OrderedDict()
+    for name in regions:
+        result[name] = profile_tools.regional(profile, name)
+    return result
+
+
+def run(profile, func, args=None, regions=None, max_workers=None):
+    """Run a job in many regions at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        func
+            The job. It's called with a region's session,
+            followed by ``args``.
+
+        args
+            A list of any other arguments for the job.
+
+        regions
+            A list of region names. Defaults to every enabled region.
+
+        max_workers
+            How many jobs to run at once.
+
+    Returns:
+        A tuple of two OrderedDicts: {region: result} for the regions
+        where the job worked, and {region: error} for those where it
+        didn't (e.g., where you don't have permission, or the service
+        isn't offered).
+
+    """
+    if not regions:
+        regions = get_regions(profile)
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    sessions = get_sessions(profile, regions)
+
+    results = OrderedDict()
+    errors = OrderedDict()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (name, executor.submit(func, session, *(args or [])))
+            for name, session in sessions.items()]
+        for name, future in futures:
+            try:
+                results[name] = future.result()
+            except REGION_ERRORS as error:
+                errors[name] = error
+    return results, errors
+
+
+def fetch_all(profile, func, args=None, regions=None, max_workers=None):
+    """Run a job that lists records in many regions at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        func
+            The job (e.g., ``clusters.fetch_all``). It's called with
+            a region's session, followed by ``args``, and should
+            return a list of records.
+
+        args
+            A list of any other arguments for the job.
+
+        regions
+            A list of region names. Defaults to every enabled region.
+
+        max_workers
+            How many jobs to run at once.
+
+    Returns:
+        A tuple of a list of (region, record) pairs, in region order,
+        and an OrderedDict of {region: error} (see ``run()``).
+
+    """
+    results, errors = run(profile, func, args, regions, max_workers)
+    records = []
+    for name, data in results.items():
+        records.extend((name, x) for x in data or [])
+    return records, errors
@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for taking an inventory of IAM resources.
+
+An inventory holds every role, customer managed policy and instance
+profile in the account, and which are attached to which, indexed by
+name and by ARN. It takes two paginated requests to build, after
+which existence and attachment checks need no requests at all.
+
+Inventories are cached per profile, so one job run can share them.
+Jobs that change IAM resources either patch the cached inventory
+with what AWS sent back (see ``add()``), which saves a refetch and
+doesn't depend on IAM's eventually consistent reads, or call
+``invalidate()``, so the next ``get()`` fetches a fresh one.
+
+"""
+
+import threading
+import weakref
+
+from ..aws.iam import account
+from ..aws.iam import instanceprofile
+
+from . import utils
+
+
+# The kinds of IAM resources in an inventory.
+ROLE = "Roles"
+POLICY = "Policies"
+INSTANCE_PROFILE = "InstanceProfiles"
+
+# The actions fetching an inventory takes.
+FETCH_ACTIONS = [
+    "iam:GetAccountAuthorizationDetails",
+    "iam:ListInstanceProfiles",
+    ]
+
+# The key that holds the name, in each kind's records.
+NAME_KEYS = {
+    ROLE: "RoleName",
+    POLICY: "PolicyName",
+    INSTANCE_PROFILE: "InstanceProfileName",
+    }
+
+
+_lock = threading.Lock()
+"""A lock to guard the inventory cache."""
+
+
+_inventories = weakref.WeakKeyDictionary()
+"""Inventories already fetched, stored as {session: inventory}."""
+
+
+def build(details, instance_profiles):
+    """Index IAM resources by name and ARN.
+
+    Args:
+
+        details
+            The response from ``account.get_authorization_details()``.
+
+        instance_profiles
+            A list of instance profiles. (The authorization details
+            leave out instance profiles that have no role.)
+
+    Returns:
+        An inventory, as {"Roles", "Policies", "InstanceProfiles",
+        "Arns"} dicts. The first three map names to records, and
+        "Arns" maps ARNs to records of any kind.
+
+    """
+    result = {ROLE: {}, POLICY: {}, INSTANCE_PROFILE: {}, "Arns": {}}
+    sources = [
+        (ROLE, utils.get_data("RoleDetailList", details)),
+        (POLICY, utils.get_data("Policies", details)),
+        (INSTANCE_PROFILE, instance_profiles),
+        ]
+    for kind, records in sources:
+        for record in records:
+            result[kind][record[NAME_KEYS[kind]]] = record
+            result["Arns"][record["Arn"]] = record
+    return result
+
+
+def fetch(profile):
+    """Fetch a fresh inventory, and cache it.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        An inventory (see ``build()``).
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["filters"] = ["Role", "LocalManagedPolicy"]
+    details = utils.do_request(account, "get_authorization_details", params)
+
+    params = {}
+    params["profile"] = profile
+    response = utils.do_request(instanceprofile, "get", params)
+    instance_profiles = utils.get_data("InstanceProfiles", response)
+
+    result = build(details, instance_profiles)
+    with _lock:
+        _inventories[profile] = result
+    return result
+
+
+def get(profile, refresh=False):
+    """Get the cached inventory, fetching it if need be.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        refresh
+            If True, always fetch a fresh inventory.
+
+    Returns:
+        An inventory (see ``build()``).
+
+    """
+    if not refresh:
+        with _lock:
+            result = _inventories.get(profile)
+        if result is not None:
+            return result
+    return fetch(profile)
+
+
+def invalidate(profile):
+    """Drop the cached inventory, after IAM resources change.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    """
+    with _lock:
+        _inventories.pop(profile, None)
+
+
+def add(profile, kind, record):
+    """Add a new IAM resource to the cached inventory, if there is one.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        kind
+            ``ROLE``, ``POLICY`` or ``INSTANCE_PROFILE``.
+
+        record
+            The resource's record, as AWS sent it back.
+
+    """
+    with _lock:
+        inventory = _inventories.get(profile)
+        if inventory is not None:
+            inventory[kind][record[NAME_KEYS[kind]]] = record
+            inventory["Arns"][record["Arn"]] = record
+
+
+def add_policy_attachment(profile, role, policy):
+    """Note in the cached inventory that a policy was attached to a role.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        role
+            The name of the role.
+
+        policy
+            The policy's record.
+
+    """
+    attachment = {
+        "PolicyName": policy["PolicyName"],
+        "PolicyArn": policy["Arn"],
+        }
+    with _lock:
+        inventory = _inventories.get(profile)
+        record = inventory[ROLE].get(role) if inventory else None
+        if record is not None:
+            record.setdefault("AttachedManagedPolicies", []).append(attachment)
+
+
+def add_role_attachment(profile, instance_profile, role):
+    """Note in the cached inventory that a role joined an instance profile.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        instance_profile
+            The name of the instance profile.
+
+        role
+            The role's record.
+
+    """
+    with _lock:
+        inventory = _inventories.get(profile)
+        record = None
+        if inventory:
+            record = inventory[INSTANCE_PROFILE].get(instance_profile)
+        if record is not None:
+            record.setdefault("Roles", []).append(role)
+
+
+def find(inventory, kind, ref):
+    """Find an IAM resource in an inventory.
+
+    Args:
+
+        inventory
+            An inventory (see ``build()``).
+
+        kind
+            ``ROLE``, ``POLICY`` or ``INSTANCE_PROFILE``.
+
+        ref
+            The name or ARN of the resource.
+
+    Returns:
+        The resource's record, or None if there's no such resource.
+
+    """
+    if ref.startswith("arn:"):
+        record = inventory["Arns"].get(ref)
+        if record is None:
+            return None
+        name = record.get(NAME_KEYS[kind])
+        if inventory[kind].get(name) is not record:
+            return None
+        return record
+    return inventory[kind].get(ref)
+
+
+def is_attached(inventory, instance_profile, role):
+    """Check if a role is attached to an instance profile.
+
+    Args:
+
+        inventory
+            An inventory (see ``build()``).
+
+        instance_profile
+            The name of an instance profile.
+
+        role
+            The name of a role.
+
+    Returns:
+        True if it's attached, False if it's not (or if either
+        doesn't exist).
+
+    """
+    record = inventory[INSTANCE_PROFILE].get(instance_profile)
+    if not record:
+        return False
+    return role in [x["RoleName"] for x in record.get("Roles", [])]
+
+
+def is_policy_attached(inventory, role, policy):
+    """Check if a managed policy is attached to a role.
+
+    Args:
+
+        inventory
+            An inventory (see ``build()``).
+
+        role
+            The name of a role.
+
+        policy
+            The name or ARN of a policy.
+
+    Returns:
+        True if it's attached, False if it's not (or if the
+        role doesn't exist).
+
+    """
+    record = inventory[ROLE].get(role)
+    if not record:
+        return False
+    for attached in record.get("AttachedManagedPolicies", []):
+        if policy in [attached["PolicyName"], attached["PolicyArn"]]:
+            return True
+    return False
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for finding out who the caller is (account, ARN and user ID).
+
+The caller's identity comes from STS, which works with any kind of
+credentials. It's looked up once per session, and remembered between
+runs (in a file keyed by a fingerprint of the access key), since a
+long-lived access key always belongs to the same identity.
+
+"""
+
+import hashlib
+import os
+import threading
+import weakref
+
+from ..aws import sts
+
+from . import jsoncache
+from . import utils
+
+
+# Where identities are kept between runs.
+IDENTITIES_PATH = os.path.join(
+    os.path.expanduser("~"),
+    ".armyguys",
+    "identities.json")
+
+
+_lock = threading.Lock()
+"""A lock to guard the identities already looked up."""
+
+
+_sessions = weakref.WeakKeyDictionary()
+"""Identities already looked up, stored as {session: identity}."""
+
+
+_cache = jsoncache.create(IDENTITIES_PATH)
+"""Identities remembered between runs, stored as {fingerprint: identity}."""
+
+
+def get_fingerprint(profile):
+    """Get a fingerprint of a profile's access key.
+
+    Only long-lived keys get one. Temporary credentials (with a
+    session token) change too often to be worth remembering.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A hex digest of the access key ID, or None.
+
+    """
+    credentials = profile.get_credentials()
+    if credentials is None:
+        return None
+    credentials = credentials.get_frozen_credentials()
+    if credentials.token or not credentials.access_key:
+        return None
+    data = credentials.access_key.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def fetch(profile):
+    """Ask STS who the caller is.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A {"Account", "Arn", "UserId"} dict.
+
+    """
+    params = {}
+    params["profile"] = profile
+    response = utils.do_request(sts, "get_caller_identity", params)
+    return {
+        "Account": utils.get_data("Account", response),
+        "Arn": utils.get_data("Arn", response),
+        "UserId": utils.get_data("UserId", response),
+        }
+
+
+def get(profile, persist=True):
+    """Get the caller's identity, looking it up only once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        persist
+            Whether to remember the identity between runs
+            (and use one remembered before).
+
+    Returns:
+        A {"Account", "Arn", "UserId"} dict.
+
+    """
+    with _lock:
+        result = _sessions.get(profile)
+    if result:
+        return result
+
+    fingerprint = get_fingerprint(profile) if persist else None
+    if fingerprint:
+        with _cache["Lock"]:
+            result = jsoncache.load(_cache).get(fingerprint)
+
+    if not result:
+        result = fetch(profile)
+        if fingerprint:
+            with _cache["Lock"]:
+                jsoncache.load(_cache)[fingerprint] = result
+                _cache["Dirty"] = True
+
+    with _lock:
+        _sessions[profile] = result
+    return result
+
+
+def get_account_id(profile):
+    """Get the caller's account ID.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        The account ID.
+
+    """
+    return get(profile)["Account"]
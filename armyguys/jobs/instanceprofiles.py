@@ -4,6 +4,8 @@
 
 import os
 
+from time import sleep
+
 from ..aws.iam import instanceprofile
 
 from .exceptions import FileDoesNotExist
@@ -17,6 +19,8 @@ from .exceptions import WaitTimedOut
 
 from . import roles as role_jobs
 
+from . import iaminventory
+from . import propagation
 from . import utils
 
 
@@ -157,6 +161,8 @@ def create(profile, name):
     params["profile"] = profile
     params["name"] = name
     response = utils.do_request(instanceprofile, "create", params)
+    iaminventory.invalidate(profile)
+    propagation.mark(propagation.INSTANCE_PROFILE, name)
 
     # Check that it exists.
     instance_profile_data = polling_fetch(profile, name)
@@ -190,6 +196,7 @@ def delete(profile, name):
     params["profile"] = profile
     params["name"] = name
     response = utils.do_request(instanceprofile, "delete", params)
+    iaminventory.invalidate(profile)
 
     # Check that it was, in fact, deleted.
     if exists(profile, name):
@@ -230,7 +237,10 @@ def attach(profile, instance_profile, role):
     params["profile"] = profile
     params["instance_profile"] = instance_profile
     params["role"] = role
-    return utils.do_request(instanceprofile, "add_role", params)
+    response = utils.do_request(instanceprofile, "add_role", params)
+    iaminventory.invalidate(profile)
+    propagation.mark(propagation.INSTANCE_PROFILE, instance_profile)
+    return response
 
 
 def detach(profile, instance_profile, role):
@@ -266,7 +276,9 @@ def detach(profile, instance_profile, role):
     params["profile"] = profile
     params["instance_profile"] = instance_profile
     params["role"] = role
-    return utils.do_request(instanceprofile, "remove_role", params)
+    response = utils.do_request(instanceprofile, "remove_role", params)
+    iaminventory.invalidate(profile)
+    return response
 
 
 def is_attached(profile, instance_profile, role):
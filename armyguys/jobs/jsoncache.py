@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for keeping small caches in JSON files between runs.
+
+A cache is loaded the first time it's used, and written back when
+the process exits (if it changed). Caches are only ever a speed-up,
+so a missing or unreadable file is treated as empty, and failures
+to write one are ignored.
+
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+
+
+_caches = []
+"""Every cache created, so they can all be saved at exit."""
+
+
+def create(path):
+    """Create a cache, backed by a JSON file.
+
+    Args:
+
+        path
+            The path to the file.
+
+    Returns:
+        A {"Path", "Data", "Dirty", "Lock"} dict. Hold its lock
+        while using it, and set "Dirty" to True after changing it.
+
+    """
+    cache = {"Path": path, "Data": None, "Dirty": False,
+             "Lock": threading.Lock()}
+    _caches.append(cache)
+    return cache
+
+
+def load(cache):
+    """Load a cache's data from disk, if it hasn't been loaded already.
+
+    Note:
+        Call this with the cache's lock held.
+
+    Args:
+
+        cache
+            A cache, from ``create()``.
+
+    Returns:
+        The cache's data, as a dict.
+
+    """
+    if cache["Data"] is None:
+        try:
+            with open(cache["Path"], "r") as f:
+                cache["Data"] = json.load(f)
+        except (OSError, ValueError):
+            cache["Data"] = {}
+        if not isinstance(cache["Data"], dict):
+            cache["Data"] = {}
+    return cache["Data"]
+
+
+def save(cache):
+    """Write a cache to disk, if it has changed.
+
+    It's written to a temporary file that's then renamed over the
+    old one, so readers never see a half-written cache.
+
+    Args:
+
+        cache
+            A cache, from ``create()``.
+
+    """
+    with cache["Lock"]:
+        if not cache["Dirty"]:
+            return
+        directory = os.path.dirname(cache["Path"])
+        tmp_filepath = None
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            fd, tmp_filepath = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, "w") as f:
+                json.dump(cache["Data"], f)
+            os.replace(tmp_filepath, cache["Path"])
+            cache["Dirty"] = False
+        except OSError:
+            if tmp_filepath and os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+
+
+def save_all():
+    """Write every cache that has changed to disk."""
+    for cache in _caches:
+        save(cache)
+
+
+atexit.register(save_all)
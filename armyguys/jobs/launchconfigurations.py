@@ -20,7 +20,9 @@ from .exceptions import WaitTimedOut
 from . import utils
 
 from . import instanceprofiles as instanceprofile_jobs
+from . import propagation
 from . import securitygroups as sg_jobs
+from . import userdata as userdata_jobs
 
 
 AMI_MAP = {
@@ -207,8 +209,9 @@ def create(
         instance_profile=None,
         user_data_files=None,
         user_data=None,
-        max_attempts=10,
-        wait_interval=1):
+        compress_user_data=None,
+        user_data_archive=None,
+        max_wait=None):
     """Create a launch configuration.
 
     Args:
@@ -246,16 +249,26 @@ def create(
             A list of {"contents": content, "contenttype": type} entries
             to make into a Mime Multi Part Archive for user data.
 
-        max_attempts
-            The number of times to try to create the launch configuration.
+        compress_user_data
+            True to gzip the user data, False not to, or None to
+            gzip it only if it's too big otherwise.
 
-        wait_interval
-            The number of seconds between each creation attempt.
+        user_data_archive
+            An archive from ``userdata.build()`` to use instead of
+            ``user_data_files`` and ``user_data``. The same archive
+            can be shared by many launch configurations.
+
+        max_wait
+            The most seconds to wait for the instance profile to
+            be usable.
 
     Returns:
         The security group.
 
     """
+    if not max_wait:
+        max_wait = propagation.MAX_WAIT
+
     # Get the AMI if needed.
     if not ami:
         region = profile_tools.get_profile_region(profile)
@@ -265,17 +278,12 @@ def create(
 
     # Check that the security groups exist.
     if security_groups:
-        sg_ids = []
-        for security_group in security_groups:
-            sg_data = sg_jobs.fetch(profile, security_group)
-            if not sg_data:
-                msg = "No security group '" + str(security_group) + "'."
-                raise ResourceDoesNotExist(msg)
-            else:
-                sg_id = sg_jobs.get_id(sg_data[0])
-                sg_ids.append(sg_id)
-        if sg_ids:
-            security_groups = sg_ids
+        sg_data = sg_jobs.resolve(profile, security_groups)
+        missing = utils.get_missing(sg_data)
+        if missing:
+            msg = "No security groups: " + ", ".join(missing) + "."
+            raise ResourceDoesNotExist(msg)
+        security_groups = [sg_jobs.get_id(x) for x in sg_data.values()]
 
     # Check that the instance profile exists.
     if instance_profile:
@@ -283,8 +291,13 @@ def create(
             msg = "No instance profile '" + str(instance_profile) + "'."
             raise ResourceDoesNotExist(msg)
 
-    # Build the user data.
-    archive = utils.create_mime_multipart_archive(user_data_files, user_data)
+    # Build the user data (or reuse one built before).
+    archive = user_data_archive
+    if not archive:
+        archive = userdata_jobs.build(
+            user_data_files,
+            user_data,
+            compress=compress_user_data)
 
     # Now we can create it.
     params = {}
@@ -303,29 +316,35 @@ def create(
     else:
         params["public_ip"] = False
     if archive:
-        params["user_data"] = archive
+        params["user_data"] = archive["UserData"]
+
+    # Try to create the thing. A new instance profile takes a few
+    # seconds to reach autoscaling, so wait for it to settle first
+    # (and back off if it still isn't there).
+    def create_launch_config():
+        return utils.do_request(
+            launchconfiguration,
+            "create",
+            params,
+            error_handler=create_error_handler)
 
-    # Try to create the thing. If an instance profile isn't ready,
-    # we may have to wait a bit and try again.
-    count = 0
-    while count < max_attempts:
-        response = None
+    if instance_profile:
+        propagation.wait_for_instance_profile(
+            profile,
+            instance_profile,
+            max_wait=max_wait)
         try:
-            response = utils.do_request(
-                launchconfiguration,
-                "create",
-                params,
-                error_handler=create_error_handler)
-        except ResourceNotReady:
-            pass
-        if response:
-            break
-        else:
-            count += 1
-            sleep(wait_interval)
-    if not response:
-        msg = "Timed out waiting for launch configuration to be created."
-        raise WaitTimedOut(msg)
+            propagation.call_when_ready(
+                propagation.INSTANCE_PROFILE,
+                instance_profile,
+                create_launch_config,
+                max_wait=max_wait)
+        except WaitTimedOut:
+            msg = "Timed out waiting for instance profile '" \
+                  + str(instance_profile) + "' to be usable."
+            raise WaitTimedOut(msg)
+    else:
+        create_launch_config()
 
     # Now check that the launch configuration exists.
     launch_config_data = None
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for reconciling load balancer listeners."""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ..aws import loadbalancer
+
+from .exceptions import ImproperlyConfigured
+from .exceptions import ResourceDoesNotExist
+
+from . import loadbalancers as loadbalancer_jobs
+from . import utils
+
+
+# How many load balancers to change at once.
+MAX_WORKERS = 8
+
+
+def get_key(listener):
+    """Get what makes a listener distinct, so listeners can be compared.
+
+    Args:
+
+        listener
+            A listener dict.
+
+    Returns:
+        A (port, protocol, instance protocol, instance port,
+        certificate) tuple.
+
+    """
+    protocol = listener["Protocol"].upper()
+    port = int(listener["LoadBalancerPort"])
+    return (
+        port,
+        protocol,
+        listener.get("InstanceProtocol", protocol).upper(),
+        int(listener.get("InstancePort", port)),
+        listener.get("SSLCertificateId") or None,
+        )
+
+
+def get_listeners(record):
+    """Get the listeners of a load balancer.
+
+    Args:
+
+        record
+            A load balancer's info.
+
+    Returns:
+        A list of listener dicts.
+
+    """
+    descriptions = record.get("ListenerDescriptions", [])
+    return [x["Listener"] for x in descriptions]
+
+
+def plan(current, desired):
+    """Work out the fewest changes that turn one listener set into another.
+
+    A load balancer has one listener per port, so a listener that
+    differs in any way is removed and added again.
+
+    Args:
+
+        current
+            A list of the listener dicts a load balancer has now.
+
+        desired
+            A list of the listener dicts it should have.
+
+    Raises:
+        ``ImproperlyConfigured`` if two desired listeners share a port.
+
+    Returns:
+        A {"Add": [listeners], "Remove": [ports]} dict.
+
+    """
+    wanted = OrderedDict()
+    for listener in desired:
+        key = get_key(listener)
+        if key[0] in wanted and wanted[key[0]][0] != key:
+            msg = "More than one listener on port " + str(key[0]) + "."
+            raise ImproperlyConfigured(msg)
+        wanted[key[0]] = (key, listener)
+
+    existing = {}
+    for listener in current:
+        key = get_key(listener)
+        existing[key[0]] = key
+
+    to_remove = []
+    for port, key in sorted(existing.items()):
+        if port not in wanted or wanted[port][0] != key:
+            to_remove.append(port)
+
+    to_add = []
+    for port, (key, listener) in wanted.items():
+        if existing.get(port) != key:
+            to_add.append(listener)
+
+    return {"Add": to_add, "Remove": to_remove}
+
+
+def apply(profile, name, changes):
+    """Apply planned listener changes to a load balancer.
+
+    Stale ports are removed in one request, then new listeners
+    are added in another.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of a load balancer.
+
+        changes
+            The changes, from ``plan()``.
+
+    """
+    if changes["Remove"]:
+        params = {}
+        params["profile"] = profile
+        params["load_balancer"] = name
+        params["ports"] = changes["Remove"]
+        utils.do_request(loadbalancer, "remove_listeners", params)
+    if changes["Add"]:
+        params = {}
+        params["profile"] = profile
+        params["load_balancer"] = name
+        params["listeners"] = changes["Add"]
+        utils.do_request(loadbalancer, "add_listeners", params)
+
+
+def reconcile(profile, names, listeners, dry_run=False, max_workers=None):
+    """Make some load balancers have exactly the given listeners.
+
+    The load balancers are fetched in one go, and then changed
+    at the same time. Each one gets at most one request to remove
+    listeners and one to add them.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        names
+            A list of load balancer names.
+
+        listeners
+            A list of listener dicts (see ``loadbalancers.create()``).
+
+        dry_run
+            If True, work out the changes, but don't make them.
+
+        max_workers
+            How many load balancers to change at once.
+
+    Raises:
+        ``ResourceDoesNotExist`` if any load balancer doesn't exist.
+
+        ``ImproperlyConfigured`` if two listeners share a port.
+
+    Returns:
+        An OrderedDict of {name: changes}, in the same order as
+        ``names`` (see ``plan()``).
+
+    """
+    records = loadbalancer_jobs.fetch_all(profile)
+    by_name = dict((x["LoadBalancerName"], x) for x in records)
+    missing = [x for x in names if x not in by_name]
+    if missing:
+        msg = "No load balancers: " + ", ".join(missing) + "."
+        raise ResourceDoesNotExist(msg)
+
+    result = OrderedDict()
+    for name in names:
+        current = get_listeners(by_name[name])
+        result[name] = plan(current, listeners)
+
+    pending = [(x, y) for x, y in result.items() if y["Add"] or y["Remove"]]
+    if dry_run or not pending:
+        return result
+
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(apply, profile, name, changes)
+            for name, changes in pending]
+        for future in futures:
+            future.result()
+    return result
@@ -0,0 +1,291 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for checking the health of instances behind load balancers."""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ..aws.autoscaling import autoscalinggroup
+from ..aws.ecs import cluster
+from ..aws.ecs import containerinstance
+from ..aws import loadbalancer
+
+from .exceptions import ResourceDoesNotExist
+
+from . import loadbalancers as loadbalancer_jobs
+from . import utils
+
+
+# How many AWS requests to run at once.
+MAX_WORKERS = 16
+
+# The state ELB gives healthy instances.
+IN_SERVICE = "InService"
+
+# The least and most seconds to wait between looks, when watching.
+MIN_INTERVAL = 2
+MAX_INTERVAL = 30
+
+
+def health_error_handler(error):
+    """Handle errors that arise when you get instance health.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceDoesNotExist`` if the load balancer is gone.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code == "LoadBalancerNotFound":
+        raise ResourceDoesNotExist(error.response["Error"]["Message"])
+    else:
+        raise error
+
+
+def fetch_instance_health(executor, profile, names):
+    """Fetch the instance health of many load balancers at once.
+
+    Args:
+
+        executor
+            The executor to run requests on.
+
+        profile
+            A profile to connect to AWS with.
+
+        names
+            A list of load balancer names.
+
+    Returns:
+        An OrderedDict of {name: [instance states]}, in the same
+        order as ``names``.
+
+    """
+    futures = []
+    for name in names:
+        params = {}
+        params["profile"] = profile
+        params["load_balancer"] = name
+        futures.append((name, executor.submit(
+            utils.do_request,
+            loadbalancer,
+            "get_instance_health",
+            params,
+            health_error_handler)))
+    result = OrderedDict()
+    for name, future in futures:
+        result[name] = utils.get_data("InstanceStates", future.result())
+    return result
+
+
+def fetch_memberships(profile):
+    """Find out which auto scaling group each instance is in.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A dict of {EC2 instance ID: auto scaling group name}.
+
+    """
+    params = {}
+    params["profile"] = profile
+    response = utils.do_request(autoscalinggroup, "get", params)
+    result = {}
+    for group in utils.get_data("AutoScalingGroups", response):
+        for instance in group.get("Instances", []):
+            result[instance["InstanceId"]] = group["AutoScalingGroupName"]
+    return result
+
+
+def fetch_container_instances(executor, profile):
+    """Find out which ECS cluster each instance is in, and its status.
+
+    The clusters' container instances are fetched at the same time.
+
+    Args:
+
+        executor
+            The executor to run requests on.
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A dict of {EC2 instance ID: {"Cluster", "Status",
+        "AgentConnected"}}.
+
+    """
+    params = {}
+    params["profile"] = profile
+    response = utils.do_request(cluster, "get", params)
+    names = [x["clusterName"] for x in utils.get_data("clusters", response)]
+
+    futures = []
+    for name in names:
+        params = {}
+        params["profile"] = profile
+        params["cluster"] = name
+        futures.append((name, executor.submit(
+            utils.do_request, containerinstance, "get", params)))
+    result = {}
+    for name, future in futures:
+        records = utils.get_data("containerInstances", future.result())
+        for record in records:
+            result[record["ec2InstanceId"]] = {
+                "Cluster": name,
+                "Status": record.get("status"),
+                "AgentConnected": record.get("agentConnected"),
+                }
+    return result
+
+
+def build_matrix(health, memberships, containers):
+    """Join instance health with auto scaling groups and ECS clusters.
+
+    Args:
+
+        health
+            The instance health, from ``fetch_instance_health()``.
+
+        memberships
+            The auto scaling groups, from ``fetch_memberships()``.
+
+        containers
+            The ECS container instances,
+            from ``fetch_container_instances()``.
+
+    Returns:
+        A list with one row per instance, sorted by instance ID.
+        Each row is a {"InstanceId", "AutoScalingGroup", "Cluster",
+        "ContainerStatus", "AgentConnected", "LoadBalancers",
+        "Healthy"} dict, where "LoadBalancers" is an OrderedDict
+        of {name: instance state}.
+        An instance is healthy if every load balancer has it in
+        service, and (if it's in an ECS cluster) its agent is up.
+
+    """
+    rows = {}
+    for name, states in health.items():
+        for state in states:
+            instance_id = state["InstanceId"]
+            row = rows.get(instance_id)
+            if not row:
+                container = containers.get(instance_id, {})
+                row = {
+                    "InstanceId": instance_id,
+                    "AutoScalingGroup": memberships.get(instance_id),
+                    "Cluster": container.get("Cluster"),
+                    "ContainerStatus": container.get("Status"),
+                    "AgentConnected": container.get("AgentConnected"),
+                    "LoadBalancers": OrderedDict(),
+                    }
+                rows[instance_id] = row
+            row["LoadBalancers"][name] = state
+
+    result = []
+    for instance_id in sorted(rows):
+        row = rows[instance_id]
+        in_service = all(
+            x["State"] == IN_SERVICE for x in row["LoadBalancers"].values())
+        container_ok = not row["Cluster"] or (
+            row["ContainerStatus"] == "ACTIVE" and row["AgentConnected"])
+        row["Healthy"] = in_service and bool(container_ok)
+        result.append(row)
+    return result
+
+
+def check(profile, names=None, max_workers=None):
+    """Check the health of every instance behind some load balancers.
+
+    All of the load balancers' instance health, the auto scaling
+    groups, and the ECS clusters' container instances are fetched
+    at the same time.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        names
+            A list of load balancer names. Defaults to all of them.
+
+        max_workers
+            How many requests to run at once.
+
+    Returns:
+        A health matrix (see ``build_matrix()``).
+
+    """
+    # The container instance lookup runs on the executor and submits
+    # its own requests to it, so it needs a second worker.
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    max_workers = max(max_workers, 2)
+    if not names:
+        records = loadbalancer_jobs.fetch_all(profile)
+        names = [x["LoadBalancerName"] for x in records]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        memberships = executor.submit(fetch_memberships, profile)
+        containers = executor.submit(
+            fetch_container_instances, executor, profile)
+        health = fetch_instance_health(executor, profile, names)
+        return build_matrix(
+            health,
+            memberships.result(),
+            containers.result())
+
+
+def get_signature(matrix):
+    """Get what matters about a health matrix, to spot changes.
+
+    Args:
+
+        matrix
+            A health matrix (see ``build_matrix()``).
+
+    Returns:
+        A hashable summary of every instance's states.
+
+    """
+    return tuple(
+        (row["InstanceId"], row["ContainerStatus"], tuple(
+            (name, state["State"])
+            for name, state in row["LoadBalancers"].items()))
+        for row in matrix)
+
+
+def get_next_interval(interval, previous, matrix):
+    """Work out how long to wait before looking again, when watching.
+
+    While anything is unhealthy or changing, look again soon. While
+    everything stays healthy, back off (doubling each time).
+
+    Args:
+
+        interval
+            The last interval, in seconds (or None, at the start).
+
+        previous
+            The last health matrix (or None, at the start).
+
+        matrix
+            The newest health matrix.
+
+    Returns:
+        The number of seconds to wait.
+
+    """
+    unhealthy = any(not row["Healthy"] for row in matrix)
+    changed = previous is None \
+        or get_signature(previous) != get_signature(matrix)
+    if unhealthy or changed or not interval:
+        return MIN_INTERVAL
+    return min(interval * 2, MAX_INTERVAL)
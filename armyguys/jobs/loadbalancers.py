@@ -11,6 +11,7 @@ from ..aws import loadbalancer
 from . import launchconfigurations as launchconfig_jobs
 from . import regions as region_jobs
 from . import securitygroups as sg_jobs
+from . import tags as tag_jobs
 
 from .exceptions import ResourceAlreadyExists
 from .exceptions import ResourceDoesNotExist
@@ -229,14 +230,12 @@ def create(
     # Make sure the security groups exist.
     security_group_ids = []
     if security_groups:
-        for security_group in security_groups:
-            security_group_data = sg_jobs.fetch(profile, security_group)
-            if security_group_data:
-                sg_id = sg_jobs.get_id(security_group_data[0])
-                security_group_ids.append(sg_id)
-            else:
-                msg = "No security group '" + str(security_group) + "'."
-                raise ResourceDoesNotExist(msg)
+        sg_data = sg_jobs.resolve(profile, security_groups)
+        missing = utils.get_missing(sg_data)
+        if missing:
+            msg = "No security groups: " + ", ".join(missing) + "."
+            raise ResourceDoesNotExist(msg)
+        security_group_ids = [sg_jobs.get_id(x) for x in sg_data.values()]
     
     # Get the availability zones/subnets we want to delpoy into.
     sub_regions = region_jobs.get_available_sub_regions(
@@ -268,14 +267,7 @@ def create(
         raise ResourceNotCreated(msg)
 
     # Tag the load balancer.
-    if tags:
-        for tag in tags:
-            params = {}
-            params["profile"] = profile
-            params["load_balancer"] = name
-            params["key"] = tag["Key"]
-            params["value"] = tag["Value"]
-            utils.do_request(loadbalancer, "tag", params)
+    tag_jobs.apply(profile, [(tag_jobs.LOAD_BALANCER, name)], tags)
     
     # Send back the load balancer's info.
     return load_balancer_data
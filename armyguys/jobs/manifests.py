@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for remembering the hashes of local files between runs."""
+
+import os
+import time
+
+from . import jsoncache
+
+
+# Where the manifest is kept.
+MANIFEST_PATH = os.path.join(
+    os.path.expanduser("~"),
+    ".armyguys",
+    "manifest.json")
+
+# Files changed more recently than this (in seconds) aren't cached,
+# since a change within the same clock tick wouldn't alter the mtime.
+MIN_AGE = 2
+
+
+_cache = jsoncache.create(MANIFEST_PATH)
+"""The manifest, stored as {path: {"Stamp": stamp, "Hashes": hashes}}."""
+
+
+def get_stamp(filepath):
+    """Get a stamp that changes whenever a file (probably) changes.
+
+    Args:
+
+        filepath
+            The path to a file.
+
+    Returns:
+        A [size, mtime, inode] list, with the mtime in nanoseconds.
+
+    """
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def lookup(filepath, kind):
+    """Look up a hash of a file, if the file hasn't changed since.
+
+    Args:
+
+        filepath
+            The path to a file.
+
+        kind
+            The kind of hash, e.g., "md5" or "etag-8388608".
+
+    Returns:
+        The hash, or None if it isn't known (or the file changed).
+
+    """
+    path = os.path.abspath(filepath)
+    stamp = get_stamp(path)
+    with _cache["Lock"]:
+        entry = jsoncache.load(_cache).get(path)
+        if not entry or entry.get("Stamp") != stamp:
+            return None
+        return entry["Hashes"].get(kind)
+
+
+def store(filepath, kind, value, stamp):
+    """Remember a hash of a file.
+
+    Args:
+
+        filepath
+            The path to the file.
+
+        kind
+            The kind of hash, e.g., "md5" or "etag-8388608".
+
+        value
+            The hash.
+
+        stamp
+            The file's stamp (from ``get_stamp()``), taken
+            before the file was read.
+
+    """
+    path = os.path.abspath(filepath)
+    if stamp[1] > (time.time() - MIN_AGE) * 1e9:
+        return
+    if get_stamp(path) != stamp:
+        return
+    with _cache["Lock"]:
+        manifest = jsoncache.load(_cache)
+        entry = manifest.get(path)
+        if not entry or entry.get("Stamp") != stamp:
+            entry = {"Stamp": stamp, "Hashes": {}}
+            manifest[path] = entry
+        entry["Hashes"][kind] = value
+        _cache["Dirty"] = True
+
+
+def get_hash(filepath, kind, func):
+    """Get a hash of a file, from the manifest if possible.
+
+    Args:
+
+        filepath
+            The path to a file.
+
+        kind
+            The kind of hash, e.g., "md5" or "etag-8388608".
+
+        func
+            A function that reads the file and returns the hash.
+            It's only called if the hash isn't in the manifest.
+
+    Returns:
+        The hash.
+
+    """
+    value = lookup(filepath, kind)
+    if value is None:
+        stamp = get_stamp(filepath)
+        value = func()
+        store(filepath, kind, value, stamp)
+    return value
+
+
+def save():
+    """Write the manifest to disk, if it has changed.
+
+    It's also saved when the process exits.
+
+    """
+    jsoncache.save(_cache)
@@ -0,0 +1,469 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for checking IAM permissions before making any changes.
+
+Policy documents are compiled into matchers, indexed by service
+(e.g., "ec2"), so an action is only tested against the statements
+that could match it. Decisions are cached, so checking the same
+actions again (or thousands of them) is cheap.
+
+The checks are deliberately optimistic. Conditions, permission
+boundaries and resource-based policies aren't modelled, so an action
+is only reported as denied if the caller's own policies clearly
+don't allow it. (A Deny with a condition, e.g., one that enforces
+MFA, is ignored, since it may well not apply.)
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
+
+import functools
+import json
+import re
+import threading
+import weakref
+
+from ..aws.iam import account
+from ..aws.iam import policy as policy_lib
+
+from .exceptions import PermissionDenied
+
+from . import identity
+from . import utils
+
+
+# The decisions an evaluation can reach.
+ALLOW = "Allow"
+DENY = "Deny"
+IMPLICIT_DENY = "ImplicitDeny"
+
+# How many managed policies to fetch at once.
+MAX_WORKERS = 8
+
+
+_lock = threading.Lock()
+"""A lock to guard the compiled policy cache."""
+
+
+_callers = weakref.WeakKeyDictionary()
+"""The callers' compiled policies, stored as {session: policies}."""
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_pattern(pattern, ignore_case=False):
+    """Compile an IAM wildcard pattern (with * and ?) into a regex.
+
+    Policy variables (e.g., "${aws:username}") match anything.
+
+    Args:
+
+        pattern
+            An action or resource pattern.
+
+        ignore_case
+            True for actions, which IAM matches without case.
+
+    Returns:
+        A compiled regex.
+
+    """
+    parts = re.split(r"(\$\{[^}]*\}|\*|\?)", pattern)
+    regex = ""
+    for part in parts:
+        if part == "?":
+            regex += "."
+        elif part == "*" or part.startswith("${"):
+            regex += ".*"
+        else:
+            regex += re.escape(part)
+    flags = re.IGNORECASE if ignore_case else 0
+    return re.compile(regex + r"\Z", flags)
+
+
+def as_list(value):
+    """Wrap a single policy value (which IAM allows) in a list."""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def parse_document(document):
+    """Get a policy document as a dict.
+
+    Args:
+
+        document
+            A dict, or a (possibly URL encoded) JSON string.
+
+    Returns:
+        The document, as a dict.
+
+    """
+    if isinstance(document, dict):
+        return document
+    document = document.strip()
+    if not document.startswith("{"):
+        document = unquote(document)
+    return json.loads(document)
+
+
+def get_service(pattern):
+    """Get the service an action pattern is indexed under.
+
+    Args:
+
+        pattern
+            An action pattern, e.g., "ec2:Describe*".
+
+    Returns:
+        The service (e.g., "ec2"), or "*" if it could be any.
+
+    """
+    service = pattern.split(":", 1)[0].lower()
+    if "*" in service or "?" in service or ":" not in pattern:
+        return "*"
+    return service
+
+
+def compile_statement(statement):
+    """Compile one policy statement.
+
+    Args:
+
+        statement
+            A statement dict.
+
+    Returns:
+        A {"Effect", "Actions", "NotAction", "Resources",
+        "NotResource", "AnyResource", "Conditional", "Services"} dict.
+
+    """
+    not_action = "NotAction" in statement
+    actions = as_list(statement.get("NotAction" if not_action else "Action"))
+    not_resource = "NotResource" in statement
+    resources = as_list(
+        statement.get("NotResource" if not_resource else "Resource"))
+    services = set(get_service(x) for x in actions)
+    if not_action:
+        services = set(["*"])
+    return {
+        "Effect": statement.get("Effect", DENY),
+        "Actions": [compile_pattern(x, True) for x in actions],
+        "NotAction": not_action,
+        "Resources": [compile_pattern(x) for x in resources],
+        "NotResource": not_resource,
+        "AnyResource": "*" in resources,
+        "Conditional": bool(statement.get("Condition")),
+        "Services": services,
+        }
+
+
+def compile_policies(documents):
+    """Compile policy documents into one indexed set of matchers.
+
+    Args:
+
+        documents
+            A list of policy documents (dicts or JSON strings).
+
+    Returns:
+        A compiled policy set, to pass to ``evaluate()``.
+
+    """
+    index = {ALLOW: {}, DENY: {}}
+    for document in documents:
+        document = parse_document(document)
+        for statement in as_list(document.get("Statement")):
+            compiled = compile_statement(statement)
+            effect = DENY if compiled["Effect"] == DENY else ALLOW
+            for service in compiled["Services"]:
+                index[effect].setdefault(service, []).append(compiled)
+    return {"Index": index, "Decisions": {}, "Lock": threading.Lock()}
+
+
+def matches_action(statement, action):
+    """Check if a compiled statement applies to an action.
+
+    A conditional Deny never applies, since its condition
+    can't be checked here.
+
+    """
+    if statement["Effect"] == DENY and statement["Conditional"]:
+        return False
+    matched = any(x.match(action) for x in statement["Actions"])
+    return matched != statement["NotAction"]
+
+
+def matches_resource(statement, resource):
+    """Check if a compiled statement applies to a resource.
+
+    If the resource isn't known (None), an Allow applies to it,
+    but a Deny only does if it covers every resource.
+
+    """
+    if resource is None:
+        if statement["Effect"] == DENY:
+            return statement["AnyResource"] and not statement["NotResource"]
+        return True
+    matched = any(x.match(resource) for x in statement["Resources"])
+    return matched != statement["NotResource"]
+
+
+def evaluate(policies, action, resource=None):
+    """Decide if policies allow an action.
+
+    As in IAM, an explicit Deny beats any Allow, and anything
+    not allowed is (implicitly) denied.
+
+    Args:
+
+        policies
+            A compiled policy set, from ``compile_policies()``.
+
+        action
+            An action, e.g., "ec2:DescribeImages".
+
+        resource
+            The ARN of the resource the action is on, if known.
+
+    Returns:
+        ``ALLOW``, ``DENY`` or ``IMPLICIT_DENY``.
+
+    """
+    key = (action, resource)
+    with policies["Lock"]:
+        decision = policies["Decisions"].get(key)
+    if decision:
+        return decision
+
+    service = get_service(action)
+    decision = IMPLICIT_DENY
+    for effect in [DENY, ALLOW]:
+        index = policies["Index"][effect]
+        candidates = index.get(service, []) + index.get("*", [])
+        if any(matches_action(x, action) and matches_resource(x, resource)
+               for x in candidates):
+            decision = effect
+            break
+
+    with policies["Lock"]:
+        policies["Decisions"][key] = decision
+    return decision
+
+
+def get_denied(policies, actions, resource=None):
+    """Find the actions policies don't allow.
+
+    Args:
+
+        policies
+            A compiled policy set, from ``compile_policies()``.
+
+        actions
+            A list of actions.
+
+        resource
+            The ARN of the resource the actions are on, if known.
+
+    Returns:
+        A sorted list of the actions that aren't allowed.
+
+    """
+    denied = set()
+    for action in actions:
+        if evaluate(policies, action, resource) != ALLOW:
+            denied.add(action)
+    return sorted(denied)
+
+
+def read_error_handler(error):
+    """Handle errors that arise when you read the caller's policies.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``PermissionDenied`` if IAM can't be read.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code == "AccessDenied":
+        raise PermissionDenied(error.response["Error"]["Message"])
+    else:
+        raise error
+
+
+def get_default_document(record):
+    """Get the default version's document from a managed policy record."""
+    for version in record.get("PolicyVersionList", []):
+        if version.get("IsDefaultVersion"):
+            return version["Document"]
+    return None
+
+
+def fetch_managed_document(profile, arn):
+    """Fetch the default version's document of a managed policy.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        arn
+            The ARN of the policy.
+
+    Returns:
+        The policy document.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["policy"] = arn
+    response = utils.do_request(
+        policy_lib,
+        "details",
+        params,
+        read_error_handler)
+    data = utils.get_data("Policy", response)
+
+    params = {}
+    params["profile"] = profile
+    params["policy"] = arn
+    params["version"] = data["DefaultVersionId"]
+    response = utils.do_request(
+        policy_lib,
+        "get_version",
+        params,
+        read_error_handler)
+    data = utils.get_data("PolicyVersion", response)
+    return data["Document"]
+
+
+def fetch_caller_documents(profile):
+    """Fetch every policy document that applies to the calling IAM user.
+
+    That's the user's inline and managed policies, and those of
+    their groups. Customer managed policies come with the one
+    (paginated) authorization details request. AWS managed ones
+    are fetched separately, at the same time.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Raises:
+        ``PermissionDenied`` if the caller's policies can't be read,
+        or the caller isn't an IAM user (e.g., it has a role's
+        credentials).
+
+    Returns:
+        A list of policy documents.
+
+    """
+    arn = identity.get(profile)["Arn"]
+    resource = arn.split(":", 5)[-1]
+    if not resource.startswith("user/"):
+        msg = "'" + str(arn) + "' isn't an IAM user."
+        raise PermissionDenied(msg)
+    user_name = resource.split("/")[-1]
+
+    params = {}
+    params["profile"] = profile
+    params["filters"] = ["User", "Group", "LocalManagedPolicy"]
+    details = utils.do_request(
+        account,
+        "get_authorization_details",
+        params,
+        read_error_handler)
+
+    users = [
+        x for x in details.get("UserDetailList", [])
+        if x["UserName"] == user_name]
+    if not users:
+        msg = "Could not find IAM user '" + str(user_name) + "'."
+        raise PermissionDenied(msg)
+    user = users[0]
+    groups = [
+        x for x in details.get("GroupDetailList", [])
+        if x["GroupName"] in user.get("GroupList", [])]
+
+    documents = []
+    arns = set()
+    for entity, key in [(user, "UserPolicyList")] \
+            + [(x, "GroupPolicyList") for x in groups]:
+        documents.extend(x["PolicyDocument"] for x in entity.get(key, []))
+        arns.update(
+            x["PolicyArn"] for x in entity.get("AttachedManagedPolicies", []))
+
+    local = dict((x["Arn"], x) for x in details.get("Policies", []))
+    remote = []
+    for arn in sorted(arns):
+        document = get_default_document(local.get(arn, {}))
+        if document is not None:
+            documents.append(document)
+        else:
+            remote.append(arn)
+
+    if remote:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            documents.extend(executor.map(
+                lambda x: fetch_managed_document(profile, x),
+                remote))
+    return documents
+
+
+def get_caller_policies(profile):
+    """Get the calling IAM user's compiled policies, fetching them once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+    Returns:
+        A compiled policy set (see ``compile_policies()``), or None
+        if the caller's policies can't be read.
+
+    """
+    with _lock:
+        if profile in _callers:
+            return _callers[profile]
+    try:
+        result = compile_policies(fetch_caller_documents(profile))
+    except PermissionDenied:
+        result = None
+    with _lock:
+        _callers[profile] = result
+    return result
+
+
+def check(profile, actions):
+    """Make sure the caller may do some actions, before doing any.
+
+    If the caller's policies can't be read, nothing is checked.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        actions
+            A list of actions, e.g., "ecs:CreateCluster".
+
+    Raises:
+        ``PermissionDenied`` if any of the actions aren't allowed.
+
+    """
+    policies = get_caller_policies(profile)
+    if policies is None:
+        return
+    denied = get_denied(policies, actions)
+    if denied:
+        msg = "Not allowed: " + ", ".join(denied) + "."
+        raise PermissionDenied(msg)
@@ -2,8 +2,12 @@
 
 """Jobs for IAM policies."""
 
+import hashlib
+import json
 import os
 
+from time import sleep
+
 from ..aws.iam import policy
 
 from .exceptions import FileDoesNotExist
@@ -15,9 +19,30 @@ from .exceptions import ResourceNotCreated
 from .exceptions import ResourceNotDeleted
 from .exceptions import WaitTimedOut
 
+from . import iaminventory
+from . import permissions
 from . import utils
 
 
+# What applying a policy (or a role's trust policy) did.
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+# The most versions IAM keeps of a managed policy.
+MAX_VERSIONS = 5
+
+# The actions ``apply()`` takes (besides fetching the IAM inventory).
+APPLY_ACTIONS = [
+    "iam:CreatePolicy",
+    "iam:CreatePolicyVersion",
+    "iam:DeletePolicyVersion",
+    ]
+
+# Statement keys whose values are unordered sets.
+SET_KEYS = ["Action", "NotAction", "Resource", "NotResource"]
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -178,6 +203,7 @@ def create(profile, name, filepath=None, contents=None):
     elif contents:
         params["contents"] = contents
     response = utils.do_request(policy, "create", params)
+    iaminventory.invalidate(profile)
 
     # Check that it exists.
     policy_data = polling_fetch(profile, name)
@@ -208,13 +234,244 @@ def delete(profile, name):
         raise ResourceDoesNotExist(msg)
     policy_arn = policy_data[0]["Arn"]
 
+    # A policy can't be deleted while it has other versions.
+    params = {}
+    params["profile"] = profile
+    params["policy"] = policy_arn
+    response = utils.do_request(policy, "get_versions", params)
+    versions = utils.get_data("Versions", response)
+    prune_versions(profile, policy_arn, versions, 1)
+
     # Now try to delete it.
     params = {}
     params["profile"] = profile
     params["policy"] = policy_arn
     response = utils.do_request(policy, "delete", params)
+    iaminventory.invalidate(profile)
 
     # Check that it was, in fact, deleted.
     if exists(profile, name):
         msg = "The policy '" + str(name) + "' was not deleted."
         raise ResourceNotDeleted(msg)
+
+
+def canonicalize(document):
+    """Write a policy document the same way, however it was written.
+
+    Keys are sorted, single values become lists, and the order of
+    statements, actions, resources, principals and condition values
+    is ignored, since IAM ignores it too.
+
+    Args:
+
+        document
+            A policy document (a dict, or a JSON string).
+
+    Returns:
+        The canonical JSON string.
+
+    """
+    def as_set(value):
+        return sorted(set(permissions.as_list(value)))
+
+    def normalize(statement):
+        result = dict(statement)
+        for key in SET_KEYS:
+            if key in result:
+                result[key] = as_set(result[key])
+        for key in ["Principal", "NotPrincipal"]:
+            if isinstance(result.get(key), dict):
+                result[key] = dict(
+                    (x, as_set(y)) for x, y in result[key].items())
+        if isinstance(result.get("Condition"), dict):
+            result["Condition"] = dict(
+                (operator, dict((x, as_set(y)) for x, y in tests.items()))
+                for operator, tests in result["Condition"].items())
+        return json.dumps(result, sort_keys=True, separators=(",", ":"))
+
+    document = dict(permissions.parse_document(document))
+    statements = permissions.as_list(document.get("Statement"))
+    document["Statement"] = sorted(normalize(x) for x in statements)
+    return json.dumps(document, sort_keys=True, separators=(",", ":"))
+
+
+def get_digest(document):
+    """Get a hash of a policy document that ignores how it's written.
+
+    Args:
+
+        document
+            A policy document (a dict, or a JSON string).
+
+    Returns:
+        The SHA-256 hex digest of ``canonicalize(document)``.
+
+    """
+    data = canonicalize(document).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_document(filepath=None, contents=None):
+    """Read a policy document from a file or from contents.
+
+    Args:
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The policy (a dict, or a JSON string). If you provide this,
+            leave the ``filepath`` parameter blank.
+
+    Raises:
+        ``ImproperlyConfigured`` if it isn't a valid policy document.
+
+        ``FileDoesNotExist`` if there's no such file.
+
+    Returns:
+        The policy document, as a dict.
+
+    """
+    if all([filepath, contents]) or not any([filepath, contents]):
+        msg = "Provide either a file path or its contents, but not both."
+        raise ImproperlyConfigured(msg)
+    if filepath:
+        if not os.path.isfile(filepath):
+            msg = "No such file '" + str(filepath) + "'."
+            raise FileDoesNotExist(msg)
+        with open(filepath, "rb") as f:
+            contents = f.read().decode("utf-8")
+    try:
+        return permissions.parse_document(contents)
+    except ValueError:
+        msg = "The policy isn't valid JSON."
+        raise ImproperlyConfigured(msg)
+
+
+def get_default_version(record):
+    """Get the default version of a policy, from its inventory record.
+
+    Args:
+
+        record
+            The policy's record in an IAM inventory.
+
+    Returns:
+        The default version's {"VersionId", "Document", ...} record,
+        or None if it has none.
+
+    """
+    for version in record.get("PolicyVersionList", []):
+        if version.get("IsDefaultVersion"):
+            return version
+    return None
+
+
+def prune_versions(profile, arn, versions, keep):
+    """Delete a policy's oldest versions, down to a number of them.
+
+    The default version is never deleted.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        arn
+            The ARN of the policy.
+
+        versions
+            A list of the policy's versions. The deleted ones are
+            removed from it, so an inventory record stays current.
+
+        keep
+            The most versions to leave.
+
+    Returns:
+        A list of the IDs of the deleted versions.
+
+    """
+    old = [x for x in versions if not x.get("IsDefaultVersion")]
+    old.sort(key=lambda x: int(x["VersionId"].lstrip("v")))
+    count = max(len(versions) - keep, 0)
+    deleted = []
+    for version in old[:count]:
+        params = {}
+        params["profile"] = profile
+        params["policy"] = arn
+        params["version"] = version["VersionId"]
+        utils.do_request(policy, "delete_version", params)
+        versions.remove(version)
+        deleted.append(version["VersionId"])
+    return deleted
+
+
+def apply(profile, name, filepath=None, contents=None):
+    """Create or update a policy, but only if it has changed.
+
+    The policy is looked up in the (shared) IAM inventory. If its
+    default version says the same thing (in any order), nothing is
+    done. Otherwise a new default version is created, after pruning
+    the oldest versions to make room. Either way, the inventory is
+    patched with the change, rather than refetched.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the policy.
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The policy (a dict, or a JSON string). If you provide this,
+            leave the ``filepath`` parameter blank.
+
+    Returns:
+        ``CREATED``, ``UPDATED`` or ``UNCHANGED``.
+
+    """
+    document = read_document(filepath, contents)
+
+    inventory = iaminventory.get(profile)
+    record = iaminventory.find(inventory, iaminventory.POLICY, name)
+    if not record:
+        params = {}
+        params["profile"] = profile
+        params["name"] = name
+        params["contents"] = document
+        response = utils.do_request(policy, "create", params)
+        record = utils.get_data("Policy", response)
+        record["PolicyVersionList"] = [{
+            "VersionId": record["DefaultVersionId"],
+            "IsDefaultVersion": True,
+            "Document": document,
+            }]
+        iaminventory.add(profile, iaminventory.POLICY, record)
+        return CREATED
+
+    current = get_default_version(record)
+    if current and get_digest(current["Document"]) == get_digest(document):
+        return UNCHANGED
+
+    versions = record.setdefault("PolicyVersionList", [])
+    prune_versions(profile, record["Arn"], versions, MAX_VERSIONS - 1)
+
+    params = {}
+    params["profile"] = profile
+    params["policy"] = record["Arn"]
+    params["contents"] = document
+    response = utils.do_request(policy, "create_version", params)
+    version = dict(utils.get_data("PolicyVersion", response))
+    version["IsDefaultVersion"] = True
+    version["Document"] = document
+    for x in versions:
+        x["IsDefaultVersion"] = False
+    versions.append(version)
+    record["DefaultVersionId"] = version["VersionId"]
+    return UPDATED
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for waiting out IAM's eventual consistency.
+
+A new role or instance profile shows up in IAM right away, but other
+services (EC2, autoscaling) only see it once the change has spread,
+which usually takes a few seconds. Rather than trying again every
+second, the jobs here remember when each IAM resource was changed,
+and wait for that to settle (with backoff) before and between tries.
+
+"""
+
+import threading
+import time
+
+from ..aws.iam import instanceprofile
+
+from .exceptions import ResourceDoesNotExist
+from .exceptions import ResourceNotReady
+from .exceptions import WaitTimedOut
+
+from . import utils
+
+
+# The kinds of IAM resources that are tracked.
+ROLE = "role"
+INSTANCE_PROFILE = "instance-profile"
+
+# How many seconds an IAM change usually takes to spread.
+SETTLE_TIME = 8
+
+# The least and most seconds to wait between tries.
+MIN_DELAY = 0.5
+MAX_DELAY = 8
+
+# The most seconds to wait for a change to spread.
+MAX_WAIT = 60
+
+
+_lock = threading.Lock()
+"""A lock to guard the change log."""
+
+
+_changes = {}
+"""When IAM resources were last changed, as {(kind, name): time}."""
+
+
+def mark(kind, name):
+    """Note that an IAM resource was just created or changed.
+
+    Args:
+
+        kind
+            ``ROLE`` or ``INSTANCE_PROFILE``.
+
+        name
+            The name of the resource.
+
+    """
+    with _lock:
+        _changes[(kind, name)] = time.monotonic()
+
+
+def get_age(kind, name):
+    """Get how long ago an IAM resource was changed.
+
+    Args:
+
+        kind
+            ``ROLE`` or ``INSTANCE_PROFILE``.
+
+        name
+            The name of the resource.
+
+    Returns:
+        The number of seconds, or None if it wasn't changed here.
+
+    """
+    with _lock:
+        changed = _changes.get((kind, name))
+    if changed is None:
+        return None
+    return time.monotonic() - changed
+
+
+def get_delays(kind, name, max_wait=MAX_WAIT):
+    """Get how long to wait before each try at using an IAM resource.
+
+    The first delay is whatever's left of the resource's settle time
+    (nothing at all, if it wasn't changed here). After that, the
+    delays double, from ``MIN_DELAY`` up to ``MAX_DELAY``.
+
+    Args:
+
+        kind
+            ``ROLE`` or ``INSTANCE_PROFILE``.
+
+        name
+            The name of the resource.
+
+        max_wait
+            The most seconds to wait in all.
+
+    Returns:
+        A generator of delays, in seconds.
+
+    """
+    age = get_age(kind, name)
+    first = 0
+    if age is not None:
+        first = max(SETTLE_TIME - age, 0)
+    yield first
+    total = first
+    delay = MIN_DELAY
+    while total + delay <= max_wait:
+        yield delay
+        total += delay
+        delay = min(delay * 2, MAX_DELAY)
+
+
+def call_when_ready(kind, name, func, max_wait=MAX_WAIT):
+    """Call a function that needs an IAM resource, once it's ready.
+
+    Args:
+
+        kind
+            ``ROLE`` or ``INSTANCE_PROFILE``.
+
+        name
+            The name of the resource.
+
+        func
+            A function that takes no arguments. It should raise
+            ``ResourceNotReady`` if the resource isn't ready yet.
+
+        max_wait
+            The most seconds to wait in all.
+
+    Raises:
+        ``WaitTimedOut`` if the resource never gets ready.
+
+    Returns:
+        Whatever the function returns.
+
+    """
+    for delay in get_delays(kind, name, max_wait):
+        if delay:
+            time.sleep(delay)
+        try:
+            return func()
+        except ResourceNotReady:
+            pass
+    msg = "Timed out waiting for " + kind + " '" + str(name) + "'."
+    raise WaitTimedOut(msg)
+
+
+def probe_error_handler(error):
+    """Handle errors that arise when you probe an instance profile.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceDoesNotExist`` if the instance profile is gone.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code == "NoSuchEntity":
+        raise ResourceDoesNotExist(error.response["Error"]["Message"])
+    else:
+        raise error
+
+
+def is_instance_profile_ready(profile, name, role=None):
+    """Check (cheaply) if IAM has an instance profile and its role.
+
+    This only shows IAM's own view. Other services may still need
+    a few seconds after this is True.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the instance profile.
+
+        role
+            The name of a role it should have. If left blank,
+            any role will do.
+
+    Returns:
+        True if it's ready, False if not.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["instance_profile"] = name
+    try:
+        response = utils.do_request(
+            instanceprofile,
+            "details",
+            params,
+            error_handler=probe_error_handler)
+    except ResourceDoesNotExist:
+        return False
+    data = utils.get_data("InstanceProfile", response)
+    roles = [x["RoleName"] for x in data.get("Roles", [])]
+    if role:
+        return role in roles
+    return len(roles) > 0
+
+
+def wait_for_instance_profile(profile, name, role=None, max_wait=MAX_WAIT):
+    """Wait until IAM has an instance profile and its role.
+
+    Only an instance profile that was changed here (see ``mark()``)
+    is waited for. Any other one is probed once, and used as is,
+    since it may rightly have no role.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the instance profile.
+
+        role
+            The name of a role it should have.
+
+        max_wait
+            The most seconds to wait in all.
+
+    Raises:
+        ``WaitTimedOut`` if it was changed here, and never gets ready.
+
+    Returns:
+        True if it's ready, False if not (which only happens if
+        it wasn't changed here).
+
+    """
+    # Probe straight away: IAM itself is quick, it's the
+    # other services that need the settle time.
+    if get_age(INSTANCE_PROFILE, name) is None:
+        return is_instance_profile_ready(profile, name, role)
+    delay = MIN_DELAY
+    waited = 0
+    while not is_instance_profile_ready(profile, name, role):
+        if waited + delay > max_wait:
+            msg = "Timed out waiting for instance profile '" \
+                  + str(name) + "'."
+            raise WaitTimedOut(msg)
+        time.sleep(delay)
+        waited += delay
+        delay = min(delay * 2, MAX_DELAY)
+    return True
@@ -9,6 +9,8 @@ from . import vpcs as vpc_jobs
 from .exceptions import ImproperlyConfigured
 from .exceptions import ResourceDoesNotExist
 
+from . import utils
+
 
 def get_available_sub_regions(
         profile,
@@ -64,14 +66,12 @@ def get_available_sub_regions(
     # Check tha the subnets exist.
     subnet_ids = []
     if subnets:
-        for subnet in subnets:
-            subnet_data = subnet_jobs.fetch(profile, subnet)
-            if subnet_data:
-                subnet_id = subnet_jobs.get_id(subnet_data[0])
-                subnet_ids.append(subnet_id)
-            else:
-                msg = "No subnet '" + str(subnet) + "'."
-                raise ResourceDoesNotExist(msg)
+        subnet_data = subnet_jobs.resolve(profile, subnets)
+        missing = utils.get_missing(subnet_data)
+        if missing:
+            msg = "No subnets: " + ", ".join(missing) + "."
+            raise ResourceDoesNotExist(msg)
+        subnet_ids = [subnet_jobs.get_id(x) for x in subnet_data.values()]
 
     # Check that the VPC exists.
     vpc_id = None
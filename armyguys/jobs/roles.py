@@ -4,6 +4,8 @@
 
 import os
 
+from time import sleep
+
 from ..aws.iam import role as role_lib
 
 from .exceptions import FileDoesNotExist
@@ -17,9 +19,18 @@ from .exceptions import WaitTimedOut
 
 from . import policies as policy_jobs
 
+from . import iaminventory
+from . import propagation
 from . import utils
 
 
+# The actions ``apply()`` takes (besides fetching the IAM inventory).
+APPLY_ACTIONS = [
+    "iam:CreateRole",
+    "iam:UpdateAssumeRolePolicy",
+    ]
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -180,6 +191,8 @@ def create(profile, name, filepath=None, contents=None):
     elif contents:
         params["contents"] = contents
     response = utils.do_request(role_lib, "create", params)
+    iaminventory.invalidate(profile)
+    propagation.mark(propagation.ROLE, name)
 
     # Check that it exists.
     role_data = polling_fetch(profile, name)
@@ -213,6 +226,7 @@ def delete(profile, name):
     params["profile"] = profile
     params["role"] = name
     response = utils.do_request(role_lib, "delete", params)
+    iaminventory.invalidate(profile)
 
     # Check that it was, in fact, deleted.
     if exists(profile, name):
@@ -258,6 +272,8 @@ def attach(profile, role, policy):
     params["role"] = role
     params["policy"] = policy_arn
     utils.do_request(role_lib, "attach_policy", params)
+    iaminventory.invalidate(profile)
+    propagation.mark(propagation.ROLE, role)
 
 
 def detach(profile, role, policy):
@@ -298,3 +314,64 @@ def detach(profile, role, policy):
     params["role"] = role
     params["policy"] = policy_arn
     utils.do_request(role_lib, "detach_policy", params)
+    iaminventory.invalidate(profile)
+
+
+def apply(profile, name, filepath=None, contents=None):
+    """Create a role, or update its trust policy, but only if it has changed.
+
+    The role is looked up in the (shared) IAM inventory. If its
+    trust policy says the same thing (in any order), nothing is done,
+    so there's nothing for IAM to spread either. Otherwise, the
+    inventory is patched with the change, rather than refetched.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the role.
+
+        filepath
+            The path to a trust policy file. If you provide this,
+            leave the ``contents`` parameter blank.
+
+        contents
+            The trust policy (a dict, or a JSON string). If you provide
+            this, leave the ``filepath`` parameter blank.
+
+    Returns:
+        ``policies.CREATED``, ``policies.UPDATED`` or
+        ``policies.UNCHANGED``.
+
+    """
+    document = policy_jobs.read_document(filepath, contents)
+
+    inventory = iaminventory.get(profile)
+    record = iaminventory.find(inventory, iaminventory.ROLE, name)
+    if not record:
+        params = {}
+        params["profile"] = profile
+        params["name"] = name
+        params["contents"] = document
+        response = utils.do_request(role_lib, "create", params)
+        record = utils.get_data("Role", response)
+        record["AssumeRolePolicyDocument"] = document
+        iaminventory.add(profile, iaminventory.ROLE, record)
+        propagation.mark(propagation.ROLE, name)
+        return policy_jobs.CREATED
+
+    current = record.get("AssumeRolePolicyDocument")
+    if current and policy_jobs.get_digest(current) \
+            == policy_jobs.get_digest(document):
+        return policy_jobs.UNCHANGED
+
+    params = {}
+    params["profile"] = profile
+    params["role"] = name
+    params["contents"] = document
+    utils.do_request(role_lib, "update_trust_policy", params)
+    record["AssumeRolePolicyDocument"] = document
+    propagation.mark(propagation.ROLE, name)
+    return policy_jobs.UPDATED
@@ -2,9 +2,25 @@
 
 """Jobs for S3 buckets."""
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import threading
+import weakref
+
+from time import sleep
+
+from botocore.exceptions import BotoCoreError
+from botocore.exceptions import ClientError
+
 from ..aws.s3 import bucket
 
+from .exceptions import AwsError
+from .exceptions import MissingKey
+from .exceptions import Non200Response
+from .exceptions import PermissionDenied
 from .exceptions import WaitTimedOut
+from .exceptions import WrongRegion
 from .exceptions import ResourceAlreadyExists
 from .exceptions import ResourceDoesNotExist
 from .exceptions import ResourceNotCreated
@@ -13,6 +29,22 @@ from .exceptions import ResourceNotDeleted
 from . import utils
 
 
+# How many buckets to probe at once.
+MAX_WORKERS = 16
+
+# The errors that mean a probe failed (rather than a bug).
+PROBE_ERRORS = (AwsError, MissingKey, Non200Response, BotoCoreError,
+                ClientError)
+
+
+_lock = threading.Lock()
+"""A lock to guard the bucket cache."""
+
+
+_buckets = weakref.WeakKeyDictionary()
+"""Buckets confirmed to exist, stored as {profile: {name: record}}."""
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -47,6 +79,210 @@ def fetch_all(profile):
     return data
 
 
+def locate(profile, name):
+    """Probe a bucket for its region, turning failures into errors.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the bucket.
+
+    Returns:
+        A (region, error) tuple. One of them is None.
+
+    """
+    try:
+        info = probe(profile, name)
+    except PROBE_ERRORS as error:
+        return None, error
+    if info["Status"] == "forbidden":
+        msg = "You don't have permission to get at it."
+        return None, PermissionDenied(msg)
+    if info["Status"] == "missing" or not info["Region"]:
+        return None, ResourceDoesNotExist("It no longer exists.")
+    return info["Region"], None
+
+
+def fetch_by_region(profile, regions=None, max_workers=None):
+    """Fetch all S3 buckets, along with the regions they live in.
+
+    Buckets are listed once (the list is the same in every region),
+    and then probed at the same time to find their regions.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        regions
+            A list of region names. If given, only buckets in
+            these regions are returned.
+
+        max_workers
+            How many buckets to probe at once.
+
+    Returns:
+        A tuple of a list of (region, bucket) pairs, sorted by
+        region, and an OrderedDict of {name: error} for the buckets
+        whose region couldn't be found (e.g., you don't have
+        permission, or they were just deleted).
+
+    """
+    records = fetch_all(profile)
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        located = list(executor.map(
+            lambda x: locate(profile, x["Name"]),
+            records))
+    result = []
+    errors = OrderedDict()
+    for record, (region, error) in zip(records, located):
+        if error:
+            errors[record["Name"]] = error
+        elif not regions or region in regions:
+            result.append((region, record))
+    result.sort(key=lambda x: x[0])
+    return result, errors
+
+
+def probe_error_handler(error):
+    """Handle errors that arise when you probe a bucket.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceDoesNotExist`` if there's no such bucket,
+        ``PermissionDenied`` if it belongs to someone else (or you
+        can't get at it), and ``WrongRegion`` (with the region) if
+        it lives in another region.
+
+    Returns:
+        None, if the error is not worth handling.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code in ["404", "NoSuchBucket"]:
+        raise ResourceDoesNotExist()
+    elif code in ["403", "AccessDenied"]:
+        raise PermissionDenied()
+    elif code in ["301", "PermanentRedirect"]:
+        headers = error.response["ResponseMetadata"].get("HTTPHeaders", {})
+        raise WrongRegion(headers.get("x-amz-bucket-region"))
+    else:
+        raise error
+
+
+def get_cached(profile, name):
+    """Get a bucket from the cache of confirmed buckets.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the bucket.
+
+    Returns:
+        The bucket's record, or None if it isn't cached.
+
+    """
+    if not profile:
+        return None
+    with _lock:
+        return _buckets.get(profile, {}).get(name)
+
+
+def forget(profile, name):
+    """Drop a bucket from the cache of confirmed buckets.
+
+    Call this when a bucket is deleted, or turns out to be gone.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the bucket.
+
+    """
+    if not profile:
+        return
+    with _lock:
+        _buckets.get(profile, {}).pop(name, None)
+
+
+def probe(profile, name, cache=True):
+    """Find out if a bucket exists, and if you can get at it.
+
+    This sends a single ``head_bucket`` request, rather than listing
+    every bucket in the account. Buckets that turn out to exist are
+    cached (along with their region) for the life of the process,
+    so asking again costs nothing.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the bucket.
+
+        cache
+            If False, always ask AWS, and don't cache the answer.
+
+    Returns:
+        A {"Name": name, "Status": status, "Region": region} record,
+        where the status is one of:
+
+            - "ok": it exists and you can get at it.
+            - "moved": it exists, but in another region.
+            - "forbidden": it exists, but belongs to someone else
+              (or you don't have permission to get at it).
+            - "missing": there's no such bucket.
+
+    """
+    record = get_cached(profile, name) if cache else None
+    if record:
+        return record
+
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = name
+    record = {"Name": name, "Status": "ok", "Region": None}
+    try:
+        response = utils.do_request(
+            bucket,
+            "details",
+            params,
+            error_handler=probe_error_handler)
+        headers = response["ResponseMetadata"].get("HTTPHeaders", {})
+        record["Region"] = headers.get("x-amz-bucket-region")
+    except WrongRegion as error:
+        record["Status"] = "moved"
+        record["Region"] = error.args[0] if error.args else None
+    except PermissionDenied:
+        record["Status"] = "forbidden"
+        return record
+    except ResourceDoesNotExist:
+        record["Status"] = "missing"
+        return record
+
+    # Remember the buckets that turned out to exist.
+    if profile and cache:
+        with _lock:
+            _buckets.setdefault(profile, {})[name] = record
+    return record
+
+
 def fetch_by_name(profile, name):
     """Fetch a bucket by name.
 
@@ -59,11 +295,15 @@ def fetch_by_name(profile, name):
             The name of the bucket you want to fetch.
 
     Returns:
-        A list of buckets with the provided name.
+        A list with the bucket's {"Name": name, "Status": status,
+        "Region": region} record, or an empty list if there is no
+        such bucket you can get at.
 
     """
-    buckets = fetch_all(profile)
-    return [x for x in buckets if x["Name"] == name]
+    record = probe(profile, name)
+    if record["Status"] in ["ok", "moved"]:
+        return [record]
+    return []
 
 
 def fetch_beanstalk_bucket(profile):
@@ -162,8 +402,9 @@ def create(profile, name, private=None):
         The newly created bucket's name.
 
     """
-    # Make sure the bucket doesn't already exist.
-    if exists(profile, name):
+    # Make sure the bucket doesn't already exist. Bucket names are
+    # global, so one that belongs to someone else is taken too.
+    if probe(profile, name)["Status"] != "missing":
         msg = "The bucket '" + str(name) + "' already exists."
         raise ResourceAlreadyExists(msg)
     
@@ -213,9 +454,16 @@ def delete(profile, name):
     params["profile"] = profile
     params["bucket"] = name
     response = utils.do_request(bucket, "delete", params)
+    forget(profile, name)
 
-    # Check that it was, in fact, deleted.
-    s3_bucket = fetch_by_name(profile, name)
-    if s3_bucket:
-        msg = "Bucket '" + str(name) + "' was not deleted."
+    # Check that it was, in fact, deleted. S3 can still answer
+    # for it for a moment, so ask (uncached) until it's gone.
+    def is_gone():
+        record = probe(profile, name, cache=False)
+        return record["Status"] not in ["ok", "moved"]
+
+    msg = "Bucket '" + str(name) + "' was not deleted."
+    try:
+        utils.poll(is_gone, msg=msg)
+    except WaitTimedOut:
         raise ResourceNotDeleted(msg)
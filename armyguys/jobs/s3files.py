@@ -2,8 +2,14 @@
 
 """Jobs for S3 files."""
 
+import hashlib
 import os
 
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from time import sleep
+
 from ..aws.s3 import file as s3file
 
 from .exceptions import FileDoesNotExist
@@ -15,10 +21,20 @@ from .exceptions import ResourceNotCreated
 from .exceptions import ResourceNotDeleted
 from .exceptions import WaitTimedOut
 
+from . import compression
+from . import manifests
 from . import s3buckets
+from . import s3transfers
 from . import utils
 
 
+# S3 deletes at most this many files per ``delete_objects`` request.
+DELETE_BATCH_SIZE = 1000
+
+# How many ``delete_objects`` requests to send at the same time.
+DELETE_WORKERS = 4
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -28,14 +44,103 @@ def get_display_name(record):
             A record returned by AWS.
 
     Returns:
-        A display name for the bucket.
+        A display name for the file (or common prefix).
 
     """
+    if "Prefix" in record:
+        return record["Prefix"]
     return record["Key"]
 
 
-def fetch_all(profile, bucket):
-    """Fetch all files in an S3 bucket.
+def get_etag(record):
+    """Get the ETag from a record, without the surrounding quotes.
+
+    Args:
+
+        record
+            A record returned by AWS.
+
+    Returns:
+        The ETag of the file.
+
+    """
+    return record["ETag"].strip('"')
+
+
+def get_md5(filepath=None, contents=None, chunk_size=1024 * 1024):
+    """Get the MD5 hex digest of a local file or some contents.
+
+    Note:
+        For files uploaded with a single ``put_object`` request,
+        S3 uses this digest as the file's ETag. Digests of files
+        are remembered in the manifest, so unchanged files
+        aren't read again.
+
+    Args:
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The contents of a file. If you provide this, leave
+            the ``filepath`` parameter blank.
+
+        chunk_size
+            How many bytes to read from the file at a time.
+
+    Returns:
+        The MD5 hex digest.
+
+    """
+    digest = hashlib.md5()
+    if filepath:
+        def read():
+            with open(filepath, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(chunk)
+            return digest.hexdigest()
+        return manifests.get_hash(filepath, "md5", read)
+    elif contents:
+        if not isinstance(contents, bytes):
+            contents = str(contents).encode("utf-8")
+        digest.update(contents)
+    return digest.hexdigest()
+
+
+def list_error_handler(error):
+    """Handle errors that arise when you list files.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceDoesNotExist`` if the bucket doesn't exist.
+
+    Returns:
+        None, if the error is not worth handling.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code == "NoSuchBucket":
+        raise ResourceDoesNotExist()
+    else:
+        raise error
+
+
+def stream(
+        profile,
+        bucket,
+        prefix=None,
+        delimiter=None,
+        start_after=None):
+    """Stream the files in an S3 bucket, one page at a time.
+
+    This is a generator. It only fetches the next page (of up to
+    1000 keys) once the previous page has been consumed, so it
+    runs in constant memory no matter how big the bucket is.
 
     Args:
 
@@ -45,20 +150,69 @@ def fetch_all(profile, bucket):
         bucket
             The name of the bucket you want to fetch files from.
 
+        prefix
+            Only list files whose keys begin with this.
+
+        delimiter
+            Roll keys up to the next occurrence of this (after the
+            prefix). For instance, use "/" to list a "directory".
+            The rolled up keys are yielded as {"Prefix": prefix}.
+
+        start_after
+            Only list keys that come after this one.
+
     Returns:
-        A list of S3 files.
+        A generator of S3 file records.
 
     """
-    if not s3buckets.exists(profile, bucket):
-        msg = "No bucket '" + str(bucket) + "'."
-        raise ResourceDoesNotExist(msg)
-
     params = {}
     params["profile"] = profile
     params["bucket"] = bucket
-    response = utils.do_request(s3file, "get", params)
-    data = utils.get_data("Contents", response)
-    return data
+    params["prefix"] = prefix
+    params["delimiter"] = delimiter
+    params["start_after"] = start_after
+    while True:
+        try:
+            response = utils.do_request(
+                s3file,
+                "get_page",
+                params,
+                error_handler=list_error_handler)
+        except ResourceDoesNotExist:
+            s3buckets.forget(profile, bucket)
+            msg = "No bucket '" + str(bucket) + "'."
+            raise ResourceDoesNotExist(msg)
+        for record in response.get("CommonPrefixes", []):
+            yield record
+        for record in response.get("Contents", []):
+            yield record
+        if not response.get("IsTruncated"):
+            break
+        params["continuation_token"] = response["NextContinuationToken"]
+
+
+def fetch_all(profile, bucket, prefix=None, delimiter=None):
+    """Fetch all files in an S3 bucket.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to fetch files from.
+
+        prefix
+            Only fetch files whose keys begin with this.
+
+        delimiter
+            Roll keys up to the next occurrence of this.
+
+    Returns:
+        A list of S3 files (empty if the bucket is empty).
+
+    """
+    return list(stream(profile, bucket, prefix, delimiter))
 
 
 def fetch_by_name(profile, bucket, name):
@@ -157,8 +311,280 @@ def polling_fetch(profile, bucket, name, max_attempts=10, wait_interval=1):
     return data
 
 
-def create(profile, bucket, name, filepath=None, contents=None):
-    """Create an S3 bucket.
+def details_error_handler(error):
+    """Handle errors that arise when you get a file's metadata.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceDoesNotExist`` if the file (or its bucket) is missing.
+
+    Returns:
+        None, if the error is not worth handling.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code in ["404", "NoSuchKey", "NoSuchBucket"]:
+        raise ResourceDoesNotExist()
+    else:
+        raise error
+
+
+def fetch_etag(profile, bucket, name):
+    """Fetch the ETag of a file with a single ``HEAD`` request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        name
+            The name of the file.
+
+    Returns:
+        The file's ETag, or None if there is no such file.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = name
+    try:
+        response = utils.do_request(
+            s3file,
+            "details",
+            params,
+            error_handler=details_error_handler)
+    except ResourceDoesNotExist:
+        return None
+    return get_etag(response)
+
+
+def is_match(etag, filepath=None, contents=None, part_size=None):
+    """Check if an ETag from S3 matches a local file or some contents.
+
+    Args:
+
+        etag
+            The ETag of a file in S3.
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The contents of a file. If you provide this, leave
+            the ``filepath`` parameter blank.
+
+        part_size
+            The part size used for multipart uploads.
+
+    Returns:
+        True if they match, False if not.
+
+    """
+    if not etag:
+        return False
+    if "-" in etag:
+        if not filepath:
+            return False
+        local_etag = s3transfers.get_multipart_etag(filepath, part_size)
+    else:
+        local_etag = get_md5(filepath=filepath, contents=contents)
+    return etag == local_etag
+
+
+def put(
+        profile,
+        bucket,
+        name,
+        filepath=None,
+        contents=None,
+        part_size=None,
+        max_workers=None,
+        callback=None,
+        content_encoding=None,
+        metadata=None):
+    """Send a file to S3, in parts if it's big.
+
+    Files at least ``s3transfers.MULTIPART_THRESHOLD`` bytes big are
+    uploaded in parts, several at a time. Everything else goes up
+    with a single ``put_object`` request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to put the file in.
+
+        name
+            The name you want to give to the file.
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The contents of a file. If you provide this, leave
+            the ``filepath`` parameter blank.
+
+        part_size
+            The size of each part (in bytes) for multipart uploads.
+
+        max_workers
+            How many parts to upload at the same time.
+
+        callback
+            A function to call with the number of bytes sent
+            as the upload progresses.
+
+        content_encoding
+            How the file is compressed, e.g., "gzip".
+
+        metadata
+            A dict of metadata to store with the file.
+
+    Returns:
+        The response returned by AWS, including the file's ETag.
+
+    """
+    if filepath:
+        size = os.path.getsize(filepath)
+        if size >= s3transfers.MULTIPART_THRESHOLD:
+            return s3transfers.upload(
+                profile,
+                bucket,
+                name,
+                filepath,
+                part_size=part_size,
+                max_workers=max_workers,
+                callback=callback,
+                content_encoding=content_encoding,
+                metadata=metadata)
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = name
+    params["content_encoding"] = content_encoding
+    params["metadata"] = metadata
+    if filepath:
+        params["filepath"] = filepath
+    elif contents:
+        params["contents"] = contents
+    response = utils.do_request(s3file, "create", params)
+    if callback:
+        if filepath:
+            callback(size)
+        else:
+            callback(len(contents))
+    return response
+
+
+def upload(
+        profile,
+        bucket,
+        name,
+        filepath=None,
+        contents=None,
+        part_size=None,
+        max_workers=None,
+        callback=None):
+    """Upload a file to S3, but only if its contents changed.
+
+    Note:
+        Unlike ``create()``, this doesn't check that the bucket exists
+        or poll S3 afterwards. It compares the local MD5 with the
+        file's ETag (one ``HEAD`` request), and if they differ, it
+        uploads the file and takes the ``put_object`` response as
+        confirmation that the file exists.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to put the file in.
+
+        name
+            The name you want to give to the file.
+
+        filepath
+            The path to a file. If you provide this, leave
+            the ``contents`` parameter blank.
+
+        contents
+            The contents of a file. If you provide this, leave
+            the ``filepath`` parameter blank.
+
+        part_size
+            The size of each part (in bytes) for multipart uploads.
+
+        max_workers
+            How many parts to upload at the same time.
+
+        callback
+            A function to call with the number of bytes sent
+            as the upload progresses.
+
+    Returns:
+        A list with one {"Key": name, "ETag": etag, "Uploaded": bool}
+        record. ``Uploaded`` is False if the upload was skipped.
+
+    """
+    # Make sure only contents or a filepath are specified.
+    if all([filepath, contents]) or not any([filepath, contents]):
+        msg = "Provide either a file path or its contents, but not both."
+        raise ImproperlyConfigured(msg)
+
+    # Make sure the file exists, if a filepath was specified.
+    if filepath:
+        if not os.path.isfile(filepath):
+            msg = "No such file '" + str(filepath) + "'."
+            raise FileDoesNotExist(msg)
+
+    # If S3 already has these contents, there's nothing to do.
+    etag = fetch_etag(profile, bucket, name)
+    if is_match(etag, filepath, contents, part_size):
+        return [{"Key": name, "ETag": etag, "Uploaded": False}]
+
+    # Otherwise, upload it.
+    response = put(
+        profile,
+        bucket,
+        name,
+        filepath=filepath,
+        contents=contents,
+        part_size=part_size,
+        max_workers=max_workers,
+        callback=callback)
+    if not response:
+        msg = "File '" + str(name) + "' not created."
+        raise ResourceNotCreated(msg)
+
+    # Send back the file's data.
+    return [{"Key": name, "ETag": get_etag(response), "Uploaded": True}]
+
+
+def create(
+        profile,
+        bucket,
+        name,
+        filepath=None,
+        contents=None,
+        part_size=None,
+        max_workers=None,
+        callback=None,
+        compress=None):
+    """Create an S3 file.
 
     Args:
 
@@ -179,6 +605,22 @@ def create(profile, bucket, name, filepath=None, contents=None):
             The contents of a file. If you provide this, leave
             the ``filepath`` parameter blank.
 
+        part_size
+            The size of each part (in bytes) for multipart uploads.
+
+        max_workers
+            How many parts to upload at the same time.
+
+        callback
+            A function to call with the number of bytes sent
+            as the upload progresses.
+
+        compress
+            An encoding ("gzip" or "zstd") to compress the file with
+            before it's sent. The original's MD5 and size are stored
+            in the file's metadata, and ``download()`` decompresses
+            it again.
+
     Returns:
         Info about the newly created file.
 
@@ -199,16 +641,48 @@ def create(profile, bucket, name, filepath=None, contents=None):
             msg = "No such file '" + str(filepath) + "'."
             raise FileDoesNotExist(msg)
 
+    # Compress it, if asked to.
+    tmp_filepath = None
+    metadata = None
+    if compress:
+        if filepath:
+            size = os.path.getsize(filepath)
+            tmp_filepath, md5 = compression.compress_file(filepath, compress)
+            filepath = tmp_filepath
+            compressed_size = os.path.getsize(filepath)
+        else:
+            if not isinstance(contents, bytes):
+                contents = str(contents).encode("utf-8")
+            size = len(contents)
+            md5 = get_md5(contents=contents)
+            contents = compression.compress(contents, compress)
+            compressed_size = len(contents)
+        metadata = {"uncompressed-md5": md5, "uncompressed-size": str(size)}
+
+        # Report progress in terms of the original size.
+        if callback and compressed_size:
+            report = callback
+            ratio = size / compressed_size
+
+            def callback(count):
+                report(int(count * ratio))
+
     # Now we can create it.
-    params = {}
-    params["profile"] = profile
-    params["bucket"] = bucket
-    params["key"] = name
-    if filepath:
-        params["filepath"] = filepath
-    elif contents:
-        params["contents"] = contents
-    response = utils.do_request(s3file, "create", params)
+    try:
+        response = put(
+            profile,
+            bucket,
+            name,
+            filepath=filepath,
+            contents=contents,
+            part_size=part_size,
+            max_workers=max_workers,
+            callback=callback,
+            content_encoding=compress,
+            metadata=metadata)
+    finally:
+        if tmp_filepath:
+            os.remove(tmp_filepath)
 
     # Now check that it exists.
     file_data = None
@@ -225,6 +699,298 @@ def create(profile, bucket, name, filepath=None, contents=None):
     return file_data
 
 
+def fetch_details(profile, bucket, name, part_number=None):
+    """Fetch a file's metadata with a single ``HEAD`` request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        name
+            The name of the file.
+
+        part_number
+            For files uploaded in parts, the number of a part
+            to get the size of.
+
+    Raises:
+        ``ResourceDoesNotExist`` if there is no such file.
+
+    Returns:
+        The response returned by AWS, with the file's
+        ContentLength, ETag, and so on.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = name
+    if part_number:
+        params["part_number"] = part_number
+    try:
+        response = utils.do_request(
+            s3file,
+            "details",
+            params,
+            error_handler=details_error_handler)
+    except ResourceDoesNotExist:
+        msg = "No file '" + str(name) + "' in bucket '" + str(bucket) + "'."
+        raise ResourceDoesNotExist(msg)
+    return response
+
+
+def is_verifiable(record):
+    """Check if a file's ETag is a checksum of its contents.
+
+    Note:
+        Files encrypted with KMS or a customer key have ETags that
+        aren't checksums, so they can't be checked that way.
+
+    Args:
+
+        record
+            The file's metadata, from ``fetch_details()``.
+
+    Returns:
+        True if the ETag can be compared with a local file.
+
+    """
+    if record.get("ServerSideEncryption") == "aws:kms":
+        return False
+    if record.get("SSECustomerAlgorithm"):
+        return False
+    return True
+
+
+def verify(profile, bucket, name, filepath, record):
+    """Check that a downloaded file matches the file in S3.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        name
+            The name of the file in S3.
+
+        filepath
+            The path to the downloaded file.
+
+        record
+            The file's metadata, from ``fetch_details()``.
+
+    Returns:
+        True if the size and ETag match, False if not.
+
+    """
+    if os.path.getsize(filepath) != record["ContentLength"]:
+        return False
+    if not is_verifiable(record):
+        return True
+    etag = get_etag(record)
+    part_size = None
+    if "-" in etag:
+        # The first part's size is the size the file was uploaded with.
+        part = fetch_details(profile, bucket, name, part_number=1)
+        part_size = part["ContentLength"]
+    return is_match(etag, filepath=filepath, part_size=part_size)
+
+
+def copy_to(profile, bucket, name, f, callback=None, decode=True):
+    """Stream a file from S3 into a file object, one chunk at a time.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        name
+            The name of the file.
+
+        f
+            A file object (e.g., ``sys.stdout.buffer``) to write to.
+
+        callback
+            A function to call with the number of bytes received,
+            after each chunk.
+
+        decode
+            Decompress the file on the way through, if it's
+            compressed? If not, the raw bytes are written.
+
+    Raises:
+        ``ResourceNotCreated`` if the file can't be decompressed
+        (e.g., it's corrupt or truncated).
+
+    Returns:
+        The number of bytes received.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = name
+    try:
+        response = utils.do_request(
+            s3file,
+            "download",
+            params,
+            error_handler=details_error_handler)
+    except ResourceDoesNotExist:
+        msg = "No file '" + str(name) + "' in bucket '" + str(bucket) + "'."
+        raise ResourceDoesNotExist(msg)
+    body = utils.get_data("Body", response)
+    decompressor = None
+    if decode and compression.is_encoded(response):
+        decompressor = compression.get_decompressor(
+            response["ContentEncoding"])
+    count = 0
+    chunk_size = s3transfers.READ_CHUNK_SIZE
+    try:
+        for chunk in iter(lambda: body.read(chunk_size), b""):
+            received = len(chunk)
+            count += received
+            if decompressor:
+                chunk = decompressor.decompress(chunk)
+            f.write(chunk)
+            if callback:
+                callback(received)
+        if decompressor:
+            f.write(compression.finish(decompressor))
+    except compression.ERRORS as error:
+        msg = "Couldn't decompress '" + str(name) + "': " + str(error)
+        raise ResourceNotCreated(msg)
+    return count
+
+
+def download(
+        profile,
+        bucket,
+        name,
+        filepath,
+        part_size=None,
+        max_workers=None,
+        callback=None,
+        record=None):
+    """Download a file from S3, and check it arrived intact.
+
+    Files at least ``s3transfers.MULTIPART_THRESHOLD`` bytes big are
+    downloaded in byte ranges, several at a time. Everything else
+    comes down with a single request. Compressed files are checked,
+    then decompressed into ``filepath``.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        name
+            The name of the file.
+
+        filepath
+            The path to save the file to.
+
+        part_size
+            The size of each range (in bytes) for large files.
+
+        max_workers
+            How many ranges to download at the same time.
+
+        callback
+            A function to call with the number of (compressed)
+            bytes received as the download progresses.
+
+        record
+            The file's metadata, from ``fetch_details()``, if you
+            already have it. If not, it's fetched.
+
+    Raises:
+        ``ResourceNotCreated`` if the file doesn't match its size
+        or ETag in S3.
+
+    Returns:
+        The file's metadata, from ``fetch_details()``.
+
+    """
+    if not record:
+        record = fetch_details(profile, bucket, name)
+    size = record["ContentLength"]
+
+    # Compressed files are downloaded next to the destination first.
+    encoding = None
+    raw_filepath = filepath
+    if compression.is_encoded(record):
+        encoding = record["ContentEncoding"]
+        raw_filepath = filepath + "." + encoding
+
+    if size >= s3transfers.MULTIPART_THRESHOLD:
+        s3transfers.download(
+            profile,
+            bucket,
+            name,
+            raw_filepath,
+            size,
+            etag=record["ETag"],
+            part_size=part_size,
+            max_workers=max_workers,
+            callback=callback)
+    else:
+        # Download into a temporary file, so a failed download
+        # never leaves a truncated file at the destination.
+        tmp_filepath = raw_filepath + ".download"
+        try:
+            with open(tmp_filepath, "wb") as f:
+                copy_to(
+                    profile,
+                    bucket,
+                    name,
+                    f,
+                    callback=callback,
+                    decode=False)
+            os.replace(tmp_filepath, raw_filepath)
+        except Exception:
+            if os.path.exists(tmp_filepath):
+                os.remove(tmp_filepath)
+            raise
+
+    if not verify(profile, bucket, name, raw_filepath, record):
+        os.remove(raw_filepath)
+        msg = "The download of '" + str(name) + "' was corrupted."
+        raise ResourceNotCreated(msg)
+
+    # Decompress it, and check it against the original's MD5.
+    if encoding:
+        try:
+            compression.decompress_file(raw_filepath, filepath, encoding)
+        except Exception as error:
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            msg = "Couldn't decompress '" + str(name) + "': " + str(error)
+            raise ResourceNotCreated(msg)
+        finally:
+            os.remove(raw_filepath)
+        md5 = record.get("Metadata", {}).get("uncompressed-md5")
+        if md5 and md5 != get_md5(filepath=filepath):
+            os.remove(filepath)
+            msg = "The download of '" + str(name) + "' was corrupted."
+            raise ResourceNotCreated(msg)
+
+    return record
+
+
 def delete(profile, bucket, name):
     """Delete an S3 file.
 
@@ -261,3 +1027,115 @@ def delete(profile, bucket, name):
     if exists(profile, bucket, name):
         msg = "The file '" + str(name) + "' was not deleted."
         raise ResourceNotDeleted(msg)
+
+
+def delete_batch(profile, bucket, keys):
+    """Delete a batch of up to 1000 files with one request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to delete the files from.
+
+        keys
+            A list of the names of the files you want to delete.
+
+    Returns:
+        A dict with {"Deleted": count, "Errors": [errors]}, where
+        each error is a {"Key": key, "Code": code, "Message": message}.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["keys"] = keys
+    try:
+        response = utils.do_request(
+            s3file,
+            "delete_many",
+            params,
+            error_handler=list_error_handler)
+    except ResourceDoesNotExist:
+        s3buckets.forget(profile, bucket)
+        msg = "No bucket '" + str(bucket) + "'."
+        raise ResourceDoesNotExist(msg)
+    errors = response.get("Errors", [])
+    return {"Deleted": len(keys) - len(errors), "Errors": errors}
+
+
+def delete_many(profile, bucket, keys, max_workers=None):
+    """Delete many files, 1000 per request, several requests at a time.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to delete the files from.
+
+        keys
+            An iterable of the names of the files to delete. It can be
+            a generator, and only a few batches are held at a time.
+
+        max_workers
+            How many ``delete_objects`` requests to send at once.
+
+    Returns:
+        A dict with {"Deleted": count, "Errors": [errors]}, where
+        each error is a {"Key": key, "Code": code, "Message": message}.
+
+    """
+    if not max_workers:
+        max_workers = DELETE_WORKERS
+    result = {"Deleted": 0, "Errors": []}
+
+    def collect(futures):
+        for future in futures:
+            batch_result = future.result()
+            result["Deleted"] += batch_result["Deleted"]
+            result["Errors"].extend(batch_result["Errors"])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for batch in utils.chunks(keys, DELETE_BATCH_SIZE):
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            pending.add(executor.submit(delete_batch, profile, bucket, batch))
+        done, pending = wait(pending)
+        collect(done)
+    return result
+
+
+def delete_all(profile, bucket, prefix=None, max_workers=None):
+    """Delete every file in a bucket (or under a prefix).
+
+    Note:
+        This deletes the current version of each file. It doesn't
+        purge old versions from buckets with versioning turned on.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket you want to empty.
+
+        prefix
+            Only delete files whose names begin with this.
+
+        max_workers
+            How many ``delete_objects`` requests to send at once.
+
+    Returns:
+        A dict with {"Deleted": count, "Errors": [errors]}.
+
+    """
+    records = stream(profile, bucket, prefix=prefix)
+    keys = (x["Key"] for x in records)
+    return delete_many(profile, bucket, keys, max_workers=max_workers)
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for syncing local directories to S3."""
+
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+
+from .exceptions import FileDoesNotExist
+
+from . import manifests
+from . import s3files
+
+
+# How many files to upload at the same time.
+MAX_WORKERS = 8
+
+
+def get_prefix(prefix):
+    """Normalize a key prefix so it names a "directory" in S3.
+
+    Args:
+
+        prefix
+            A key prefix, e.g., "builds/v2", or None.
+
+    Returns:
+        The prefix with a trailing slash, e.g., "builds/v2/",
+        or an empty string if there's no prefix.
+
+    """
+    if not prefix:
+        return ""
+    prefix = prefix.strip("/")
+    if not prefix:
+        return ""
+    return prefix + "/"
+
+
+def scan(local_dir, prefix=None):
+    """Scan a local directory for files to sync.
+
+    Args:
+
+        local_dir
+            The path to the directory.
+
+        prefix
+            The key prefix the directory maps to in S3.
+
+    Returns:
+        A list of {"Key": key, "Path": path, "Size": size,
+        "Mtime": mtime} entries, sorted the same way S3 sorts keys.
+
+    """
+    prefix = get_prefix(prefix)
+    result = []
+    for root, dirs, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            if not os.path.isfile(path):
+                continue
+            relpath = os.path.relpath(path, local_dir)
+            key = prefix + relpath.replace(os.sep, "/")
+            stat = os.stat(path)
+            result.append({
+                "Key": key,
+                "Path": path,
+                "Size": stat.st_size,
+                "Mtime": stat.st_mtime,
+                })
+    result.sort(key=lambda x: x["Key"].encode("utf-8"))
+    return result
+
+
+def is_changed(local, remote):
+    """Check if a local file differs from its copy in S3.
+
+    The cheap checks come first: if the sizes differ, the file
+    changed. If the local file is no newer than the copy in S3,
+    it's assumed to be unchanged. Only if neither settles it is the
+    local file hashed and compared with the ETag.
+
+    Args:
+
+        local
+            A local file entry returned by ``scan()``.
+
+        remote
+            An S3 file record, or None if there is no copy in S3.
+
+    Returns:
+        True if the file needs to be uploaded, False if not.
+
+    """
+    if not remote:
+        return True
+    if local["Size"] != remote["Size"]:
+        return True
+    if local["Mtime"] <= remote["LastModified"].timestamp():
+        return False
+    etag = s3files.get_etag(remote)
+    return not s3files.is_match(etag, filepath=local["Path"])
+
+
+def plan(local_files, remote_files):
+    """Work out which files to upload, skip, or delete.
+
+    Both lists are sorted by key, so they are merged in one pass.
+    The remote files can be a generator (e.g., ``s3files.stream()``),
+    and they're never all held in memory at once.
+
+    Args:
+
+        local_files
+            A list of local file entries returned by ``scan()``.
+
+        remote_files
+            An iterable of S3 file records, sorted by key.
+
+    Returns:
+        A dict with {"upload": [local entries], "skip": [local entries],
+        "delete": [keys]}.
+
+    """
+    result = {"upload": [], "skip": [], "delete": []}
+    local_iter = iter(local_files)
+    local = next(local_iter, None)
+    for remote in remote_files:
+        remote_key = remote["Key"].encode("utf-8")
+        while local and local["Key"].encode("utf-8") < remote_key:
+            result["upload"].append(local)
+            local = next(local_iter, None)
+        if local and local["Key"] == remote["Key"]:
+            if is_changed(local, remote):
+                result["upload"].append(local)
+            else:
+                result["skip"].append(local)
+            local = next(local_iter, None)
+        else:
+            result["delete"].append(remote["Key"])
+    while local:
+        result["upload"].append(local)
+        local = next(local_iter, None)
+    return result
+
+
+def sync(
+        profile,
+        local_dir,
+        bucket,
+        prefix=None,
+        delete=False,
+        max_workers=None,
+        callback=None):
+    """Sync a local directory to a prefix in an S3 bucket.
+
+    The remote prefix is listed once, and only new or changed files
+    are uploaded, several at a time.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        local_dir
+            The path to the directory to sync.
+
+        bucket
+            The name of the bucket to sync to.
+
+        prefix
+            The key prefix to sync to, e.g., "builds/v2".
+
+        delete
+            Delete files under the prefix that aren't in ``local_dir``?
+
+        max_workers
+            How many files to upload at the same time.
+
+        callback
+            A function to call with each local entry that gets uploaded.
+
+    Returns:
+        A dict with {"Uploaded": count, "UploadedBytes": bytes,
+        "Skipped": count, "SkippedBytes": bytes, "Deleted": count,
+        "Errors": [errors]}, where the errors are for files that
+        couldn't be deleted.
+
+    """
+    # Make sure the directory exists.
+    if not os.path.isdir(local_dir):
+        msg = "No such directory '" + str(local_dir) + "'."
+        raise FileDoesNotExist(msg)
+
+    # Compare the local files with what's in S3.
+    prefix = get_prefix(prefix)
+    local_files = scan(local_dir, prefix)
+    remote_files = s3files.stream(profile, bucket, prefix=prefix)
+    changes = plan(local_files, remote_files)
+    manifests.save()
+    if not delete:
+        changes["delete"] = []
+
+    # Upload the new and changed files.
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for local in changes["upload"]:
+            future = executor.submit(
+                s3files.put,
+                profile,
+                bucket,
+                local["Key"],
+                filepath=local["Path"])
+            futures[future] = local
+        for future in as_completed(futures):
+            future.result()
+            if callback:
+                callback(futures[future])
+
+    # Delete the extra files, in batches.
+    deleted = {"Deleted": 0, "Errors": []}
+    if changes["delete"]:
+        deleted = s3files.delete_many(profile, bucket, changes["delete"])
+
+    # Send back a summary.
+    return {
+        "Uploaded": len(changes["upload"]),
+        "UploadedBytes": sum(x["Size"] for x in changes["upload"]),
+        "Skipped": len(changes["skip"]),
+        "SkippedBytes": sum(x["Size"] for x in changes["skip"]),
+        "Deleted": deleted["Deleted"],
+        "Errors": deleted["Errors"],
+        }
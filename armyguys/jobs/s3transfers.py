@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for moving large files in and out of S3."""
+
+import errno
+import hashlib
+import mmap
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from time import sleep
+
+from botocore.exceptions import BotoCoreError
+
+from ..aws.s3 import file as s3file
+
+from .exceptions import AwsError
+from .exceptions import Non200Response
+from .exceptions import ResourceNotCreated
+
+from . import manifests
+from . import utils
+
+
+# Files at least this big (in bytes) are uploaded in parts.
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+
+# The default size of each part (in bytes).
+PART_SIZE = 8 * 1024 * 1024
+
+# S3 won't accept parts smaller than this (except the last one),
+# or more parts than this.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+# How many parts to upload (or download) at the same time.
+MAX_WORKERS = 8
+
+# How many bytes to read from a download stream at a time.
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def get_part_size(file_size, part_size=None):
+    """Get a part size S3 will accept for a file.
+
+    Args:
+
+        file_size
+            The size of the file, in bytes.
+
+        part_size
+            The part size you'd like to use, in bytes.
+
+    Returns:
+        The requested part size, raised to the S3 minimum if it's too
+        small, and doubled until the file fits in ``MAX_PARTS`` parts.
+
+    """
+    if not part_size:
+        part_size = PART_SIZE
+    part_size = max(part_size, MIN_PART_SIZE)
+    while part_size * MAX_PARTS < file_size:
+        part_size *= 2
+    return part_size
+
+
+def get_parts(file_size, part_size):
+    """Split a file into parts.
+
+    Args:
+
+        file_size
+            The size of the file, in bytes.
+
+        part_size
+            The size of each part, in bytes.
+
+    Returns:
+        A list of {"PartNumber": number, "Offset": offset,
+        "Length": length} entries.
+
+    """
+    parts = []
+    offset = 0
+    part_number = 1
+    while offset < file_size:
+        length = min(part_size, file_size - offset)
+        parts.append({
+            "PartNumber": part_number,
+            "Offset": offset,
+            "Length": length,
+            })
+        offset += length
+        part_number += 1
+    return parts
+
+
+def read_part(filepath, part):
+    """Read one part of a file from disk.
+
+    Args:
+
+        filepath
+            The path to the file.
+
+        part
+            A {"Offset": offset, "Length": length} entry.
+
+    Returns:
+        The bytes of the part.
+
+    """
+    with open(filepath, "rb") as f:
+        f.seek(part["Offset"])
+        return f.read(part["Length"])
+
+
+def get_multipart_etag(filepath, part_size=None):
+    """Get the ETag S3 would give a file uploaded in parts.
+
+    S3 takes the MD5 of each part, then the MD5 of all those
+    digests strung together, and appends the number of parts.
+    The ETag is remembered in the manifest, so an unchanged
+    file isn't read again.
+
+    Args:
+
+        filepath
+            The path to the file.
+
+        part_size
+            The part size the file was (or will be) uploaded with.
+
+    Returns:
+        The ETag, e.g., "9b2cf535f27731c974343645a3985328-3".
+
+    """
+    file_size = os.path.getsize(filepath)
+    part_size = get_part_size(file_size, part_size)
+
+    def read():
+        digests = b""
+        count = 0
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(part_size), b""):
+                digests += hashlib.md5(chunk).digest()
+                count += 1
+        return hashlib.md5(digests).hexdigest() + "-" + str(count)
+
+    kind = "etag-" + str(part_size)
+    return manifests.get_hash(filepath, kind, read)
+
+
+def upload_part(
+        profile,
+        bucket,
+        key,
+        upload_id,
+        filepath,
+        part,
+        max_attempts=3,
+        wait_interval=1):
+    """Upload one part of a file, retrying if it fails.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is being uploaded to.
+
+        key
+            The name of the file in S3.
+
+        upload_id
+            The ID of the multipart upload.
+
+        filepath
+            The path to the local file.
+
+        part
+            A {"PartNumber": number, "Offset": offset,
+            "Length": length} entry.
+
+        max_attempts
+            The number of times to try to upload the part.
+
+        wait_interval
+            How many seconds to wait between each attempt.
+
+    Returns:
+        A {"PartNumber": number, "ETag": etag} entry.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = key
+    params["upload_id"] = upload_id
+    params["part_number"] = part["PartNumber"]
+    count = 0
+    while True:
+        params["body"] = read_part(filepath, part)
+        try:
+            response = utils.do_request(s3file, "upload_part", params)
+            break
+        except (AwsError, Non200Response, BotoCoreError):
+            count += 1
+            if count >= max_attempts:
+                raise
+            sleep(wait_interval)
+    etag = utils.get_data("ETag", response)
+    return {"PartNumber": part["PartNumber"], "ETag": etag}
+
+
+def upload(
+        profile,
+        bucket,
+        key,
+        filepath,
+        part_size=None,
+        max_workers=None,
+        max_attempts=3,
+        wait_interval=1,
+        callback=None,
+        content_encoding=None,
+        metadata=None):
+    """Upload a file to S3 in parts, several parts at a time.
+
+    Each worker reads only its own part from disk, so the whole
+    file is never held in memory. If any part can't be uploaded,
+    the multipart upload is aborted so S3 doesn't keep the parts.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket to upload the file to.
+
+        key
+            The name to give to the file in S3.
+
+        filepath
+            The path to the local file.
+
+        part_size
+            The size of each part, in bytes.
+
+        max_workers
+            How many parts to upload at the same time.
+
+        max_attempts
+            The number of times to try to upload each part.
+
+        wait_interval
+            How many seconds to wait between each attempt.
+
+        callback
+            A function to call with the number of bytes sent,
+            each time a part finishes uploading.
+
+        content_encoding
+            How the file is compressed, e.g., "gzip".
+
+        metadata
+            A dict of metadata to store with the file.
+
+    Returns:
+        The JSON response returned by ``complete_multipart_upload``.
+
+    """
+    file_size = os.path.getsize(filepath)
+    part_size = get_part_size(file_size, part_size)
+    parts = get_parts(file_size, part_size)
+    if not max_workers:
+        max_workers = MAX_WORKERS
+
+    # Start the upload.
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = key
+    params["content_encoding"] = content_encoding
+    params["metadata"] = metadata
+    response = utils.do_request(s3file, "start_multipart_upload", params)
+    upload_id = utils.get_data("UploadId", response)
+
+    # Upload the parts. If anything goes wrong, abort.
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {}
+    uploaded_parts = []
+    try:
+        for part in parts:
+            future = executor.submit(
+                upload_part,
+                profile,
+                bucket,
+                key,
+                upload_id,
+                filepath,
+                part,
+                max_attempts,
+                wait_interval)
+            futures[future] = part
+        for future in as_completed(futures):
+            uploaded_parts.append(future.result())
+            if callback:
+                callback(futures[future]["Length"])
+    except Exception as error:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+        params = {}
+        params["profile"] = profile
+        params["bucket"] = bucket
+        params["key"] = key
+        params["upload_id"] = upload_id
+        utils.do_request(s3file, "abort_multipart_upload", params)
+        msg = "Upload of '" + str(key) + "' aborted: " + str(error)
+        raise ResourceNotCreated(msg)
+    finally:
+        executor.shutdown(wait=True)
+
+    # Stitch the parts together.
+    uploaded_parts.sort(key=lambda x: x["PartNumber"])
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = key
+    params["upload_id"] = upload_id
+    params["parts"] = uploaded_parts
+    return utils.do_request(s3file, "complete_multipart_upload", params)
+
+
+def preallocate(f, size):
+    """Reserve disk space for a file before it's written.
+
+    Reserving the space up front means a full disk fails here,
+    instead of part-way through writing to a memory map.
+
+    Args:
+
+        f
+            A file object, open for writing.
+
+        size
+            The size the file should be, in bytes.
+
+    """
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as error:
+            # Some filesystems can't reserve space. Fall back to
+            # a plain (possibly sparse) file on those.
+            if error.errno not in [errno.EINVAL, errno.EOPNOTSUPP]:
+                raise
+    f.truncate(size)
+
+
+def download_error_handler(error):
+    """Handle errors that arise when you download part of a file.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceNotCreated`` if the file changed in S3
+        since the download started.
+
+    Returns:
+        None, if the error is not worth handling.
+
+    """
+    code = error.response["Error"]["Code"]
+    if code == "PreconditionFailed":
+        msg = "The file changed in S3 during the download."
+        raise ResourceNotCreated(msg)
+    else:
+        raise error
+
+
+def read_into(body, buffer, part):
+    """Copy a part from a download stream straight into a buffer.
+
+    Args:
+
+        body
+            The stream to read the bytes from.
+
+        buffer
+            A writable buffer (e.g., a memory map) the size of the file.
+
+        part
+            A {"Offset": offset, "Length": length} entry.
+
+    Raises:
+        ``AwsError`` if the stream holds the wrong number of bytes.
+
+    """
+    position = part["Offset"]
+    end = part["Offset"] + part["Length"]
+    for chunk in iter(lambda: body.read(READ_CHUNK_SIZE), b""):
+        if position + len(chunk) > end:
+            break
+        buffer[position:position + len(chunk)] = chunk
+        position += len(chunk)
+    if position != end:
+        msg = "Got the wrong number of bytes for a part."
+        raise AwsError(msg)
+
+
+def download_part(
+        profile,
+        bucket,
+        key,
+        etag,
+        buffer,
+        part,
+        max_attempts=3,
+        wait_interval=1):
+    """Download one part of a file into a buffer, retrying if it fails.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        key
+            The name of the file in S3.
+
+        etag
+            The ETag of the file. If the file no longer has this
+            ETag, the part isn't downloaded.
+
+        buffer
+            A writable buffer (e.g., a memory map) the size of the file.
+
+        part
+            A {"PartNumber": number, "Offset": offset,
+            "Length": length} entry.
+
+        max_attempts
+            The number of times to try to download the part.
+
+        wait_interval
+            How many seconds to wait between each attempt.
+
+    Returns:
+        The part.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["bucket"] = bucket
+    params["key"] = key
+    params["byte_range"] = (
+        part["Offset"],
+        part["Offset"] + part["Length"] - 1)
+    params["etag"] = etag
+    count = 0
+    while True:
+        try:
+            response = utils.do_request(
+                s3file,
+                "download",
+                params,
+                error_handler=download_error_handler)
+            body = utils.get_data("Body", response)
+            read_into(body, buffer, part)
+            break
+        except (AwsError, Non200Response, BotoCoreError):
+            count += 1
+            if count >= max_attempts:
+                raise
+            sleep(wait_interval)
+    return part
+
+
+def download(
+        profile,
+        bucket,
+        key,
+        filepath,
+        size,
+        etag=None,
+        part_size=None,
+        max_workers=None,
+        max_attempts=3,
+        wait_interval=1,
+        callback=None):
+    """Download a file from S3 in byte ranges, several at a time.
+
+    The local file is preallocated and memory-mapped, and each worker
+    writes its range straight into the map, so the file is never held
+    in memory. The file is written under a temporary name, and only
+    renamed to ``filepath`` once every range is in.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        bucket
+            The name of the bucket the file is in.
+
+        key
+            The name of the file in S3.
+
+        filepath
+            The path to save the file to.
+
+        size
+            The size of the file, in bytes.
+
+        etag
+            The ETag of the file. Every range is fetched only if the
+            file still has this ETag, so a file that changes in S3
+            mid-download can't be stitched together from two versions.
+
+        part_size
+            The size of each range, in bytes.
+
+        max_workers
+            How many ranges to download at the same time.
+
+        max_attempts
+            The number of times to try to download each range.
+
+        wait_interval
+            How many seconds to wait between each attempt.
+
+        callback
+            A function to call with the number of bytes received,
+            each time a range finishes downloading.
+
+    Returns:
+        The path to the file.
+
+    """
+    part_size = get_part_size(size, part_size)
+    parts = get_parts(size, part_size)
+    if not max_workers:
+        max_workers = MAX_WORKERS
+
+    # Download the ranges into a temporary file. If anything
+    # goes wrong, remove it.
+    tmp_filepath = filepath + ".download"
+    try:
+        with open(tmp_filepath, "wb+") as f:
+            preallocate(f, size)
+            buffer = mmap.mmap(f.fileno(), size)
+            try:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    futures = []
+                    for part in parts:
+                        future = executor.submit(
+                            download_part,
+                            profile,
+                            bucket,
+                            key,
+                            etag,
+                            buffer,
+                            part,
+                            max_attempts,
+                            wait_interval)
+                        futures.append(future)
+                    try:
+                        for future in as_completed(futures):
+                            part = future.result()
+                            if callback:
+                                callback(part["Length"])
+                    except Exception:
+                        for future in futures:
+                            future.cancel()
+                        raise
+                buffer.flush()
+            finally:
+                buffer.close()
+        os.replace(tmp_filepath, filepath)
+    except Exception as error:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        msg = "Download of '" + str(key) + "' aborted: " + str(error)
+        raise ResourceNotCreated(msg)
+
+    return filepath
@@ -8,6 +8,7 @@ from botocore.exceptions import ClientError
 
 from ..aws import securitygroup
 
+from .exceptions import ImproperlyConfigured
 from .exceptions import ResourceAlreadyExists
 from .exceptions import ResourceDoesNotExist
 from .exceptions import ResourceHasDependency
@@ -17,9 +18,23 @@ from .exceptions import WaitTimedOut
 
 from . import utils
 
+from . import tags as tag_jobs
 from . import vpcs as vpc_jobs
 
 
+# Protocol numbers AWS may report instead of names.
+PROTOCOLS = {
+    "6": "tcp",
+    "17": "udp",
+    "1": "icmp",
+    "58": "icmpv6",
+    "all": "-1",
+    }
+
+# Protocols whose rules AWS reports with -1 ports when none are given.
+UNPORTED_PROTOCOLS = ("icmp", "icmpv6", "-1")
+
+
 def get_display_name(record):
     """Get the display name for a record.
 
@@ -50,6 +65,21 @@ def get_id(record):
     return str(record["GroupId"])
 
 
+def get_name(record):
+    """Get the name from a record.
+
+    Args:
+
+        record
+            A record returned by AWS.
+
+    Returns:
+        The name of the security group.
+
+    """
+    return str(record["GroupName"])
+
+
 def fetch_all(profile):
     """Fetch all security groups.
 
@@ -137,6 +167,35 @@ def fetch(profile, ref):
     return result
 
 
+def resolve(profile, refs):
+    """Look up many security groups at once, by name or ID.
+
+    See ``utils.resolve()``.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        refs
+            A list of names and/or IDs of security groups.
+
+    Returns:
+        An OrderedDict of {ref: record}, in the same order as
+        ``refs``. Refs that don't match anything map to None.
+
+    """
+    return utils.resolve(
+        securitygroup,
+        profile,
+        refs,
+        "sg-",
+        ("group-id", "group-name"),
+        "SecurityGroups",
+        "GroupId",
+        get_name)
+
+
 def is_security_group(profile, ref):
     """Check if a security group exists.
 
@@ -254,6 +313,7 @@ def polling_delete(profile, ref, max_attempts=10, wait_interval=1):
     params["profile"] = profile
     params["group_id"] = sg_id
     while count < max_attempts:
+        response = None
         try:
             response = utils.do_request(
                 securitygroup,
@@ -305,7 +365,7 @@ def create(profile, name, vpc=None, tags=None):
             msg = "No VPC '" + str(vpc) + "'."
             raise ResourceDoesNotExist(msg)
         else:
-            vpc = vpc_jobs.get_id(vpc_data)
+            vpc = vpc_jobs.get_id(vpc_data[0])
 
     # Make sure the security group doesn't already exist.
     if is_security_group(profile, name):
@@ -333,14 +393,7 @@ def create(profile, name, vpc=None, tags=None):
         raise ResourceNotCreated(msg)
 
     # Now tag the security group.
-    if tags:
-        for tag in tags:
-            params = {}
-            params["profile"] = profile
-            params["security_group"] = sg_id
-            params["key"] = tag["Key"]
-            params["value"] = tag["Value"]
-            utils.do_request(securitygroup, "tag", params)
+    tag_jobs.apply(profile, [(tag_jobs.EC2, sg_id)], tags)
 
     # Send back the group's info.
     return sg_data
@@ -373,3 +426,275 @@ def delete(profile, ref, vpc=None):
     if not is_deleted:
         msg = "Security group '" + str(ref) + "' not deleted."
         raise ResourceNotDeleted(msg)
+
+
+def get_protocol(protocol):
+    """Normalize a protocol, so the same protocol always looks the same.
+
+    Args:
+
+        protocol
+            A protocol, e.g., "tcp", "TCP", "6", 6, "58", "all" or -1.
+
+    Returns:
+        The protocol as AWS names it, e.g., "tcp" or "-1".
+
+    """
+    protocol = str(protocol).lower()
+    return PROTOCOLS.get(protocol, protocol)
+
+
+def get_ports(protocol, from_port, to_port):
+    """Normalize a port range.
+
+    Args:
+
+        protocol
+            A normalized protocol.
+
+        from_port
+            The first port in the range (or None).
+
+        to_port
+            The last port in the range (or None).
+
+    Returns:
+        A (from_port, to_port) tuple. Rules for all protocols
+        cover all ports, so their ports are (-1, -1). So are ICMP
+        rules with no type or code, since that's how AWS reports them.
+
+    """
+    if protocol == "-1":
+        return (-1, -1)
+    if protocol in UNPORTED_PROTOCOLS:
+        if from_port is None:
+            from_port = -1
+        if to_port is None:
+            to_port = -1
+    if from_port is not None:
+        from_port = int(from_port)
+    if to_port is not None:
+        to_port = int(to_port)
+    return (from_port, to_port)
+
+
+def normalize_permissions(permissions):
+    """Break IpPermissions from AWS down into single rules.
+
+    One IpPermission can cover many CIDR blocks and groups. This
+    splits them up, so each rule is one (protocol, from_port,
+    to_port, kind, target) tuple that can be compared with others.
+
+    Args:
+
+        permissions
+            A list of IpPermissions returned by AWS.
+
+    Returns:
+        A set of rule tuples. The kind is "cidr", "cidr6",
+        "group" or "prefix", and the target is the CIDR block,
+        group ID, or prefix list ID.
+
+    """
+    result = set()
+    for permission in permissions:
+        protocol = get_protocol(permission["IpProtocol"])
+        from_port, to_port = get_ports(
+            protocol,
+            permission.get("FromPort"),
+            permission.get("ToPort"))
+        rule = (protocol, from_port, to_port)
+        for record in permission.get("IpRanges", []):
+            result.add(rule + ("cidr", record["CidrIp"]))
+        for record in permission.get("Ipv6Ranges", []):
+            result.add(rule + ("cidr6", record["CidrIpv6"]))
+        for record in permission.get("UserIdGroupPairs", []):
+            result.add(rule + ("group", record["GroupId"]))
+        for record in permission.get("PrefixListIds", []):
+            result.add(rule + ("prefix", record["PrefixListId"]))
+    return result
+
+
+def normalize_rules(rules):
+    """Break declared rules down into single rules.
+
+    Args:
+
+        rules
+            A list of rules, each a dict like {"Protocol": "tcp",
+            "FromPort": 80, "ToPort": 80, "Cidr": "0.0.0.0/0"}.
+            "Port" can stand in for equal "FromPort" and "ToPort".
+            Instead of "Cidr" (IPv4 or IPv6), a rule can have a
+            "Group" (the ID of a source group) or a "PrefixList".
+            Any of the three can be a list.
+
+    Raises:
+        ``ImproperlyConfigured`` if a rule has no protocol or source.
+
+    Returns:
+        A set of rule tuples, like ``normalize_permissions()``.
+
+    """
+    result = set()
+    for record in rules:
+        if "Protocol" not in record:
+            msg = "Rule " + str(record) + " has no 'Protocol'."
+            raise ImproperlyConfigured(msg)
+        protocol = get_protocol(record["Protocol"])
+        from_port, to_port = get_ports(
+            protocol,
+            record.get("FromPort", record.get("Port")),
+            record.get("ToPort", record.get("Port")))
+        rule = (protocol, from_port, to_port)
+        targets = []
+        for key, kind in [("Cidr", "cidr"), ("Group", "group"),
+                          ("PrefixList", "prefix")]:
+            values = record.get(key, [])
+            if not isinstance(values, list):
+                values = [values]
+            for value in values:
+                if kind == "cidr" and ":" in value:
+                    targets.append(("cidr6", value))
+                else:
+                    targets.append((kind, value))
+        if not targets:
+            msg = "Rule " + str(record) + " has no 'Cidr', 'Group', " \
+                  + "or 'PrefixList'."
+            raise ImproperlyConfigured(msg)
+        for target in targets:
+            result.add(rule + target)
+    return result
+
+
+def to_permissions(rules):
+    """Gather single rules back up into as few IpPermissions as possible.
+
+    Args:
+
+        rules
+            A set of rule tuples.
+
+    Returns:
+        A list of IpPermissions, in the form boto3 expects.
+
+    """
+    keys = {
+        "cidr": ("IpRanges", "CidrIp"),
+        "cidr6": ("Ipv6Ranges", "CidrIpv6"),
+        "group": ("UserIdGroupPairs", "GroupId"),
+        "prefix": ("PrefixListIds", "PrefixListId"),
+        }
+    permissions = {}
+    for protocol, from_port, to_port, kind, target in sorted(
+            rules, key=lambda x: tuple(str(y) for y in x)):
+        rule = (protocol, from_port, to_port)
+        if rule not in permissions:
+            permission = {"IpProtocol": protocol}
+            if from_port is not None:
+                permission["FromPort"] = from_port
+            if to_port is not None:
+                permission["ToPort"] = to_port
+            permissions[rule] = permission
+        list_key, item_key = keys[kind]
+        items = permissions[rule].setdefault(list_key, [])
+        items.append({item_key: target})
+    return [permissions[x] for x in sorted(permissions, key=str)]
+
+
+def diff(current, desired):
+    """Work out which rules to add and which to remove.
+
+    Args:
+
+        current
+            A set of the rule tuples a group has now.
+
+        desired
+            A set of the rule tuples it should have.
+
+    Returns:
+        A dict with {"add": rules, "remove": rules}.
+
+    """
+    return {"add": desired - current, "remove": current - desired}
+
+
+def apply_rules(
+        profile,
+        ref,
+        inbound=None,
+        outbound=None,
+        prune=False,
+        record=None):
+    """Bring a security group's rules in line with a declared rule set.
+
+    The group is fetched once, its rules are compared with the
+    declared ones, and only the difference is sent: at most one
+    request to add rules and one to remove them, per direction.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        ref
+            The name or ID of the security group.
+
+        inbound
+            A list of inbound rules (see ``normalize_rules()``),
+            or None to leave the inbound rules alone.
+
+        outbound
+            A list of outbound rules, or None to leave the
+            outbound rules alone.
+
+        prune
+            Remove rules the group has that aren't declared?
+
+        record
+            The group's record, if you've already fetched it.
+
+    Returns:
+        A dict like {"Inbound": {"Added": count, "Removed": count},
+        "Outbound": {"Added": count, "Removed": count}}.
+
+    """
+    # Fetch the group.
+    if not record:
+        sg_data = fetch(profile, ref)
+        if not sg_data:
+            msg = "No security group '" + str(ref) + "'."
+            raise ResourceDoesNotExist(msg)
+        record = sg_data[0]
+    sg_id = get_id(record)
+
+    directions = [
+        ("Inbound", inbound, "IpPermissions",
+         "authorize_ingress", "revoke_ingress"),
+        ("Outbound", outbound, "IpPermissionsEgress",
+         "authorize_egress", "revoke_egress"),
+        ]
+    result = {}
+    for name, rules, key, authorize, revoke in directions:
+        result[name] = {"Added": 0, "Removed": 0}
+        if rules is None:
+            continue
+
+        # Compare what's there with what should be there.
+        current = normalize_permissions(record.get(key, []))
+        changes = diff(current, normalize_rules(rules))
+
+        # Send the changes, each kind in one batch.
+        params = {}
+        params["profile"] = profile
+        params["security_group"] = sg_id
+        if changes["add"]:
+            params["permissions"] = to_permissions(changes["add"])
+            utils.do_request(securitygroup, authorize, params)
+            result[name]["Added"] = len(changes["add"])
+        if prune and changes["remove"]:
+            params["permissions"] = to_permissions(changes["remove"])
+            utils.do_request(securitygroup, revoke, params)
+            result[name]["Removed"] = len(changes["remove"])
+
+    return result
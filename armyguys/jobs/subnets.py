@@ -2,8 +2,11 @@
 
 """Jobs for subnets."""
 
+from time import sleep
+
 from ..aws import subnet
 
+from .exceptions import ImproperlyConfigured
 from .exceptions import WaitTimedOut
 from .exceptions import ResourceAlreadyExists
 from .exceptions import ResourceDoesNotExist
@@ -12,6 +15,8 @@ from .exceptions import ResourceNotDeleted
 
 from . import vpcs as vpc_jobs
 from . import availabilityzones as zone_jobs
+from . import cidrs as cidr_jobs
+from . import tags as tag_jobs
 
 from . import utils
 
@@ -166,6 +171,35 @@ def fetch(profile, ref):
     return result
 
 
+def resolve(profile, refs):
+    """Look up many subnets at once, by name or ID.
+
+    See ``utils.resolve()``.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        refs
+            A list of names and/or IDs of subnets.
+
+    Returns:
+        An OrderedDict of {ref: record}, in the same order as
+        ``refs``. Refs that don't match anything map to None.
+
+    """
+    return utils.resolve(
+        subnet,
+        profile,
+        refs,
+        "subnet-",
+        ("subnet-id", "tag:Name"),
+        "Subnets",
+        "SubnetId",
+        get_ref)
+
+
 def fetch_by_vpc(profile, vpc):
     """Fetch subnets in a VPC.
 
@@ -253,7 +287,14 @@ def polling_fetch(profile, ref, max_attempts=10, wait_interval=1):
     return data
 
 
-def create(profile, name, vpc, cidr_block, zone=None, tags=None):
+def create(
+        profile,
+        name,
+        vpc,
+        cidr_block=None,
+        zone=None,
+        tags=None,
+        prefix_length=None):
     """Create a subnet.
 
     Args:
@@ -268,7 +309,8 @@ def create(profile, name, vpc, cidr_block, zone=None, tags=None):
             The name or ID of the VPC.
 
         cidr_block
-            The CIDR network range of the subnet.
+            The CIDR network range of the subnet. Leave it blank
+            to use the first free block of ``prefix_length``.
 
         zone
             The availability zone to put the subnet in.
@@ -276,10 +318,19 @@ def create(profile, name, vpc, cidr_block, zone=None, tags=None):
         tags
             A dict of key/values to add as tags.
 
+        prefix_length
+            The prefix length (e.g., 24) of the block to allocate,
+            if no ``cidr_block`` is given.
+
     Returns:
         The newly created subnet's info.
 
     """
+    # Make sure a CIDR block (or its size) is specified.
+    if not any([cidr_block, prefix_length]):
+        msg = "Provide either a CIDR block or a prefix length."
+        raise ImproperlyConfigured(msg)
+
     # Make sure the VPC exists.
     vpc_data = vpc_jobs.fetch(profile, vpc)
     if vpc_data:
@@ -304,6 +355,11 @@ def create(profile, name, vpc, cidr_block, zone=None, tags=None):
         tags = []
     tags.append({"Key": "Name", "Value": name})
 
+    # Find a free CIDR block, if none was specified.
+    if not cidr_block:
+        blocks = cidr_jobs.plan(profile, vpc_data[0], prefix_length)
+        cidr_block = blocks[0]["CidrBlock"]
+
     # Now create it.
     params = {}
     params["profile"] = profile
@@ -320,22 +376,16 @@ def create(profile, name, vpc, cidr_block, zone=None, tags=None):
     try:
         subnet_data = polling_fetch(profile, ref)
     except WaitTimedOut:
-        msg = "Timed out waiting for " + str(cidr) + " subnet to be created."
+        msg = "Timed out waiting for " + str(cidr_block) \
+              + " subnet to be created."
         raise ResourceNotCreated(msg)
     if not subnet_data:
-        msg = "Subnet for " + str(cidr) + " not created."
+        msg = "Subnet for " + str(cidr_block) + " not created."
         raise ResourceNotCreated(msg)
 
     # Now tag it with all the tags.
     subnet_id = get_id(subnet_data[0])
-    if tags:
-        for tag in tags:
-            params = {}
-            params["profile"] = profile
-            params["subnet"] = subnet_id
-            params["key"] = tag["Key"]
-            params["value"] = tag["Value"]
-            utils.do_request(subnet, "tag", params)
+    tag_jobs.apply(profile, [(tag_jobs.EC2, subnet_id)], tags)
 
     # Get its data again (this time with tags).
     subnet_data = fetch(profile, ref)
@@ -344,6 +394,70 @@ def create(profile, name, vpc, cidr_block, zone=None, tags=None):
     return subnet_data
 
 
+def create_many(profile, name, vpc, prefix_length, zones, tags=None):
+    """Create one subnet in each of several availability zones.
+
+    The CIDR blocks for all of the subnets are planned up front,
+    from one look at the VPC's existing subnets, so they never
+    overlap each other (or anything already there).
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            A name for the subnets. Each subnet's name is this
+            plus its zone, e.g., "web-us-east-1a".
+
+        vpc
+            The name or ID of the VPC.
+
+        prefix_length
+            The prefix length (e.g., 24) of each subnet's block.
+
+        zones
+            A list of availability zones.
+
+        tags
+            A list of {"Key": key, "Value": value} tags to add.
+
+    Returns:
+        The newly created subnets' info.
+
+    """
+    # Make sure the VPC exists.
+    vpc_data = vpc_jobs.fetch(profile, vpc)
+    if not vpc_data:
+        msg = "No VPC '" + str(vpc) + "'."
+        raise ResourceDoesNotExist(msg)
+
+    # Make sure the zones exist, and none of the subnets do.
+    for zone in zones:
+        if not zone_jobs.is_zone(profile, zone):
+            msg = "No availability zone '" + str(zone) + "'."
+            raise ResourceDoesNotExist(msg)
+        subnet_name = name + "-" + zone
+        if is_subnet(profile, subnet_name):
+            msg = "Subnet '" + str(subnet_name) + "' already exists."
+            raise ResourceAlreadyExists(msg)
+
+    # Plan the blocks, then create the subnets.
+    blocks = cidr_jobs.plan(profile, vpc_data[0], prefix_length, zones)
+    result = []
+    for block in blocks:
+        zone = block["AvailabilityZone"]
+        subnet_tags = list(tags) if tags else None
+        result.extend(create(
+            profile,
+            name + "-" + zone,
+            vpc_jobs.get_id(vpc_data[0]),
+            cidr_block=block["CidrBlock"],
+            zone=zone,
+            tags=subnet_tags))
+    return result
+
+
 def delete(profile, ref):
     """Delete a subnet.
 
@@ -372,5 +486,5 @@ def delete(profile, ref):
 
     # Check that it was, in fact, deleted.
     if is_subnet(profile, ref):
-        msg = "Subnet '" + str(name) + "' was not deleted."
+        msg = "Subnet '" + str(ref) + "' was not deleted."
         raise ResourceNotDeleted(msg)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for tagging many resources at once."""
+
+from collections import OrderedDict
+
+from ..aws import tag
+
+from .exceptions import ImproperlyConfigured
+
+from . import utils
+
+
+# The kinds of resources that can be tagged.
+EC2 = "ec2"
+AUTOSCALING_GROUP = "autoscaling-group"
+LOAD_BALANCER = "load-balancer"
+
+# The most resources EC2 will tag in one request.
+MAX_EC2_RESOURCES = 1000
+
+# The most tags to send in one request.
+MAX_TAGS = 50
+
+# The most tags a load balancer can have.
+MAX_LOAD_BALANCER_TAGS = 10
+
+
+def group(resources):
+    """Group resources by kind.
+
+    Args:
+
+        resources
+            A list of (kind, ref) tuples, where the kind is ``EC2``
+            (and the ref an ID), ``AUTOSCALING_GROUP`` or
+            ``LOAD_BALANCER`` (and the ref a name).
+
+    Raises:
+        ``ImproperlyConfigured`` if a kind isn't known.
+
+    Returns:
+        An OrderedDict of {kind: [refs]}, without duplicates.
+
+    """
+    result = OrderedDict()
+    for kind, ref in resources:
+        if kind not in [EC2, AUTOSCALING_GROUP, LOAD_BALANCER]:
+            msg = "Can't tag resources of kind '" + str(kind) + "'."
+            raise ImproperlyConfigured(msg)
+        refs = result.setdefault(kind, [])
+        if ref not in refs:
+            refs.append(ref)
+    return result
+
+
+def apply(profile, resources, tags):
+    """Add tags to many resources, with as few requests as possible.
+
+    All EC2 resources get their tags in one request (or one per
+    ``MAX_EC2_RESOURCES`` resources and ``MAX_TAGS`` tags). All
+    autoscaling groups share a request too. Load balancers can only
+    be tagged one at a time, so each gets its own request.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        resources
+            A list of (kind, ref) tuples (see ``group()``).
+
+        tags
+            A list of {"Key": key, "Value": value} tags.
+
+    Returns:
+        The number of requests it took.
+
+    """
+    count = 0
+    if not tags:
+        return count
+    for kind, refs in group(resources).items():
+
+        if kind == EC2:
+            for ref_chunk in utils.chunks(refs, MAX_EC2_RESOURCES):
+                for tag_chunk in utils.chunks(tags, MAX_TAGS):
+                    params = {}
+                    params["profile"] = profile
+                    params["resources"] = ref_chunk
+                    params["tags"] = tag_chunk
+                    utils.do_request(tag, "create_ec2_tags", params)
+                    count += 1
+
+        elif kind == AUTOSCALING_GROUP:
+            records = []
+            for ref in refs:
+                for record in tags:
+                    records.append({
+                        "ResourceId": ref,
+                        "ResourceType": "auto-scaling-group",
+                        "Key": record["Key"],
+                        "Value": record["Value"],
+                        "PropagateAtLaunch": True,
+                        })
+            for chunk in utils.chunks(records, MAX_TAGS):
+                params = {}
+                params["profile"] = profile
+                params["tags"] = chunk
+                utils.do_request(tag, "create_autoscaling_tags", params)
+                count += 1
+
+        elif kind == LOAD_BALANCER:
+            for ref in refs:
+                for chunk in utils.chunks(tags, MAX_LOAD_BALANCER_TAGS):
+                    params = {}
+                    params["profile"] = profile
+                    params["load_balancer"] = ref
+                    params["tags"] = chunk
+                    utils.do_request(tag, "add_load_balancer_tags", params)
+                    count += 1
+
+    return count
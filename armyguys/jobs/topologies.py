@@ -0,0 +1,743 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for building (and tearing down) whole VPC networks at once."""
+
+import ipaddress
+
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+from ..aws import internetgateway
+from ..aws import networkinterface
+from ..aws import routetable
+from ..aws import securitygroup
+from ..aws import subnet
+from ..aws import vpc
+
+from .exceptions import AwsError
+from .exceptions import ImproperlyConfigured
+from .exceptions import ResourceAlreadyExists
+from .exceptions import ResourceDoesNotExist
+from .exceptions import ResourceHasDependency
+from .exceptions import ResourceNotCreated
+from .exceptions import ResourceNotDeleted
+
+from . import availabilityzones as zone_jobs
+from . import cidrs as cidr_jobs
+from . import subnets as subnet_jobs
+from . import tags as tag_jobs
+from . import utils
+from . import vpcs as vpc_jobs
+
+
+# How many AWS requests to run at once.
+MAX_WORKERS = 8
+
+# How many times to try each teardown step, and the most
+# seconds to wait between tries.
+MAX_ATTEMPTS = 8
+MAX_WAIT_INTERVAL = 8
+
+
+def plan_blocks(cidr_block, prefix_length, zones):
+    """Plan the subnets of a new VPC, without asking AWS.
+
+    A new VPC has no subnets yet, so its blocks can be worked out
+    before anything is created.
+
+    Args:
+
+        cidr_block
+            The VPC's CIDR block, e.g., "10.0.0.0/16".
+
+        prefix_length
+            The prefix length of each subnet, e.g., 24 for a /24.
+
+        zones
+            A list of availability zones, one subnet for each.
+
+    Raises:
+        ``ImproperlyConfigured`` if the blocks won't fit.
+
+    Returns:
+        A list of {"CidrBlock": block, "AvailabilityZone": zone}
+        entries, like ``cidrs.plan()``.
+
+    """
+    cidr_jobs.check_prefix_length(prefix_length)
+    try:
+        network = ipaddress.IPv4Network(str(cidr_block))
+    except ValueError:
+        msg = "Bad CIDR block: '" + str(cidr_block) + "'."
+        raise ImproperlyConfigured(msg)
+    if not cidr_jobs.MIN_PREFIX_LENGTH <= network.prefixlen \
+            <= cidr_jobs.MAX_PREFIX_LENGTH:
+        msg = "VPCs must be between /" + str(cidr_jobs.MIN_PREFIX_LENGTH) \
+              + " and /" + str(cidr_jobs.MAX_PREFIX_LENGTH) + "."
+        raise ImproperlyConfigured(msg)
+
+    intervals = []
+    result = []
+    for zone in zones:
+        try:
+            block = cidr_jobs.allocate([network], intervals, prefix_length)
+        except ResourceNotCreated:
+            msg = str(len(zones)) + " /" + str(prefix_length) \
+                  + " subnets won't fit in " + str(cidr_block) + "."
+            raise ImproperlyConfigured(msg)
+        result.append({"CidrBlock": block, "AvailabilityZone": zone})
+    return result
+
+
+def get_zones(profile, zones=None):
+    """Check some availability zones, or get them all.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        zones
+            A list of availability zone names. Leave it blank
+            to use every zone in the region.
+
+    Raises:
+        ``ResourceDoesNotExist`` if a zone doesn't exist.
+
+    Returns:
+        A list of availability zone names.
+
+    """
+    available = [x["ZoneName"] for x in zone_jobs.fetch_all(profile)]
+    if not zones:
+        return available
+    for zone in zones:
+        if zone not in available:
+            msg = "No availability zone '" + str(zone) + "'."
+            raise ResourceDoesNotExist(msg)
+    return list(zones)
+
+
+def wait_for_vpc(profile, vpc_id):
+    """Wait for a new VPC to become available.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        vpc_id
+            The ID of the VPC.
+
+    Raises:
+        ``WaitTimedOut`` if it doesn't become available.
+
+    """
+    def is_available():
+        records = vpc_jobs.fetch_by_id(profile, vpc_id)
+        return records and records[0].get("State") == "available"
+
+    msg = "Timed out waiting for VPC " + str(vpc_id) + "."
+    utils.poll(is_available, msg=msg)
+
+
+def create_subnet(profile, vpc_id, block, name, tags, public):
+    """Create one subnet of a new VPC, and wait for it to be ready.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        vpc_id
+            The ID of the VPC.
+
+        block
+            A {"CidrBlock": block, "AvailabilityZone": zone} entry.
+
+        name
+            A name to give to the subnet.
+
+        tags
+            A list of {"Key": key, "Value": value} tags to add.
+
+        public
+            If True, instances in it get public IPs.
+
+    Returns:
+        A {"SubnetId", "CidrBlock", "AvailabilityZone", "Name"} dict.
+
+    """
+    params = {}
+    params["profile"] = profile
+    params["cidr_block"] = block["CidrBlock"]
+    params["vpc"] = vpc_id
+    params["availability_zone"] = block["AvailabilityZone"]
+    response = utils.do_request(subnet, "create", params)
+    subnet_id = utils.get_data("Subnet", response)["SubnetId"]
+
+    def is_available():
+        records = subnet_jobs.fetch_by_id(profile, subnet_id)
+        return records and records[0].get("State") == "available"
+
+    msg = "Timed out waiting for subnet " + str(subnet_id) + "."
+    utils.poll(is_available, msg=msg)
+
+    subnet_tags = list(tags) + [{"Key": "Name", "Value": name}]
+    tag_jobs.apply(profile, [(tag_jobs.EC2, subnet_id)], subnet_tags)
+
+    if public:
+        params = {}
+        params["profile"] = profile
+        params["subnet"] = subnet_id
+        utils.do_request(subnet, "enable_public_ips", params)
+
+    return {
+        "SubnetId": subnet_id,
+        "CidrBlock": block["CidrBlock"],
+        "AvailabilityZone": block["AvailabilityZone"],
+        "Name": name,
+        }
+
+
+def build_network(executor, profile, name, blocks, tags, public, result):
+    """Fill in a new VPC, running independent steps at the same time.
+
+    Args:
+
+        executor
+            The executor to run requests on.
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            The name of the VPC.
+
+        blocks
+            The subnets to make, from ``plan_blocks()``.
+
+        tags
+            A list of {"Key": key, "Value": value} tags to add.
+
+        public
+            If True, route the subnets to the internet.
+
+        result
+            The dict ``build()`` returns. It's filled in as
+            resources are created.
+
+    Raises:
+        The first error any step raised, once every step is done.
+
+    """
+    vpc_id = result["VpcId"]
+    vpc_params = {"profile": profile, "vpc": vpc_id}
+
+    # Kick off everything that only needs the VPC.
+    pending = []
+    pending.append(executor.submit(
+        utils.do_request, vpc, "enable_dns_support", dict(vpc_params)))
+    pending.append(executor.submit(
+        utils.do_request, vpc, "enable_dns_hostnames", dict(vpc_params)))
+    if public:
+        gateway_future = executor.submit(
+            utils.do_request, internetgateway, "create",
+            {"profile": profile})
+        table_future = executor.submit(
+            utils.do_request, routetable, "create", dict(vpc_params))
+    subnet_futures = []
+    for block in blocks:
+        subnet_name = name + "-" + block["AvailabilityZone"]
+        subnet_futures.append(executor.submit(
+            create_subnet,
+            profile, vpc_id, block, subnet_name, tags, public))
+
+    # Wait for every step, even after one fails, so that everything
+    # that was created ends up in the result.
+    errors = []
+
+    def collect(future, key=None):
+        try:
+            response = future.result()
+            return utils.get_data(key, response) if key else response
+        except Exception as error:
+            errors.append(error)
+            return None
+
+    # Wire up the gateway and route table as soon as they exist.
+    shared = [vpc_id]
+    table_id = None
+    if public:
+        gateway = collect(gateway_future, "InternetGateway")
+        attach_future = None
+        if gateway:
+            gateway_id = gateway["InternetGatewayId"]
+            result["InternetGatewayId"] = gateway_id
+            shared.append(gateway_id)
+            params = dict(vpc_params)
+            params["gateway"] = gateway_id
+            attach_future = executor.submit(
+                utils.do_request, vpc, "attach_internet_gateway", params)
+
+        table = collect(table_future, "RouteTable")
+        if table:
+            table_id = table["RouteTableId"]
+            result["RouteTableId"] = table_id
+            shared.append(table_id)
+
+        attached = attach_future and collect(attach_future) is not None
+        if attached and table_id:
+            params = {}
+            params["profile"] = profile
+            params["route_table"] = table_id
+            params["cidr_block"] = "0.0.0.0/0"
+            params["gateway"] = gateway_id
+            pending.append(executor.submit(
+                utils.do_request, routetable, "add_route", params))
+
+    # Tag the VPC, gateway and route table with one request.
+    shared_tags = list(tags) + [{"Key": "Name", "Value": name}]
+    pending.append(executor.submit(
+        tag_jobs.apply,
+        profile, [(tag_jobs.EC2, x) for x in shared], shared_tags))
+
+    # Associate each subnet once it's ready.
+    for future in subnet_futures:
+        record = collect(future)
+        if not record:
+            continue
+        result["Subnets"].append(record)
+        if table_id:
+            params = {}
+            params["profile"] = profile
+            params["route_table"] = table_id
+            params["subnet"] = record["SubnetId"]
+            pending.append(executor.submit(
+                utils.do_request, routetable, "associate_subnet", params))
+
+    for future in pending:
+        collect(future)
+
+    if errors:
+        raise errors[0]
+
+
+def build(
+        profile,
+        name,
+        cidr_block,
+        zones=None,
+        prefix_length=24,
+        public=True,
+        tags=None,
+        max_workers=None):
+    """Build a VPC with a subnet in each availability zone.
+
+    Everything is checked and planned before anything is created.
+    Once the VPC is up, the steps that don't depend on each other
+    run at the same time: the DNS settings, the internet gateway,
+    the route table, and each subnet. Then the gateway is attached,
+    the default route is added, and the subnets are associated.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        name
+            A name for the VPC. The gateway and route table get
+            the same name, and each subnet gets this plus its
+            zone, e.g., "web-us-east-1b".
+
+        cidr_block
+            The VPC's CIDR block, e.g., "10.0.0.0/16".
+
+        zones
+            A list of availability zones. Defaults to all of them.
+
+        prefix_length
+            The prefix length of each subnet, e.g., 24 for a /24.
+
+        public
+            If True, the subnets are routed to the internet through
+            an internet gateway, and their instances get public IPs.
+            If False, no gateway or route table is made.
+
+        tags
+            A list of {"Key": key, "Value": value} tags to add
+            to everything.
+
+        max_workers
+            How many requests to run at once.
+
+    Raises:
+        ``ResourceNotCreated`` if any step fails. The message lists
+        what was created, so it can be torn down.
+
+    Returns:
+        A {"VpcId", "InternetGatewayId", "RouteTableId", "Subnets"}
+        dict. The gateway and route table are None if not public.
+
+    """
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    if not tags:
+        tags = []
+
+    # Check and plan everything first.
+    if vpc_jobs.fetch_by_name(profile, name):
+        msg = "VPC '" + str(name) + "' already exists."
+        raise ResourceAlreadyExists(msg)
+    zones = get_zones(profile, zones)
+    blocks = plan_blocks(cidr_block, prefix_length, zones)
+
+    # Create the VPC.
+    params = {}
+    params["profile"] = profile
+    params["cidr_block"] = cidr_block
+    response = utils.do_request(vpc, "create", params)
+    vpc_id = utils.get_data("Vpc", response)["VpcId"]
+
+    result = {
+        "VpcId": vpc_id,
+        "InternetGatewayId": None,
+        "RouteTableId": None,
+        "Subnets": [],
+        }
+
+    try:
+        wait_for_vpc(profile, vpc_id)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            build_network(executor, profile, name, blocks, tags, public,
+                          result)
+    except Exception as error:
+        created = [vpc_id]
+        if result["InternetGatewayId"]:
+            created.append(result["InternetGatewayId"])
+        if result["RouteTableId"]:
+            created.append(result["RouteTableId"])
+        created.extend(x["SubnetId"] for x in result["Subnets"])
+        msg = "VPC '" + str(name) + "' not built: " + str(error) \
+              + " Created so far: " + ", ".join(created) + "."
+        raise ResourceNotCreated(msg)
+
+    return result
+
+
+def inventory(executor, profile, vpc_id):
+    """Fetch everything in a VPC, with one request per kind of resource.
+
+    Args:
+
+        executor
+            The executor to run requests on.
+
+        profile
+            A profile to connect to AWS with.
+
+        vpc_id
+            The ID of the VPC.
+
+    Returns:
+        A dict of {"NetworkInterfaces", "SecurityGroups", "Subnets",
+        "RouteTables", "InternetGateways"} records.
+
+    """
+    vpc_filter = [{"Name": "vpc-id", "Values": [vpc_id]}]
+    gateway_filter = [{"Name": "attachment.vpc-id", "Values": [vpc_id]}]
+    lookups = [
+        (networkinterface, "NetworkInterfaces", vpc_filter),
+        (securitygroup, "SecurityGroups", vpc_filter),
+        (subnet, "Subnets", vpc_filter),
+        (routetable, "RouteTables", vpc_filter),
+        (internetgateway, "InternetGateways", gateway_filter),
+        ]
+    futures = []
+    for package, key, filters in lookups:
+        params = {}
+        params["profile"] = profile
+        params["filters"] = filters
+        futures.append((key, executor.submit(
+            utils.do_request, package, "get", params)))
+    result = {}
+    for key, future in futures:
+        result[key] = utils.get_data(key, future.result())
+    return result
+
+
+def get_group_references(permissions, group_ids):
+    """Get the rules that let some security groups in.
+
+    Args:
+
+        permissions
+            A list of ``IpPermissions`` from a security group.
+
+        group_ids
+            The IDs of the groups to look for.
+
+    Returns:
+        A list of permissions, with only the grants to those groups.
+
+    """
+    result = []
+    for permission in permissions:
+        pairs = [
+            {"GroupId": x["GroupId"]}
+            for x in permission.get("UserIdGroupPairs", [])
+            if x.get("GroupId") in group_ids
+            ]
+        if not pairs:
+            continue
+        record = {"IpProtocol": permission["IpProtocol"]}
+        for key in ["FromPort", "ToPort"]:
+            if key in permission:
+                record[key] = permission[key]
+        record["UserIdGroupPairs"] = pairs
+        result.append(record)
+    return result
+
+
+def plan_teardown(vpc_id, records):
+    """Work out how to delete everything in a VPC, a layer at a time.
+
+    Nothing in a layer depends on anything else in it, so each layer
+    can be deleted all at once. A layer can only start once the one
+    before it is done.
+
+    1. Detach the gateways, disassociate the route tables, revoke the
+       rules that let one group in another, and delete loose ENIs.
+    2. Delete the gateways, route tables, subnets and groups.
+    3. Delete the VPC.
+
+    Args:
+
+        vpc_id
+            The ID of the VPC.
+
+        records
+            Everything in the VPC, from ``inventory()``.
+
+    Raises:
+        ``ResourceHasDependency`` if an ENI is still in use (by an
+        instance, load balancer, NAT gateway, etc.).
+
+    Returns:
+        A list of layers. Each layer is a list of (package, method,
+        params) steps, with no profile in the params.
+
+    """
+    in_use = [
+        x["NetworkInterfaceId"] + " (" + x.get("Description", "") + ")"
+        for x in records["NetworkInterfaces"]
+        if x.get("Status") != "available"
+        ]
+    if in_use:
+        msg = "VPC " + str(vpc_id) + " still has network interfaces " \
+              + "in use: " + ", ".join(in_use) + "."
+        raise ResourceHasDependency(msg)
+
+    groups = [
+        x for x in records["SecurityGroups"]
+        if x["GroupName"] != "default"
+        ]
+    group_ids = [x["GroupId"] for x in groups]
+    tables = [
+        x for x in records["RouteTables"]
+        if not any(y.get("Main") for y in x.get("Associations", []))
+        ]
+
+    detach = []
+    for gateway in records["InternetGateways"]:
+        gateway_id = gateway["InternetGatewayId"]
+        params = {"vpc": vpc_id, "gateway": gateway_id}
+        detach.append((vpc, "detach_internet_gateway", params))
+    for table in records["RouteTables"]:
+        for association in table.get("Associations", []):
+            if association.get("Main"):
+                continue
+            association_id = association["RouteTableAssociationId"]
+            params = {"association": association_id}
+            detach.append((routetable, "disassociate_subnet", params))
+    for group in records["SecurityGroups"]:
+        for method, key in [("revoke_ingress", "IpPermissions"),
+                            ("revoke_egress", "IpPermissionsEgress")]:
+            permissions = get_group_references(group.get(key, []), group_ids)
+            if permissions:
+                params = {}
+                params["security_group"] = group["GroupId"]
+                params["permissions"] = permissions
+                detach.append((securitygroup, method, params))
+    for interface in records["NetworkInterfaces"]:
+        params = {"network_interface": interface["NetworkInterfaceId"]}
+        detach.append((networkinterface, "delete", params))
+
+    delete = []
+    for gateway in records["InternetGateways"]:
+        params = {"internet_gateway": gateway["InternetGatewayId"]}
+        delete.append((internetgateway, "delete", params))
+    for table in tables:
+        params = {"route_table": table["RouteTableId"]}
+        delete.append((routetable, "delete", params))
+    for record in records["Subnets"]:
+        params = {"subnet": record["SubnetId"]}
+        delete.append((subnet, "delete", params))
+    for group in groups:
+        params = {"group_id": group["GroupId"]}
+        delete.append((securitygroup, "delete", params))
+
+    layers = [detach, delete, [(vpc, "delete", {"vpc": vpc_id})]]
+    return [x for x in layers if x]
+
+
+def teardown_error_handler(error):
+    """Handle errors that arise when you tear down a VPC.
+
+    Args:
+
+        error
+            An AWS ``ClientError`` exception.
+
+    Raises:
+        ``ResourceHasDependency`` if something else has to go first,
+        or ``AwsError`` for anything else.
+
+    Returns:
+        None, if the resource is already gone (or detached).
+
+    """
+    code = error.response["Error"]["Code"]
+    message = error.response["Error"]["Message"]
+    if code.endswith("NotFound") or code == "Gateway.NotAttached":
+        return None
+    elif code == "DependencyViolation":
+        raise ResourceHasDependency(message)
+    else:
+        raise AwsError(message)
+
+
+def run_step(profile, step, max_attempts, wait_interval):
+    """Run a teardown step, trying again while AWS catches up.
+
+    AWS is eventually consistent, so something can still look like
+    a dependency for a few seconds after it's gone.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        step
+            A (package, method, params) step from ``plan_teardown()``.
+
+        max_attempts
+            The max number of times to try.
+
+        wait_interval
+            How many seconds to wait after the first try. It doubles
+            after each one, up to ``MAX_WAIT_INTERVAL``.
+
+    Raises:
+        ``ResourceHasDependency`` if it never goes through.
+
+    """
+    package, method, params = step
+    params = dict(params)
+    params["profile"] = profile
+    for attempt in range(max_attempts):
+        try:
+            utils.do_request(package, method, params, teardown_error_handler)
+            return
+        except ResourceHasDependency:
+            if attempt == max_attempts - 1:
+                raise
+        sleep(min(wait_interval * 2 ** attempt, MAX_WAIT_INTERVAL))
+
+
+def describe_step(step):
+    """Describe a teardown step, e.g., "subnet.delete subnet-1234"."""
+    package, method, params = step
+    name = package.__name__.rsplit(".", 1)[-1]
+    return name + "." + method + " " + " ".join(
+        str(v) for k, v in sorted(params.items()) if k != "permissions")
+
+
+def teardown(
+        profile,
+        ref,
+        max_workers=None,
+        max_attempts=None,
+        wait_interval=1):
+    """Delete a VPC and everything in it.
+
+    Everything in the VPC is fetched up front (one request per kind
+    of resource), and deleted a layer at a time (see
+    ``plan_teardown()``), with each layer's steps running at once.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        ref
+            The name or ID of the VPC.
+
+        max_workers
+            How many requests to run at once.
+
+        max_attempts
+            How many times to try each step.
+
+        wait_interval
+            How many seconds to wait before trying a step again.
+
+    Raises:
+        ``ResourceDoesNotExist`` if there's no such VPC,
+        ``ImproperlyConfigured`` if it's the default VPC,
+        ``ResourceHasDependency`` if something in it is in use,
+        or ``ResourceNotDeleted`` if a step fails.
+
+    Returns:
+        The number of steps it took.
+
+    """
+    if not max_workers:
+        max_workers = MAX_WORKERS
+    if not max_attempts:
+        max_attempts = MAX_ATTEMPTS
+
+    vpc_data = vpc_jobs.fetch(profile, ref)
+    if not vpc_data:
+        msg = "No VPC '" + str(ref) + "'."
+        raise ResourceDoesNotExist(msg)
+    if len(vpc_data) > 1:
+        msg = "More than one VPC named '" + str(ref) + "'."
+        raise ImproperlyConfigured(msg)
+    if vpc_data[0].get("IsDefault"):
+        msg = "Won't tear down the default VPC."
+        raise ImproperlyConfigured(msg)
+    vpc_id = vpc_jobs.get_id(vpc_data[0])
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        records = inventory(executor, profile, vpc_id)
+        layers = plan_teardown(vpc_id, records)
+        for layer in layers:
+            futures = [
+                (step, executor.submit(
+                    run_step, profile, step, max_attempts, wait_interval))
+                for step in layer
+                ]
+            errors = []
+            for step, future in futures:
+                try:
+                    future.result()
+                except (AwsError, ResourceHasDependency) as error:
+                    errors.append(describe_step(step) + ": " + str(error))
+            count += len(layer)
+            if errors:
+                msg = "VPC " + str(vpc_id) + " not torn down. " \
+                      + " ".join(errors)
+                raise ResourceNotDeleted(msg)
+    return count
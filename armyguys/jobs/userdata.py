@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""Jobs for building the user data archives EC2 instances boot with."""
+
+import hashlib
+import os
+import threading
+
+from .exceptions import FileDoesNotExist
+from .exceptions import ImproperlyConfigured
+
+from . import compression
+from . import manifests
+
+
+# The most bytes of user data EC2 accepts (before base64 encoding).
+MAX_SIZE = 16 * 1024
+
+# How many bytes to read at a time when hashing a file.
+CHUNK_SIZE = 64 * 1024
+
+
+_lock = threading.Lock()
+"""A lock to guard the archive cache."""
+
+
+_archives = {}
+"""Built archives, stored as {key: archive}."""
+
+
+def get_file_digest(filepath):
+    """Get the SHA-256 hex digest of a file, from the manifest if possible.
+
+    Args:
+
+        filepath
+            The path to the file.
+
+    Raises:
+        ``FileDoesNotExist`` if there's no such file.
+
+    Returns:
+        The hex digest.
+
+    """
+    if not os.path.isfile(filepath):
+        msg = "No file '" + str(filepath) + "'."
+        raise FileDoesNotExist(msg)
+
+    def read_digest():
+        digest = hashlib.sha256()
+        with open(filepath, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    return manifests.get_hash(filepath, "sha256", read_digest)
+
+
+def get_parts(files=None, raw_contents=None):
+    """List the parts of an archive, without reading any files.
+
+    Args:
+
+        files
+            A list of {"filepath": path, "contenttype": type} entries.
+
+        raw_contents
+            A list of {"contents": contents, "contenttype": type} entries.
+
+    Returns:
+        A list of {"Filename", "ContentType", "Digest", "Filepath",
+        "Contents"} dicts. Parts from files have no contents yet,
+        and parts from raw contents have no file path.
+
+    """
+    result = []
+    for record in files or []:
+        filepath = record["filepath"]
+        result.append({
+            "Filename": os.path.basename(filepath),
+            "ContentType": record["contenttype"],
+            "Digest": get_file_digest(filepath),
+            "Filepath": filepath,
+            "Contents": None,
+            })
+    for i, record in enumerate(raw_contents or []):
+        contents = record["contents"]
+        if not isinstance(contents, bytes):
+            contents = str(contents).encode("utf-8")
+        result.append({
+            "Filename": "user-data-" + str(i + 1),
+            "ContentType": record["contenttype"],
+            "Digest": hashlib.sha256(contents).hexdigest(),
+            "Filepath": None,
+            "Contents": contents,
+            })
+    return result
+
+
+def get_key(parts, compress):
+    """Get the key an archive is cached under.
+
+    Args:
+
+        parts
+            The archive's parts, from ``get_parts()``.
+
+        compress
+            The ``compress`` setting the archive is built with.
+
+    Returns:
+        A hex digest of the parts' names, types and contents.
+
+    """
+    digest = hashlib.sha256()
+    digest.update(repr(compress).encode("utf-8"))
+    for part in parts:
+        line = "\n" + part["Filename"] + "\0" + part["ContentType"] \
+               + "\0" + part["Digest"]
+        digest.update(line.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def render(parts, boundary):
+    """Render a MIME multipart archive, the way cloud-init reads it.
+
+    The parts are sent as-is (8bit), rather than base64 encoded,
+    since user data space is tight.
+
+    Args:
+
+        parts
+            The archive's parts, from ``get_parts()``.
+
+        boundary
+            The boundary to put between parts. It must not appear
+            in any of them.
+
+    Raises:
+        ``ImproperlyConfigured`` if a part contains the boundary.
+
+    Returns:
+        The archive, as bytes.
+
+    """
+    lines = [
+        b"Content-Type: multipart/mixed; boundary=\"" + boundary + b"\"",
+        b"MIME-Version: 1.0",
+        b"",
+        ]
+    for part in parts:
+        contents = part["Contents"]
+        if contents is None:
+            with open(part["Filepath"], "rb") as f:
+                contents = f.read()
+        if boundary in contents:
+            msg = "'" + part["Filename"] + "' contains the MIME boundary."
+            raise ImproperlyConfigured(msg)
+        header = "Content-Type: " + part["ContentType"] \
+                 + "; charset=\"utf-8\"\n" \
+                 + "MIME-Version: 1.0\n" \
+                 + "Content-Transfer-Encoding: 8bit\n" \
+                 + "Content-Disposition: attachment; filename=\"" \
+                 + part["Filename"] + "\"\n"
+        lines.append(b"--" + boundary)
+        lines.append(header.encode("utf-8"))
+        lines.append(contents)
+    lines.append(b"--" + boundary + b"--")
+    lines.append(b"")
+    return b"\n".join(lines)
+
+
+def build(files=None, raw_contents=None, compress=None, max_size=MAX_SIZE):
+    """Build (or fetch from the cache) a user data archive.
+
+    Archives are cached by the hashes of their parts, so building the
+    same archive again (e.g., for many launch configurations) reads
+    no files at all: the files' hashes come from the manifest. The
+    MIME boundary is worked out from the same hashes, so the same
+    parts always make the same bytes.
+
+    Args:
+
+        files
+            A list of {"filepath": path, "contenttype": type} entries.
+
+        raw_contents
+            A list of {"contents": contents, "contenttype": type} entries.
+
+        compress
+            True to gzip the archive (cloud-init unzips it), False not
+            to, or None to gzip it only if it's too big otherwise.
+
+        max_size
+            The most bytes the archive can be.
+
+    Raises:
+        ``ImproperlyConfigured`` if the archive is too big.
+
+    Returns:
+        A {"Key", "UserData", "Size", "Compressed"} archive, where
+        "UserData" is the bytes to send to AWS. Treat it as read-only,
+        since it's shared. Returns None if there are no parts.
+
+    """
+    parts = get_parts(files, raw_contents)
+    if not parts:
+        return None
+
+    key = get_key(parts, compress)
+    with _lock:
+        archive = _archives.get(key)
+
+    if not archive:
+        boundary = ("==" + key[:32] + "==").encode("ascii")
+        data = render(parts, boundary)
+        compressed = False
+        if compress or (compress is None and len(data) > max_size):
+            data = compression.compress(data, "gzip")
+            compressed = True
+        archive = {
+            "Key": key,
+            "UserData": data,
+            "Size": len(data),
+            "Compressed": compressed,
+            }
+        with _lock:
+            archive = _archives.setdefault(key, archive)
+
+    if archive["Size"] > max_size:
+        msg = "User data is " + str(archive["Size"]) + " bytes" \
+              + (" (gzipped)" if archive["Compressed"] else "") \
+              + ", but can be at most " + str(max_size) + "."
+        raise ImproperlyConfigured(msg)
+    return archive
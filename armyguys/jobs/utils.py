@@ -2,10 +2,9 @@
 
 """Tools to help with running jobs."""
 
-import sys
+from collections import OrderedDict
 
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from time import sleep
 
 from botocore.exceptions import ClientError
 
@@ -13,6 +12,11 @@ from .exceptions import AwsError
 from .exceptions import MissingKey
 from .exceptions import Non200Response
 from .exceptions import PermissionDenied
+from .exceptions import WaitTimedOut
+
+
+# The most values AWS accepts in one describe filter.
+MAX_FILTER_VALUES = 200
 
 
 def get_data(key, response):
@@ -88,57 +92,148 @@ def do_request(package, method, params, error_handler=None):
         except KeyError:
             msg = "Could not find status code in response."
             raise MissingKey(msg)
-        if status_code not in [200, 204]:
+        if status_code not in [200, 204, 206]:
             msg = "Response code was not 200 OK."
             raise Non200Response
 
     return response
 
 
-def create_mime_multipart_archive(files=None, raw_contents=None):
-    """Create a MIME MultiPart Archive of files and file contents.
+def chunks(items, size):
+    """Split items into lists of a limited size.
+
+    Args:
+
+        items
+            An iterable of items. It can be a generator, and it's
+            only consumed one chunk at a time.
+
+        size
+            The max number of items in each chunk.
+
+    Returns:
+        A generator of lists.
+
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_missing(resolved):
+    """Get the refs that didn't resolve to anything.
+
+    Args:
+
+        resolved
+            A {ref: record} mapping, where refs that didn't
+            match anything map to None.
+
+    Returns:
+        A list of the missing refs, in order.
+
+    """
+    return [ref for ref, record in resolved.items() if record is None]
+
+
+def resolve(package, profile, refs, prefix, filter_names, key, id_key,
+            get_name):
+    """Look up many EC2 resources at once, by name or ID.
+
+    IDs and names are looked up separately (AWS ANDs filters on
+    different fields together), with up to ``MAX_FILTER_VALUES``
+    values per request. So a list of refs costs one request per
+    ``MAX_FILTER_VALUES`` IDs, plus one per ``MAX_FILTER_VALUES``
+    names, rather than one per ref.
 
     Args:
 
-        files
-            A list of {"filepath": path, "contenttype": type} entries.
+        package
+            The module whose ``get()`` fetches the resources,
+            e.g., ``aws.vpc``.
+
+        profile
+            A profile to connect to AWS with.
+
+        refs
+            A list of names and/or IDs.
+
+        prefix
+            The prefix that marks a ref as an ID, e.g., "vpc-".
+
+        filter_names
+            The names of the ID filter and the name filter,
+            e.g., ("vpc-id", "tag:Name").
 
-        raw_contents
-            A list of {"contents": contents, "contenttype": type} entries.
+        key
+            The key that holds the records in a response, e.g., "Vpcs".
+
+        id_key
+            The key that holds a record's ID, e.g., "VpcId".
+
+        get_name
+            A function that gets a record's name.
+
+    Returns:
+        An OrderedDict of {ref: record}, in the same order as
+        ``refs``. Refs that don't match anything map to None.
+
+    """
+    ids = [x for x in refs if x.startswith(prefix)]
+    names = [x for x in refs if not x.startswith(prefix)]
+    found = {}
+    lookups = zip([ids, names], filter_names)
+    for values, filter_name in lookups:
+        for chunk in chunks(sorted(set(values)), MAX_FILTER_VALUES):
+            params = {}
+            params["profile"] = profile
+            params["filters"] = [{"Name": filter_name, "Values": chunk}]
+            response = do_request(package, "get", params)
+            for record in get_data(key, response):
+                found.setdefault(record[id_key], record)
+                found.setdefault(get_name(record), record)
+    result = OrderedDict()
+    for ref in refs:
+        result[ref] = found.get(ref)
+    return result
+
+
+def poll(func, max_attempts=10, wait_interval=1, msg=None):
+    """Call a function repeatedly until it returns something.
+
+    Args:
+
+        func
+            A function that takes no arguments. It should return
+            something falsy until whatever it checks is ready.
+
+        max_attempts
+            The max number of times to call it.
+
+        wait_interval
+            How many seconds to wait between each call.
+
+        msg
+            The message to time out with.
+
+    Raises:
+        ``WaitTimedOut`` if it never returns anything.
 
     Returns:
-        The archive text.
+        The first truthy thing it returns.
 
     """
-    combined_message = MIMEMultipart()
-    default_encoding = sys.getdefaultencoding()
-    if files:
-        for record in files:
-            file_path = record["filepath"]
-            content_type = record["contenttype"]
-            with open(file_path, "rb") as f:
-                contents = f.read()
-                message = MIMEText(
-                    contents,
-                    content_type,
-                    default_encoding)
-                message.add_header(
-                    "Content-Disposition",
-                    "attachment; filename=\"%s\"" % (file_path))
-                combined_message.attach(message)
-    if raw_contents:
-        counter = 1
-        for record in raw_contents:
-            filename = "user-data-" + str(counter)
-            contents = record["contents"]
-            content_type = record["contenttype"]
-            message = MIMEText(
-                contents,
-                content_type,
-                default_encoding)
-            message.add_header(
-                "Content-Disposition",
-                "attachment; filename=\"%s\"" % (filename))
-            combined_message.attach(message)
-            counter += 1
-    return combined_message.as_string()
+    for attempt in range(max_attempts):
+        result = func()
+        if result:
+            return result
+        if attempt < max_attempts - 1:
+            sleep(wait_interval)
+    if not msg:
+        msg = "Timed out waiting."
+    raise WaitTimedOut(msg)
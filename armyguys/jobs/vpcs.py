@@ -174,6 +174,35 @@ def fetch(profile, ref):
     return result
 
 
+def resolve(profile, refs):
+    """Look up many VPCs at once, by name or ID.
+
+    See ``utils.resolve()``.
+
+    Args:
+
+        profile
+            A profile to connect to AWS with.
+
+        refs
+            A list of names and/or IDs of VPCs.
+
+    Returns:
+        An OrderedDict of {ref: record}, in the same order as
+        ``refs``. Refs that don't match anything map to None.
+
+    """
+    return utils.resolve(
+        vpc,
+        profile,
+        refs,
+        "vpc-",
+        ("vpc-id", "tag:Name"),
+        "Vpcs",
+        "VpcId",
+        get_ref)
+
+
 def is_vpc(profile, ref):
     """Check if a VPC exists.
 
@@ -67,9 +67,11 @@ setup(
 
     # What are the run-time dependencies?
     # Pip will install these when you install this package.
+    # (botocore 1.15 is the first with the "adaptive" retry mode.)
     install_requires=[
         "click",
-        "boto3"
+        "boto3>=1.12.0",
+        "botocore>=1.15.0",
     ],
 
     # Are there any extra dependency groups, e.g., for testing?
@@ -80,6 +82,9 @@ setup(
             "flake8",
             "pep257",
         ],
+        "zstd": [
+            "zstandard",
+        ],
     },
 
     # This is an executable script, so where is/are the entry point/s?
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""Unit tests for the IAM permission checks."""
+
+from unittest import TestCase
+
+from armyguys.jobs import permissions
+
+
+class TestEvaluate(TestCase):
+
+    """Test that policies are evaluated optimistically."""
+
+    def test_conditional_deny_is_ignored(self):
+        """A Deny with a Condition doesn't deny anything."""
+        documents = [{
+            "Statement": [
+                {"Effect": "Allow", "Action": "ecs:*", "Resource": "*"},
+                {
+                    "Effect": "Deny",
+                    "NotAction": ["iam:*", "sts:GetSessionToken"],
+                    "Resource": "*",
+                    "Condition": {
+                        "BoolIfExists": {
+                            "aws:MultiFactorAuthPresent": "false",
+                        },
+                    },
+                },
+            ],
+        }]
+        policies = permissions.compile_policies(documents)
+        decision = permissions.evaluate(policies, "ecs:CreateCluster")
+        self.assertEqual(decision, permissions.ALLOW)
+
+    def test_unconditional_deny_wins(self):
+        """A Deny without a Condition beats any Allow."""
+        documents = [{
+            "Statement": [
+                {"Effect": "Allow", "Action": "ecs:*", "Resource": "*"},
+                {"Effect": "Deny", "Action": "ecs:Create*", "Resource": "*"},
+            ],
+        }]
+        policies = permissions.compile_policies(documents)
+        denied = permissions.get_denied(
+            policies,
+            ["ecs:CreateCluster", "ecs:ListClusters"])
+        self.assertEqual(denied, ["ecs:CreateCluster"])
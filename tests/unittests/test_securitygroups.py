@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""Unit tests for security group rules."""
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from armyguys.jobs import securitygroups
+
+
+RULES = [
+    {"Protocol": "tcp", "Port": 22, "Cidr": "10.0.0.0/8"},
+    {"Protocol": "icmp", "Cidr": "10.0.0.0/8"},
+    {"Protocol": "58", "Cidr": "::/0"},
+    {"Protocol": "all", "Group": "sg-12345678"},
+    ]
+
+
+def describe(permissions):
+    """Report permissions back the way AWS describes them."""
+    result = []
+    for permission in permissions:
+        permission = dict(permission)
+        if permission["IpProtocol"] == "-1":
+            permission.pop("FromPort", None)
+            permission.pop("ToPort", None)
+        elif permission["IpProtocol"] in ("icmp", "1", "icmpv6", "58"):
+            permission.setdefault("FromPort", -1)
+            permission.setdefault("ToPort", -1)
+        result.append(permission)
+    return result
+
+
+class TestApplyRules(TestCase):
+
+    """Test that applied rules match what AWS reports back."""
+
+    def test_round_trip(self):
+        """Rules that were applied and described again don't change."""
+        requests = []
+
+        def do_request(package, method, params, error_handler=None):
+            requests.append((method, params))
+
+        record = {"GroupId": "sg-87654321", "IpPermissions": []}
+        with patch.object(securitygroups.utils, "do_request", do_request):
+            securitygroups.apply_rules(None, None, inbound=RULES,
+                                       record=record)
+            self.assertEqual(len(requests), 1)
+            method, params = requests[0]
+            self.assertEqual(method, "authorize_ingress")
+
+            record["IpPermissions"] = describe(params["permissions"])
+            del requests[:]
+            result = securitygroups.apply_rules(
+                None, None, inbound=RULES, prune=True, record=record)
+
+        self.assertEqual(requests, [])
+        self.assertEqual(result["Inbound"], {"Added": 0, "Removed": 0})
+
+    def test_icmp_ports(self):
+        """ICMP rules with no type or code get -1 ports, as AWS reports."""
+        current = securitygroups.normalize_permissions([{
+            "IpProtocol": "1",
+            "FromPort": -1,
+            "ToPort": -1,
+            "IpRanges": [{"CidrIp": "10.0.0.0/8"}],
+            }])
+        desired = securitygroups.normalize_rules(
+            [{"Protocol": "icmp", "Cidr": "10.0.0.0/8"}])
+        changes = securitygroups.diff(current, desired)
+        self.assertEqual(changes, {"add": set(), "remove": set()})